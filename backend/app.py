@@ -3,30 +3,103 @@ import sqlite3
 import json
 from datetime import datetime, timedelta, timezone
 
-from flask import Flask, jsonify, request, current_app
-from flask_cors import CORS
+from flask import Flask, jsonify, request, current_app, send_file
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
     get_jwt_identity,
     jwt_required,
 )
-from flask_mail import Mail, Message
-from werkzeug.security import check_password_hash, generate_password_hash
 
 try:  # Support running as module or script
-    from .models import get_db, init_db, close_db, seed_admin_user
+    from .availability import DATE_ORDER_ERROR, OVERLAP_ERROR, overlapping_rental, parse_date, property_calendar
+    from .cache import cached_listing, init_response_cache, invalidates_listings
+    from .changes import CHANGE_TABLES, compacted_through, current_seq, init_changes, read_changes
+    from .compression import init_compression
+    from .counters import counts_views, get_counters, init_counters
+    from .duplicates import find_duplicates, index_listing, reindex_listing, signature
+    from .favorites import current_tenant_id, get_favorite_cache, init_favorite_cache
+    from .images import (
+        IMAGE_FORMATS, IMAGE_SIZES, IMAGES_AVAILABLE, KEY_PATTERN, get_image_pipeline, init_images, inspect_upload,
+        original_path, store_original, variant_path, variants_ready,
+    )
+    from .insights import SEGMENT_KEYS, rent_insights
+    from .ledger import generate_invoices, period_bounds, record_payment
+    from .maintenance import init_maintenance
+    from .models import get_db, close_db, ensure_schema, init_db_pool
+    from .passwords import (
+        HasherBusy, get_password_hasher, hash_password, init_password_hasher, verify_password,
+    )
+    from .queries import (
+        BATCH_MAX_IDS, USER_SEARCH_MAX_LIMIT, all_user_batches, flagged_duplicates,
+        get_property_detail, owner_properties, owner_properties_page, page_params, properties_by_ids, read_snapshot,
+        search_properties, search_properties_page, search_property_batches, search_users, tenant_favorites,
+        user_contact_requests, user_contacts, user_list_batches, user_list_page, user_messages, user_rentals,
+    )
+    from .ratelimit import init_rate_limiter, rate_limited
+    from .repositories import ContactRequests, Messages, Properties, Rentals, Users
+    from .serialization import (
+        INVOICE_CONVERTERS, PAYMENT_CONVERTERS, RENTAL_CONVERTERS, RENTAL_FIELDS, REVENUE_CONVERTERS,
+        FastJSONProvider, RowMapper, json_list_response, tuple_cursor,
+    )
+    from .writer import init_write_queue, write
 except Exception:  # pragma: no cover
-    from models import get_db, init_db, close_db, seed_admin_user  # type: ignore
+    from availability import DATE_ORDER_ERROR, OVERLAP_ERROR, overlapping_rental, parse_date, property_calendar  # type: ignore
+    from cache import cached_listing, init_response_cache, invalidates_listings  # type: ignore
+    from changes import CHANGE_TABLES, compacted_through, current_seq, init_changes, read_changes  # type: ignore
+    from compression import init_compression  # type: ignore
+    from counters import counts_views, get_counters, init_counters  # type: ignore
+    from duplicates import find_duplicates, index_listing, reindex_listing, signature  # type: ignore
+    from favorites import current_tenant_id, get_favorite_cache, init_favorite_cache  # type: ignore
+    from images import (  # type: ignore
+        IMAGE_FORMATS, IMAGE_SIZES, IMAGES_AVAILABLE, KEY_PATTERN, get_image_pipeline, init_images, inspect_upload,
+        original_path, store_original, variant_path, variants_ready,
+    )
+    from insights import SEGMENT_KEYS, rent_insights  # type: ignore
+    from ledger import generate_invoices, period_bounds, record_payment  # type: ignore
+    from maintenance import init_maintenance  # type: ignore
+    from models import get_db, close_db, ensure_schema, init_db_pool  # type: ignore
+    from passwords import (  # type: ignore
+        HasherBusy, get_password_hasher, hash_password, init_password_hasher, verify_password,
+    )
+    from queries import (  # type: ignore
+        BATCH_MAX_IDS, USER_SEARCH_MAX_LIMIT, all_user_batches, flagged_duplicates,
+        get_property_detail, owner_properties, owner_properties_page, page_params, properties_by_ids, read_snapshot,
+        search_properties, search_properties_page, search_property_batches, search_users, tenant_favorites,
+        user_contact_requests, user_contacts, user_list_batches, user_list_page, user_messages, user_rentals,
+    )
+    from ratelimit import init_rate_limiter, rate_limited  # type: ignore
+    from repositories import ContactRequests, Messages, Properties, Rentals, Users  # type: ignore
+    from serialization import (  # type: ignore
+        INVOICE_CONVERTERS, PAYMENT_CONVERTERS, RENTAL_CONVERTERS, RENTAL_FIELDS, REVENUE_CONVERTERS,
+        FastJSONProvider, RowMapper, json_list_response, tuple_cursor,
+    )
+    from writer import init_write_queue, write  # type: ignore
 
 
 def create_app() -> Flask:
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    # Column maps are bound once per query layout and reused across requests
+    admin_rental_rows = RowMapper(RENTAL_FIELDS, RENTAL_CONVERTERS)
+    reminder_rows = RowMapper()
+    invoice_rows = RowMapper(converters=INVOICE_CONVERTERS)
+    payment_rows = RowMapper(converters=PAYMENT_CONVERTERS)
+    monthly_revenue_rows = RowMapper(converters=REVENUE_CONVERTERS)
+    owner_revenue_rows = RowMapper(converters=REVENUE_CONVERTERS)
 
     # Core config
     app.config["SECRET_KEY"] = os.getenv("FLASK_SECRET_KEY", "dev-secret-key-change-me")
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-jwt-secret-change-me")
 
+    # Database (defaults to backend/database.db)
+    if os.getenv("DATABASE_PATH"):
+        app.config["DATABASE_PATH"] = os.getenv("DATABASE_PATH")
+    app.config["DATABASE_BUSY_TIMEOUT"] = float(os.getenv("DATABASE_BUSY_TIMEOUT", "5"))
+    # Whole-table lists are read and sent this many rows at a time (serialization.json_list_response)
+    app.config["STREAM_BATCH_SIZE"] = max(1, int(os.getenv("STREAM_BATCH_SIZE", "500")))
+
     # Mail (Gmail SMTP)
     app.config["MAIL_SERVER"] = os.getenv("MAIL_SERVER", "smtp.gmail.com")
     app.config["MAIL_PORT"] = int(os.getenv("MAIL_PORT", "587"))
@@ -36,16 +109,30 @@ def create_app() -> Flask:
     app.config["MAIL_DEFAULT_SENDER"] = os.getenv("MAIL_DEFAULT_SENDER", app.config["MAIL_USERNAME"]) 
     app.config["MAIL_SUPPRESS_SEND"] = os.getenv("MAIL_SUPPRESS_SEND", "false").lower() == "true" and True or False
 
-    # Initialize extensions
+    app.config["AUTO_MIGRATE"] = os.getenv("AUTO_MIGRATE", "true").lower() == "true"
+
+    # Initialize extensions (Flask-Mail is set up lazily by get_mail)
+    from flask_cors import CORS
+
     CORS(app, resources={r"/*": {"origins": os.getenv("CORS_ORIGINS", "*")}}, supports_credentials=True)
     JWTManager(app)
-    mail = Mail(app)
+    init_response_cache(app)
+    init_compression(app)
+    init_password_hasher(app)
+    rate_limiter = init_rate_limiter(app)
+
+    init_db_pool(app)
 
-    # Ensure DB exists and seed admin user
+    # Cheap schema-version check; `python -m backend.manage bootstrap` does the real setup
     with app.app_context():
-        init_db()
-        seed_admin_user()
+        ensure_schema()
     app.teardown_appcontext(close_db)
+    init_write_queue(app)
+    init_counters(app)
+    init_favorite_cache(app)
+    init_changes(app)
+    init_images(app)
+    init_maintenance(app)
 
     @app.get("/health")
     def health() -> tuple[dict, int]:
@@ -64,20 +151,13 @@ def create_app() -> Flask:
         if password != confirm_password:
             return {"message": "Passwords do not match."}, 400
 
-        password_hash = generate_password_hash(password)
+        password_hash = hash_password(password)
 
         try:
-            db = get_db()
-            cur = db.cursor()
-            cur.execute("SELECT id FROM users WHERE email = ?", (email,))
-            if cur.fetchone():
+            if Users(get_db()).email_taken(email):
                 return {"message": "Email already registered."}, 409
 
-            cur.execute(
-                "INSERT INTO users (name, email, password_hash, role) VALUES (?, ?, ?, ?)",
-                (name, email, password_hash, "tenant"),
-            )
-            db.commit()
+            write(lambda conn: Users(conn).insert(name, email, password_hash, "tenant"))
         except sqlite3.Error:
             return {"message": "Database error during signup."}, 500
 
@@ -98,20 +178,13 @@ def create_app() -> Flask:
         if password != confirm_password:
             return {"message": "Passwords do not match."}, 400
 
-        password_hash = generate_password_hash(password)
+        password_hash = hash_password(password)
 
         try:
-            db = get_db()
-            cur = db.cursor()
-            cur.execute("SELECT id FROM users WHERE email = ?", (email,))
-            if cur.fetchone():
+            if Users(get_db()).email_taken(email):
                 return {"message": "Email already registered."}, 409
 
-            cur.execute(
-                "INSERT INTO users (name, email, password_hash, role) VALUES (?, ?, ?, ?)",
-                (name, email, password_hash, "tenant"),
-            )
-            db.commit()
+            write(lambda conn: Users(conn).insert(name, email, password_hash, "tenant"))
         except sqlite3.Error:
             return {"message": "Database error during signup."}, 500
 
@@ -133,26 +206,20 @@ def create_app() -> Flask:
         if password != confirm_password:
             return {"message": "Passwords do not match."}, 400
 
-        password_hash = generate_password_hash(password)
+        password_hash = hash_password(password)
 
         try:
-            db = get_db()
-            cur = db.cursor()
-            cur.execute("SELECT id FROM users WHERE email = ?", (email,))
-            if cur.fetchone():
+            if Users(get_db()).email_taken(email):
                 return {"message": "Email already registered."}, 409
 
-            cur.execute(
-                "INSERT INTO users (name, email, password_hash, role) VALUES (?, ?, ?, ?)",
-                (name, email, password_hash, "owner"),
-            )
-            db.commit()
+            write(lambda conn: Users(conn).insert(name, email, password_hash, "owner"))
         except sqlite3.Error:
             return {"message": "Database error during signup."}, 500
 
         return {"message": "Owner signup successful."}, 201
 
     @app.post("/login")
+    @rate_limited("login", by=("ip", "email"))
     def login():
         body = request.get_json(silent=True) or {}
         email = (body.get("email") or "").strip().lower()
@@ -161,21 +228,26 @@ def create_app() -> Flask:
             return {"message": "Email and password required."}, 400
 
         try:
-            db = get_db()
-            cur = db.cursor()
-            cur.execute("SELECT id, name, email, password_hash, role, is_admin FROM users WHERE email = ?", (email,))
-            row = cur.fetchone()
-            if not row:
+            found = Users(get_db()).credentials(email)
+            if not found:
                 return {"message": "Invalid credentials."}, 401
 
-            user_id, name, email, password_hash, role, is_admin = row
-            if not check_password_hash(password_hash, password):
+            user, password_hash = found
+            if not verify_password(password_hash, password):
                 return {"message": "Invalid credentials."}, 401
 
-            access_token = create_access_token(identity=str(user_id), additional_claims={"name": name, "email": email, "role": role, "is_admin": is_admin})
+            # Upgrade hashes made under an older hashing policy while we have the plaintext
+            if get_password_hasher().needs_rehash(password_hash):
+                try:
+                    new_hash = hash_password(password)
+                    write(lambda conn: Users(conn).set_password(user.id, new_hash))
+                except HasherBusy:
+                    pass  # retried on a later login
+
+            access_token = create_access_token(identity=str(user.id), additional_claims={"name": user.name, "email": user.email, "role": user.role, "is_admin": user.is_admin})
             return {
                 "access_token": access_token,
-                "user": {"id": user_id, "name": name, "email": email, "role": role, "is_admin": is_admin},
+                "user": user.to_dict(),
             }, 200
         except sqlite3.Error:
             return {"message": "Database error during login."}, 500
@@ -185,14 +257,10 @@ def create_app() -> Flask:
     def me():
         user_id = get_jwt_identity()
         try:
-            db = get_db()
-            cur = db.cursor()
-            cur.execute("SELECT id, name, email, role, is_admin FROM users WHERE id = ?", (user_id,))
-            row = cur.fetchone()
-            if not row:
+            user = Users(get_db()).get(user_id)
+            if not user:
                 return {"message": "User not found."}, 404
-            uid, name, email, role, is_admin = row
-            return {"id": uid, "name": name, "email": email, "role": role, "is_admin": is_admin}, 200
+            return user.to_dict(), 200
         except sqlite3.Error:
             return {"message": "Database error."}, 500
 
@@ -211,25 +279,20 @@ def create_app() -> Flask:
             return {"message": "New passwords do not match."}, 400
 
         try:
-            db = get_db()
-            cur = db.cursor()
-            cur.execute("SELECT password_hash FROM users WHERE id = ?", (user_id,))
-            row = cur.fetchone()
-            if not row:
+            password_hash = Users(get_db()).password_hash(user_id)
+            if password_hash is None:
                 return {"message": "User not found."}, 404
-            if not check_password_hash(row[0], current_password):
+            if not verify_password(password_hash, current_password):
                 return {"message": "Current password is incorrect."}, 401
 
-            cur.execute(
-                "UPDATE users SET password_hash = ? WHERE id = ?",
-                (generate_password_hash(new_password), user_id),
-            )
-            db.commit()
+            new_hash = hash_password(new_password)
+            write(lambda conn: Users(conn).set_password(user_id, new_hash))
             return {"message": "Password updated successfully."}, 200
         except sqlite3.Error:
             return {"message": "Database error updating password."}, 500
 
     @app.post("/forgot-password")
+    @rate_limited("forgot_password", by=("ip", "email"))
     def forgot_password():
         body = request.get_json(silent=True) or {}
         email = (body.get("email") or "").strip().lower()
@@ -237,29 +300,28 @@ def create_app() -> Flask:
             return {"message": "Email is required."}, 400
 
         try:
-            db = get_db()
-            cur = db.cursor()
-            cur.execute("SELECT id, name FROM users WHERE email = ?", (email,))
-            row = cur.fetchone()
-            if not row:
+            found = Users(get_db()).credentials(email)
+            if not found:
                 # Do not reveal user existence
                 return {"message": "If the email exists, a reset code was sent."}, 200
-            user_id, name = row
+            user_id = found[0].id
 
             # strictly 7-digit numeric code
             import random
             reset_code = str(random.randint(1000000, 9999999))
             expiry = int(datetime.now(timezone.utc).timestamp()) + 600  # 10 minutes
 
-            # Delete any existing codes for this user
-            cur.execute("DELETE FROM reset_codes WHERE user_id = ?", (user_id,))
-            
-            # Insert new code
-            cur.execute(
-                "INSERT INTO reset_codes (user_id, code, expiry) VALUES (?, ?, ?)",
-                (user_id, reset_code, expiry),
-            )
-            db.commit()
+            def replace_code(conn):  # noqa: ANN001, ANN202
+                # Delete any existing codes for this user
+                conn.execute("DELETE FROM reset_codes WHERE user_id = ?", (user_id,))
+
+                # Insert new code
+                conn.execute(
+                    "INSERT INTO reset_codes (user_id, code, expiry) VALUES (?, ?, ?)",
+                    (user_id, reset_code, expiry),
+                )
+
+            write(replace_code)
 
             # Log the code for debugging (remove in production)
             print(f"Reset code for {email}: {reset_code}")
@@ -271,6 +333,7 @@ def create_app() -> Flask:
             return {"message": "Database error during password reset."}, 500
 
     @app.post("/reset-password")
+    @rate_limited("reset_password", by=("ip", "email"))
     def reset_password():
         body = request.get_json(silent=True) or {}
         email = (body.get("email") or "").strip().lower()
@@ -301,14 +364,15 @@ def create_app() -> Flask:
             
             user_id, rc_id = row
             
-            # Update password
-            cur.execute(
-                "UPDATE users SET password_hash = ? WHERE id = ?",
-                (generate_password_hash(new_password), user_id),
-            )
-            # Invalidate used code
-            cur.execute("DELETE FROM reset_codes WHERE id = ?", (rc_id,))
-            db.commit()
+            new_hash = hash_password(new_password)
+
+            def apply_reset(conn):  # noqa: ANN001, ANN202
+                # Update password
+                Users(conn).set_password(user_id, new_hash)
+                # Invalidate used code
+                conn.execute("DELETE FROM reset_codes WHERE id = ?", (rc_id,))
+
+            write(apply_reset)
             return {"message": "Password reset successful."}, 200
         except sqlite3.Error:
             return {"message": "Database error resetting password."}, 500
@@ -316,18 +380,15 @@ def create_app() -> Flask:
     # Property Management Endpoints
     @app.post("/properties")
     @jwt_required()
+    @invalidates_listings
     def create_property():
         """Create a new property (owner only)"""
         user_id = get_jwt_identity()
         
         try:
-            db = get_db()
-            cur = db.cursor()
-            
             # Check if user is owner
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or user_row[0] != "owner":
+            user = Users(get_db()).get(user_id)
+            if not user or user.role != "owner":
                 return {"message": "Only property owners can create properties."}, 403
             
             body = request.get_json(silent=True) or {}
@@ -340,7 +401,6 @@ def create_app() -> Flask:
             
             # Prepare data
             property_data = {
-                "owner_id": user_id,
                 "title": body["title"],
                 "description": body.get("description", ""),
                 "property_type": body["property_type"],
@@ -365,138 +425,140 @@ def create_app() -> Flask:
                 "status": "available"
             }
             
-            # Insert property
-            cur.execute("""
-                INSERT INTO properties (
-                    owner_id, title, description, property_type, bedrooms, bathrooms,
-                    square_feet, rent_amount, security_deposit, lease_duration,
-                    available_date, address, city, neighborhood, latitude, longitude,
-                    furnished, parking_available, pet_policy, smoking_policy,
-                    amenities, contact_info, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                property_data["owner_id"], property_data["title"], property_data["description"],
-                property_data["property_type"], property_data["bedrooms"], property_data["bathrooms"],
-                property_data["square_feet"], property_data["rent_amount"], property_data["security_deposit"],
-                property_data["lease_duration"], property_data["available_date"], property_data["address"],
-                property_data["city"], property_data["neighborhood"], property_data["latitude"],
-                property_data["longitude"], property_data["furnished"], property_data["parking_available"],
-                property_data["pet_policy"], property_data["smoking_policy"], property_data["amenities"],
-                property_data["contact_info"], property_data["status"]
-            ))
-            
-            property_id = cur.lastrowid
-            db.commit()
-            
+            # Hashing happens before the write; the duplicate check runs inside it,
+            # so two copies posted at once still see each other
+            listing_signature = signature(property_data)
+
+            def create(conn):  # noqa: ANN001, ANN202
+                duplicates = find_duplicates(conn, listing_signature, property_data)
+                if duplicates:
+                    property_data["status"] = "pending_approval"
+                property_id = Properties(conn).insert(user_id, property_data)
+                index_listing(conn, property_id, listing_signature, duplicates)
+                return property_id, duplicates
+
+            property_id, duplicates = write(create)
+
+            if duplicates:
+                return {
+                    "message": "Property created and held for admin review: it looks like an existing listing.",
+                    "property_id": property_id,
+                    "status": "pending_approval",
+                    "possible_duplicates": [other for other, _ in duplicates],
+                }, 201
             return {"message": "Property created successfully.", "property_id": property_id}, 201
             
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
+    def with_favorites(db, tenant_id, batches):  # noqa: ANN001, ANN202
+        """Batches of property dicts with ``is_favorited`` set for ``tenant_id``"""
+        favorites = get_favorite_cache()
+        for batch in batches:
+            favorites.annotate(db, tenant_id, batch)
+            yield batch
+
     @app.get("/properties")
+    @rate_limited("properties", by=("user",))
+    @cached_listing
     def get_properties():
-        """Get all available properties with optional filters"""
+        """Get all available properties with optional filters, ``?sort=`` order and paging"""
         try:
             db = get_db()
-            cur = db.cursor()
-            
-            # Get query parameters
-            city = request.args.get("city", "")
-            min_price = request.args.get("min_price")
-            max_price = request.args.get("max_price")
-            property_type = request.args.get("property_type", "")
-            bedrooms = request.args.get("bedrooms")
-            bathrooms = request.args.get("bathrooms")
-            
-            # Build query
-            query = """
-                SELECT p.*, u.name as owner_name, u.email as owner_email,
-                       (SELECT image_url FROM property_images WHERE property_id = p.id AND is_primary = 1 LIMIT 1) as primary_image
-                FROM properties p
-                JOIN users u ON p.owner_id = u.id
-                WHERE p.status = 'available'
-            """
-            params = []
-            
-            if city:
-                query += " AND p.city LIKE ?"
-                params.append(f"%{city}%")
-            
-            if min_price:
-                query += " AND p.rent_amount >= ?"
-                params.append(float(min_price))
-            
-            if max_price:
-                query += " AND p.rent_amount <= ?"
-                params.append(float(max_price))
-            
-            if property_type:
-                query += " AND p.property_type = ?"
-                params.append(property_type)
-            
-            if bedrooms:
-                query += " AND p.bedrooms >= ?"
-                params.append(int(bedrooms))
-            
-            if bathrooms:
-                query += " AND p.bathrooms >= ?"
-                params.append(int(bathrooms))
-            
-            query += " ORDER BY p.created_at DESC"
-            
-            cur.execute(query, params)
-            properties = []
-            
-            for row in cur.fetchall():
-                property_dict = dict(row)
-                property_dict["amenities"] = json.loads(property_dict["amenities"] or "[]")
-                property_dict["contact_info"] = json.loads(property_dict["contact_info"] or "{}")
-                properties.append(property_dict)
-            
-            return {"properties": properties}, 200
-            
+            # Signed-in tenants bypass the listing cache, so per-user flags are safe here
+            tenant_id = current_tenant_id()
+            page = page_args()
+            if page:
+                properties, next_cursor = search_properties_page(db, request.args, *page)
+                if tenant_id is not None:
+                    get_favorite_cache().annotate(db, tenant_id, properties)
+                return {"properties": properties, "next_cursor": next_cursor}, 200
+            batches = search_property_batches(db, request.args, app.config["STREAM_BATCH_SIZE"])
+            if tenant_id is not None:
+                batches = with_favorites(db, tenant_id, batches)
+            return json_list_response("properties", batches)
+            
+        except ValueError as e:
+            return {"message": str(e)}, 400
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
     @app.get("/properties/<int:property_id>")
+    @counts_views
+    @cached_listing
     def get_property(property_id):
         """Get a specific property with all details and images"""
         try:
             db = get_db()
-            cur = db.cursor()
-            
-            # Get property details
-            cur.execute("""
-                SELECT p.*, u.name as owner_name, u.email as owner_email
-                FROM properties p
-                JOIN users u ON p.owner_id = u.id
-                WHERE p.id = ?
-            """, (property_id,))
-            
-            property_row = cur.fetchone()
-            if not property_row:
+            property_dict = get_property_detail(db, property_id)
+            if not property_dict:
                 return {"message": "Property not found."}, 404
-            
-            property_dict = dict(property_row)
-            property_dict["amenities"] = json.loads(property_dict["amenities"] or "[]")
-            property_dict["contact_info"] = json.loads(property_dict["contact_info"] or "{}")
-            
-            # Get property images
-            cur.execute("""
-                SELECT id, image_url, caption, is_primary, sort_order
-                FROM property_images
-                WHERE property_id = ?
-                ORDER BY is_primary DESC, sort_order ASC
-            """, (property_id,))
-            
-            images = [dict(row) for row in cur.fetchall()]
-            property_dict["images"] = images
+            tenant_id = current_tenant_id()
+            if tenant_id is not None:
+                get_favorite_cache().annotate(db, tenant_id, [property_dict])
             
             return property_dict, 200
             
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
+    @app.get("/properties/<int:property_id>/availability")
+    @cached_listing
+    def get_property_availability(property_id):
+        """A property's available_date and its booked periods from ``?since=`` (default today) on"""
+        try:
+            since = parse_date(request.args["since"], "since") if request.args.get("since") else None
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        try:
+            calendar = property_calendar(get_db(), property_id, since)
+            if calendar is None:
+                return {"message": "Property not found."}, 404
+            return calendar, 200
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    @app.get("/properties/batch")
+    @cached_listing
+    def get_properties_batch():
+        """Several properties by id (``?ids=3,1,2``) in one request, in the order asked"""
+        try:
+            ids = [int(value) for value in request.args.get("ids", "").split(",") if value.strip()]
+        except ValueError:
+            return {"message": "ids must be a comma-separated list of property ids."}, 400
+        if not ids:
+            return {"message": "ids is required."}, 400
+        if len(set(ids)) > BATCH_MAX_IDS:
+            return {"message": f"At most {BATCH_MAX_IDS} properties per request."}, 400
+        
+        try:
+            db = get_db()
+            properties = properties_by_ids(db, ids)
+            tenant_id = current_tenant_id()
+            if tenant_id is not None:
+                get_favorite_cache().annotate(db, tenant_id, properties)
+            found = {prop["id"] for prop in properties}
+            return {"properties": properties, "missing": [i for i in dict.fromkeys(ids) if i not in found]}, 200
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    @app.get("/insights/rent")
+    @cached_listing
+    def get_rent_insights():
+        """Listing count, mean and percentile rents for a market segment
+
+        Filters (city, neighborhood, property_type, bedrooms) are optional;
+        an exact bedroom count, unlike the >= filter of GET /properties.
+        """
+        filters = {column: request.args.get(column) for column in SEGMENT_KEYS}
+        try:
+            stats = rent_insights(get_db(), filters)
+        except ValueError:
+            return {"message": "bedrooms must be a whole number."}, 400
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+        return {"segment": {column: value for column, value in filters.items() if value}, **stats}, 200
+
     @app.get("/my-properties")
     @jwt_required()
     def get_my_properties():
@@ -505,80 +567,56 @@ def create_app() -> Flask:
         
         try:
             db = get_db()
-            cur = db.cursor()
             
             # Check if user is owner
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or user_row[0] != "owner":
+            user = Users(db).get(user_id)
+            if not user or user.role != "owner":
                 return {"message": "Only property owners can view their properties."}, 403
             
-            cur.execute("""
-                SELECT p.*, 
-                       (SELECT image_url FROM property_images WHERE property_id = p.id AND is_primary = 1 LIMIT 1) as primary_image
-                FROM properties p
-                WHERE p.owner_id = ?
-                ORDER BY p.created_at DESC
-            """, (user_id,))
-            
-            properties = []
-            for row in cur.fetchall():
-                property_dict = dict(row)
-                property_dict["amenities"] = json.loads(property_dict["amenities"] or "[]")
-                property_dict["contact_info"] = json.loads(property_dict["contact_info"] or "{}")
-                properties.append(property_dict)
+            page = page_args()
+            if page:
+                properties, next_cursor = owner_properties_page(db, user_id, request.args, *page)
+                return {"properties": properties, "next_cursor": next_cursor}, 200
+            properties = owner_properties(db, user_id, request.args)
             
             return {"properties": properties}, 200
             
+        except ValueError as e:
+            return {"message": str(e)}, 400
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
     @app.put("/properties/<int:property_id>")
     @jwt_required()
+    @invalidates_listings
     def update_property(property_id):
         """Update a property (owner only)"""
         user_id = get_jwt_identity()
         
         try:
-            db = get_db()
-            cur = db.cursor()
-            
             # Check if user owns this property
-            cur.execute("SELECT owner_id FROM properties WHERE id = ?", (property_id,))
-            property_row = cur.fetchone()
-            if not property_row:
+            prop = Properties(get_db()).get(property_id)
+            if not prop:
                 return {"message": "Property not found."}, 404
             
-            if property_row[0] != user_id:
+            if str(prop.owner_id) != str(user_id):
                 return {"message": "You can only update your own properties."}, 403
             
             body = request.get_json(silent=True) or {}
             
-            # Update fields
-            update_fields = []
-            params = []
-            
-            for field in ["title", "description", "property_type", "bedrooms", "bathrooms", 
-                         "square_feet", "rent_amount", "security_deposit", "lease_duration",
-                         "available_date", "address", "city", "neighborhood", "latitude", 
-                         "longitude", "furnished", "parking_available", "pet_policy", 
-                         "smoking_policy", "status"]:
-                if field in body:
-                    if field in ["amenities", "contact_info"]:
-                        update_fields.append(f"{field} = ?")
-                        params.append(json.dumps(body[field]))
-                    else:
-                        update_fields.append(f"{field} = ?")
-                        params.append(body[field])
-            
-            if not update_fields:
+            # One statement for every combination of fields
+            changes = {field: body[field] for field in Properties.UPDATABLE if field in body}
+            if not changes:
                 return {"message": "No fields to update."}, 400
-            
-            update_fields.append("updated_at = CURRENT_TIMESTAMP")
-            params.append(property_id)
-            
-            cur.execute(f"UPDATE properties SET {', '.join(update_fields)} WHERE id = ?", params)
-            db.commit()
+            if prop.status == "pending_approval" and changes.get("status", prop.status) != prop.status:
+                return {"message": "This property is awaiting admin review."}, 403
+
+            def update(conn):  # noqa: ANN001, ANN202
+                Properties(conn).update(property_id, changes)
+                if changes.keys() & {"title", "description", "address"}:
+                    reindex_listing(conn, property_id)
+
+            write(update)
             
             return {"message": "Property updated successfully."}, 200
             
@@ -587,32 +625,121 @@ def create_app() -> Flask:
 
     @app.delete("/properties/<int:property_id>")
     @jwt_required()
+    @invalidates_listings
     def delete_property(property_id):
-        """Delete a property (owner only)"""
+        """Delete a property (owner, or an admin rejecting a listing)"""
         user_id = get_jwt_identity()
         
         try:
-            db = get_db()
-            cur = db.cursor()
-            
             # Check if user owns this property
-            cur.execute("SELECT owner_id FROM properties WHERE id = ?", (property_id,))
-            property_row = cur.fetchone()
-            if not property_row:
+            prop = Properties(get_db()).get(property_id)
+            if not prop:
                 return {"message": "Property not found."}, 404
             
-            if property_row[0] != user_id:
-                return {"message": "You can only delete your own properties."}, 403
+            if str(prop.owner_id) != str(user_id):
+                user = Users(get_db()).get(user_id)
+                if not user or not user.is_admin:
+                    return {"message": "You can only delete your own properties."}, 403
             
             # Delete property (cascade will delete images and favorites)
-            cur.execute("DELETE FROM properties WHERE id = ?", (property_id,))
-            db.commit()
+            write(lambda conn: Properties(conn).delete(property_id))
             
             return {"message": "Property deleted successfully."}, 200
-            
+
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
+    @app.post("/properties/<int:property_id>/images")
+    @jwt_required()
+    @invalidates_listings
+    def upload_property_image(property_id):
+        """Upload a photo of a property (owner only); sizes are rendered in the background"""
+        user_id = get_jwt_identity()
+        if not IMAGES_AVAILABLE:
+            return {"message": "Image uploads are not available on this server."}, 503
+
+        upload = request.files.get("image")
+        if upload is None:
+            return {"message": "Image file is required."}, 400
+        data = upload.read(app.config["IMAGE_MAX_BYTES"] + 1)
+        if len(data) > app.config["IMAGE_MAX_BYTES"]:
+            return {"message": "Image file is too large."}, 413
+        try:
+            fmt = inspect_upload(data, app.config["IMAGE_MAX_PIXELS"])
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        try:
+            prop = Properties(get_db()).get(property_id)
+            if not prop:
+                return {"message": "Property not found."}, 404
+            if str(prop.owner_id) != str(user_id):
+                return {"message": "You can only add images to your own properties."}, 403
+
+            image_dir = app.config["IMAGE_DIR"]
+            key = store_original(image_dir, data, fmt)
+            # Re-uploading a photo reuses its renditions
+            status = "ready" if variants_ready(image_dir, key) else "pending"
+            image_url = f"{app.config['MEDIA_URL']}/{key}/full"
+            caption = request.form.get("caption")
+            is_primary = request.form.get("is_primary", "").lower() in ("1", "true")
+
+            def insert_image(conn):
+                has_primary = conn.execute(
+                    "SELECT 1 FROM property_images WHERE property_id = ? AND is_primary = 1", (property_id,)
+                ).fetchone()
+                primary = is_primary or not has_primary
+                if primary:
+                    conn.execute("UPDATE property_images SET is_primary = 0 WHERE property_id = ?", (property_id,))
+                cur = conn.execute("""
+                    INSERT INTO property_images (property_id, image_url, caption, is_primary, sort_order, image_key, status)
+                    VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(sort_order), -1) + 1 FROM property_images WHERE property_id = ?), ?, ?)
+                """, (property_id, image_url, caption, primary, property_id, key, status))
+                return cur.lastrowid, primary
+
+            image_id, primary = write(insert_image)
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+        if status == "pending":
+            get_image_pipeline().submit(key)
+        base_url = image_url[: -len("full")]
+        return {
+            "message": "Image uploaded successfully.",
+            "image": {
+                "id": image_id,
+                "image_url": image_url,
+                "thumbnail_url": base_url + "thumb",
+                "card_url": base_url + "card",
+                "caption": caption,
+                "is_primary": primary,
+                "status": status,
+            },
+        }, 201
+
+    @app.get("/media/<key>/<size>")
+    def serve_media(key, size):
+        """Serve one rendition of an uploaded image, WebP to browsers that accept it"""
+        if not KEY_PATTERN.match(key) or size not in IMAGE_SIZES:
+            return {"message": "Image not found."}, 404
+        image_dir = app.config["IMAGE_DIR"]
+        # Browsers that decode WebP say so explicitly; "*/*" is not enough
+        ext = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpg"
+        path = variant_path(image_dir, key, size, ext)
+        if os.path.exists(path):
+            # The key is the content hash, so this URL's bytes never change
+            response = send_file(path, mimetype=IMAGE_FORMATS[ext][1], max_age=31536000, conditional=True)
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+        else:
+            # Not rendered yet: hand out the original for a little while
+            path = original_path(image_dir, key)
+            if path is None:
+                return {"message": "Image not found."}, 404
+            response = send_file(path, max_age=60, conditional=True)
+        response.vary.add("Accept")
+        return response
+
 
 
     # Favorites Endpoints
@@ -626,24 +753,21 @@ def create_app() -> Flask:
             db = get_db()
             cur = db.cursor()
             
-            # Check if user is tenant
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
+            # Check the user is a tenant and the property exists in one lookup
+            cur.execute(
+                "SELECT role, EXISTS (SELECT 1 FROM properties WHERE id = ?) FROM users WHERE id = ?",
+                (property_id, user_id),
+            )
             user_row = cur.fetchone()
             if not user_row or user_row[0] != "tenant":
                 return {"message": "Only tenants can add favorites."}, 403
-            
-            # Check if property exists
-            cur.execute("SELECT id FROM properties WHERE id = ?", (property_id,))
-            if not cur.fetchone():
+            if not user_row[1]:
                 return {"message": "Property not found."}, 404
             
-            # Add to favorites
-            cur.execute("""
-                INSERT OR IGNORE INTO favorites (tenant_id, property_id)
-                VALUES (?, ?)
-            """, (user_id, property_id))
-            
-            db.commit()
+            # Buffered and written with the next counter flush
+            get_counters().set_favorite(user_id, property_id, True)
+            get_favorite_cache().update(user_id, property_id, True)
+
             return {"message": "Added to favorites."}, 200
             
         except sqlite3.Error as e:
@@ -656,22 +780,15 @@ def create_app() -> Flask:
         user_id = get_jwt_identity()
         
         try:
-            db = get_db()
-            cur = db.cursor()
-            
             # Check if user is tenant
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or user_row[0] != "tenant":
+            user = Users(get_db()).get(user_id)
+            if not user or user.role != "tenant":
                 return {"message": "Only tenants can remove favorites."}, 403
             
-            # Remove from favorites
-            cur.execute("""
-                DELETE FROM favorites 
-                WHERE tenant_id = ? AND property_id = ?
-            """, (user_id, property_id))
-            
-            db.commit()
+            # Buffered and written with the next counter flush
+            get_counters().set_favorite(user_id, property_id, False)
+            get_favorite_cache().update(user_id, property_id, False)
+
             return {"message": "Removed from favorites."}, 200
             
         except sqlite3.Error as e:
@@ -685,36 +802,116 @@ def create_app() -> Flask:
         
         try:
             db = get_db()
-            cur = db.cursor()
             
             # Check if user is tenant
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or user_row[0] != "tenant":
+            user = Users(db).get(user_id)
+            if not user or user.role != "tenant":
                 return {"message": "Only tenants can view favorites."}, 403
             
-            cur.execute("""
-                SELECT p.*, u.name as owner_name, u.email as owner_email,
-                       (SELECT image_url FROM property_images WHERE property_id = p.id AND is_primary = 1 LIMIT 1) as primary_image
-                FROM properties p
-                JOIN users u ON p.owner_id = u.id
-                JOIN favorites f ON p.id = f.property_id
-                WHERE f.tenant_id = ?
-                ORDER BY f.created_at DESC
-            """, (user_id,))
-            
-            properties = []
-            for row in cur.fetchall():
-                property_dict = dict(row)
-                property_dict["amenities"] = json.loads(property_dict["amenities"] or "[]")
-                property_dict["contact_info"] = json.loads(property_dict["contact_info"] or "{}")
-                properties.append(property_dict)
+            # The tenant sees their own toggles even before the next scheduled flush
+            counters = get_counters()
+            if counters.has_pending_favorites(user_id):
+                counters.flush()
+            
+            properties = tenant_favorites(db, user_id)
             
             return {"properties": properties}, 200
             
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
+    # Dashboard endpoints: everything a dashboard page needs in one request,
+    # read from one snapshot after a single token check and role lookup
+    dashboard_sections = {
+        "owner": ("properties", "rentals", "contact_requests", "messages", "users"),
+        "tenant": ("properties", "favorites", "rentals", "contact_requests", "messages", "users"),
+    }
+
+    def page_args() -> tuple[str | None, int] | None:
+        """``(cursor, limit)`` when a list is requested page by page (``?limit=``), else ``None``"""
+        return page_params(request.args)
+
+    def build_dashboard(role: str):  # noqa: ANN202
+        user_id = get_jwt_identity()
+        sections = dashboard_sections[role]
+        include = [name.strip() for name in request.args.get("include", "").split(",") if name.strip()]
+        unknown = sorted(set(include) - set(sections))
+        if unknown:
+            return {"message": f"Unknown dashboard section(s): {', '.join(unknown)}."}, 400
+        
+        try:
+            db = get_db()
+            user = Users(db).get(user_id)
+            if not user or user.role != role:
+                return {"message": f"Only {role}s can view this dashboard."}, 403
+            
+            if role == "tenant" and get_counters().has_pending_favorites(user_id):
+                get_counters().flush()
+            
+            readers = {
+                # Owners see their own listings, tenants the available ones (same filters as GET /properties)
+                "properties": (lambda: owner_properties(db, user_id, request.args)) if role == "owner"
+                              else (lambda: search_properties(db, request.args)),
+                "favorites": lambda: tenant_favorites(db, user_id),
+                "rentals": lambda: user_rentals(db, user_id, role),
+                "contact_requests": lambda: user_contact_requests(db, user_id, role),
+                "messages": lambda: user_messages(db, user_id),
+                "users": lambda: user_contacts(db, user_id, role),
+            }
+            with read_snapshot(db):
+                dashboard = {name: readers[name]() for name in include or sections}
+                # Where to start polling GET /changes to keep these lists current
+                dashboard["seq"] = current_seq(db)
+            if role == "tenant" and "properties" in dashboard:
+                get_favorite_cache().annotate(db, user_id, dashboard["properties"])
+            return dashboard, 200
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    @app.get("/dashboard/owner")
+    @jwt_required()
+    def get_owner_dashboard():
+        """An owner's properties, rentals, contact requests, messages and contacts (``?include=`` picks sections)"""
+        return build_dashboard("owner")
+
+    @app.get("/dashboard/tenant")
+    @jwt_required()
+    def get_tenant_dashboard():
+        """Available properties plus a tenant's favorites, rentals, contact requests, messages and contacts"""
+        return build_dashboard("tenant")
+
+    @app.get("/changes")
+    @jwt_required()
+    def get_changes():
+        """Records changed since ``?since=<seq>`` that the user can see, oldest first"""
+        user_id = get_jwt_identity()
+        tables = [name.strip() for name in request.args.get("tables", "").split(",") if name.strip()]
+        unknown = sorted(set(tables) - set(CHANGE_TABLES))
+        if unknown:
+            return {"message": f"Unknown table(s): {', '.join(unknown)}."}, 400
+        try:
+            since = int(request.args.get("since", "0"))
+            limit = min(int(request.args.get("limit", app.config["CHANGES_PAGE_SIZE"])), app.config["CHANGES_PAGE_SIZE"])
+        except ValueError:
+            return {"message": "since and limit must be integers."}, 400
+        if since < 0 or limit < 1:
+            return {"message": "since and limit must be positive."}, 400
+
+        try:
+            db = get_db()
+            user = Users(db).get(user_id)
+            if not user:
+                return {"message": "User not found."}, 404
+            horizon = compacted_through(db)
+            if since < horizon:
+                # The entries after ``since`` are gone: reload everything, then poll from ``seq``
+                return {"message": "Changes since that point are no longer kept; reload.", "seq": current_seq(db)}, 410
+            return read_changes(db, since, None if user.is_admin else user.id, tables or None, limit), 200
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
     # Admin endpoints
     @app.get("/admin/users")
     @jwt_required()
@@ -723,59 +920,43 @@ def create_app() -> Flask:
         try:
             # Get current user from JWT
             user_id = get_jwt_identity()
-            db = get_db()
-            cur = db.cursor()
+            users = Users(get_db())
             
             # Check if current user is admin
-            cur.execute("SELECT is_admin FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or not user_row[0]:
+            user = users.get(user_id)
+            if not user or not user.is_admin:
                 return {"message": "Admin access required."}, 403
             
             # Get all users
-            cur.execute("SELECT id, name, email, role, is_admin FROM users ORDER BY id")
-            users = []
-            for row in cur.fetchall():
-                users.append({
-                    "id": row[0],
-                    "name": row[1],
-                    "email": row[2],
-                    "role": row[3],
-                    "is_admin": bool(row[4])
-                })
-            
-            return {"users": users}, 200
+            return json_list_response("users", all_user_batches(users.db, app.config["STREAM_BATCH_SIZE"]))
         except sqlite3.Error:
             return {"message": "Database error fetching users."}, 500
 
     @app.delete("/admin/users/<int:user_id>")
     @jwt_required()
+    @invalidates_listings
     def delete_user(user_id):
         """Delete a user (admin only, cannot delete admin users)"""
         try:
             # Get current user from JWT
             current_user_id = get_jwt_identity()
-            db = get_db()
-            cur = db.cursor()
+            users = Users(get_db())
             
             # Check if current user is admin
-            cur.execute("SELECT is_admin FROM users WHERE id = ?", (current_user_id,))
-            current_user_row = cur.fetchone()
-            if not current_user_row or not current_user_row[0]:
+            current_user = users.get(current_user_id)
+            if not current_user or not current_user.is_admin:
                 return {"message": "Admin access required."}, 403
             
             # Check if target user exists and is not admin
-            cur.execute("SELECT is_admin FROM users WHERE id = ?", (user_id,))
-            target_user_row = cur.fetchone()
-            if not target_user_row:
+            target_user = users.get(user_id)
+            if not target_user:
                 return {"message": "User not found."}, 404
             
-            if target_user_row[0]:  # is_admin
+            if target_user.is_admin:
                 return {"message": "Cannot delete admin users."}, 400
             
             # Delete the user
-            cur.execute("DELETE FROM users WHERE id = ?", (user_id,))
-            db.commit()
+            write(lambda conn: Users(conn).delete(user_id))
             
             return {"message": "User deleted successfully."}, 200
         except sqlite3.Error:
@@ -788,13 +969,11 @@ def create_app() -> Flask:
         try:
             # Get current user from JWT
             current_user_id = get_jwt_identity()
-            db = get_db()
-            cur = db.cursor()
+            users = Users(get_db())
             
             # Check if current user is admin
-            cur.execute("SELECT is_admin FROM users WHERE id = ?", (current_user_id,))
-            current_user_row = cur.fetchone()
-            if not current_user_row or not current_user_row[0]:
+            current_user = users.get(current_user_id)
+            if not current_user or not current_user.is_admin:
                 return {"message": "Admin access required."}, 403
             
             # Get request body
@@ -805,18 +984,75 @@ def create_app() -> Flask:
                 return {"message": "Valid role (admin, owner, tenant) is required."}, 400
             
             # Check if target user exists
-            cur.execute("SELECT id FROM users WHERE id = ?", (user_id,))
-            if not cur.fetchone():
+            if not users.get(user_id):
                 return {"message": "User not found."}, 404
             
             # Update the user role
-            cur.execute("UPDATE users SET role = ? WHERE id = ?", (new_role, user_id))
-            db.commit()
+            write(lambda conn: Users(conn).set_role(user_id, new_role))
             
             return {"message": "User role updated successfully."}, 200
         except sqlite3.Error:
             return {"message": "Database error updating user role."}, 500
 
+    @app.get("/admin/duplicates")
+    @jwt_required()
+    def get_duplicate_listings():
+        """Listings held for review as likely duplicates, with what they resemble (admin only)"""
+        try:
+            db = get_db()
+            user = Users(db).get(get_jwt_identity())
+            if not user or not user.is_admin:
+                return {"message": "Admin access required."}, 403
+
+            return {"properties": flagged_duplicates(db)}, 200
+        except sqlite3.Error:
+            return {"message": "Database error fetching duplicate listings."}, 500
+
+    @app.patch("/admin/properties/<int:property_id>/status")
+    @jwt_required()
+    @invalidates_listings
+    def update_property_status(property_id):
+        """Approve a held listing or change any listing's status (admin only)"""
+        try:
+            user = Users(get_db()).get(get_jwt_identity())
+            if not user or not user.is_admin:
+                return {"message": "Admin access required."}, 403
+
+            body = request.get_json(silent=True) or {}
+            new_status = body.get("status")
+            if new_status not in ("available", "rented", "maintenance", "pending_approval"):
+                return {"message": "Valid status (available, rented, maintenance, pending_approval) is required."}, 400
+
+            if not Properties(get_db()).get(property_id):
+                return {"message": "Property not found."}, 404
+
+            def set_status(conn):  # noqa: ANN001, ANN202
+                Properties(conn).set_status(property_id, new_status)
+                if new_status != "pending_approval":
+                    # Reviewed: it is no longer reported as a duplicate
+                    conn.execute("DELETE FROM listing_duplicates WHERE property_id = ?", (property_id,))
+
+            write(set_status)
+
+            return {"message": "Property status updated successfully."}, 200
+        except sqlite3.Error:
+            return {"message": "Database error updating property status."}, 500
+
+    @app.get("/admin/rate-limits")
+    @jwt_required()
+    def get_rate_limit_stats():
+        """Allowed/rejected request counters per rate limit (admin only)"""
+        try:
+            user_id = get_jwt_identity()
+            # Check if current user is admin
+            user = Users(get_db()).get(user_id)
+            if not user or not user.is_admin:
+                return {"message": "Admin access required."}, 403
+            
+            return {"enabled": rate_limiter.enabled, "limits": rate_limiter.stats()}, 200
+        except sqlite3.Error:
+            return {"message": "Database error."}, 500
+
     # Rental Management Endpoints
     @app.get("/rentals")
     @jwt_required()
@@ -826,77 +1062,41 @@ def create_app() -> Flask:
         
         try:
             db = get_db()
-            cur = db.cursor()
             
             # Check user role
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user = Users(db).get(user_id)
+            if not user:
                 return {"message": "User not found."}, 404
             
-            role = user_row[0]
-            
-            if role == "owner":
-                # Get rentals where user is the owner
-                cur.execute("""
-                    SELECT r.*, p.title as property_title, u.name as tenant_name, u.email as tenant_email
-                    FROM rentals r
-                    JOIN properties p ON r.property_id = p.id
-                    JOIN users u ON r.tenant_id = u.id
-                    WHERE r.owner_id = ?
-                    ORDER BY r.created_at DESC
-                """, (user_id,))
-            elif role == "tenant":
-                # Get rentals where user is the tenant
-                cur.execute("""
-                    SELECT r.*, p.title as property_title, u.name as owner_name, u.email as owner_email
-                    FROM rentals r
-                    JOIN properties p ON r.property_id = p.id
-                    JOIN users u ON r.owner_id = u.id
-                    WHERE r.tenant_id = ?
-                    ORDER BY r.created_at DESC
-                """, (user_id,))
-            else:
+            role = user.role
+            if role not in ("owner", "tenant"):
                 return {"message": "Access denied."}, 403
             
-            rentals = []
-            for row in cur.fetchall():
-                rentals.append({
-                    "id": row[0],
-                    "property_id": row[1],
-                    "tenant_id": row[2],
-                    "owner_id": row[3],
-                    "start_date": row[4],
-                    "end_date": row[5],
-                    "rent_amount": float(row[6]) if row[6] else None,
-                    "security_deposit": float(row[7]) if row[7] else None,
-                    "status": row[8],
-                    "created_at": row[9],
-                    "property_title": row[11],
-                    "tenant_name": row[12] if role == "owner" else None,
-                    "tenant_email": row[13] if role == "owner" else None,
-                    "owner_name": row[12] if role == "tenant" else None,
-                    "owner_email": row[13] if role == "tenant" else None
-                })
+            page = page_args()
+            if page:
+                rentals, next_cursor = user_list_page(db, f"{role}_rentals", (user_id,), *page)
+                return {"rentals": rentals, "next_cursor": next_cursor}, 200
+            rentals = user_rentals(db, user_id, role)
             
             return {"rentals": rentals}, 200
+        except ValueError as e:
+            return {"message": str(e)}, 400
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
     @app.post("/rentals")
     @jwt_required()
+    @invalidates_listings
     def create_rental():
         """Create a new rental (owner only)"""
         user_id = get_jwt_identity()
         
         try:
             db = get_db()
-            cur = db.cursor()
             
             # Check if user is owner
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or user_row[0] != "owner":
+            user = Users(db).get(user_id)
+            if not user or user.role != "owner":
                 return {"message": "Only property owners can create rentals."}, 403
             
             body = request.get_json(silent=True) or {}
@@ -908,109 +1108,156 @@ def create_app() -> Flask:
                     return {"message": f"{field.replace('_', ' ').title()} is required."}, 400
             
             # Check if property exists and belongs to owner
-            cur.execute("SELECT id FROM properties WHERE id = ? AND owner_id = ?", (body["property_id"], user_id))
-            if not cur.fetchone():
+            prop = Properties(db).get(body["property_id"])
+            if not prop or prop.owner_id != user.id:
                 return {"message": "Property not found or you don't own it."}, 404
             
             # Check if tenant exists
-            cur.execute("SELECT id FROM users WHERE id = ? AND role = 'tenant'", (body["tenant_id"],))
-            if not cur.fetchone():
+            tenant = Users(db).get(body["tenant_id"])
+            if not tenant or tenant.role != "tenant":
                 return {"message": "Tenant not found."}, 404
             
-            # Create rental
-            cur.execute("""
-                INSERT INTO rentals (property_id, tenant_id, owner_id, start_date, end_date, rent_amount, security_deposit)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                body["property_id"], body["tenant_id"], user_id,
-                body["start_date"], body["end_date"], body["rent_amount"],
-                body.get("security_deposit")
-            ))
-            
-            rental_id = cur.lastrowid
-            
-            # Update property status to rented
-            cur.execute("UPDATE properties SET status = 'rented' WHERE id = ?", (body["property_id"],))
-            
-            db.commit()
+            try:
+                start_date = parse_date(body["start_date"], "start_date")
+                end_date = parse_date(body["end_date"], "end_date")
+            except ValueError as e:
+                return {"message": str(e)}, 400
+            if end_date < start_date:
+                return {"message": "end_date must not be before start_date."}, 400
+
+            def insert_rental(conn):  # noqa: ANN001, ANN202
+                # Checked in the same transaction as the insert (the triggers enforce it too)
+                conflict = overlapping_rental(conn, body["property_id"], start_date, end_date)
+                if conflict:
+                    return None, conflict
+
+                # Create rental
+                rental_id = Rentals(conn).insert(
+                    body["property_id"], body["tenant_id"], user_id,
+                    start_date, end_date, body["rent_amount"],
+                    body.get("security_deposit"),
+                )
+
+                # Update property status to rented
+                Properties(conn).set_status(body["property_id"], "rented")
+                return rental_id, None
+
+            rental_id, conflict = write(insert_rental)
+            if conflict:
+                return {
+                    "message": f"The property is already let from {conflict['start_date']} to {conflict['end_date']}.",
+                    "conflicting_rental": conflict,
+                }, 409
             return {"message": "Rental created successfully.", "rental_id": rental_id}, 201
             
+        except sqlite3.IntegrityError as e:
+            if OVERLAP_ERROR in str(e):
+                return {"message": "The property is already let for part of that period."}, 409
+            return {"message": f"Database error: {str(e)}"}, 500
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    @app.get("/rentals/reminders")
+    @jwt_required()
+    def get_lease_reminders():
+        """Pending renewal reminders for leases the current user owns or rents"""
+        user_id = get_jwt_identity()
+        
+        try:
+            db = get_db()
+            cur = tuple_cursor(db)
+            cur.execute("""
+                SELECT lr.id, lr.rental_id, lr.end_date, lr.kind, lr.created_at,
+                       p.id as property_id, p.title as property_title
+                FROM lease_reminders lr
+                JOIN rentals r ON lr.rental_id = r.id
+                JOIN properties p ON r.property_id = p.id
+                WHERE lr.status = 'pending' AND (lr.owner_id = ? OR lr.tenant_id = ?)
+                ORDER BY lr.end_date
+            """, (user_id, user_id))
+            
+            return {"reminders": reminder_rows.all(cur)}, 200
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
     @app.put("/rentals/<int:rental_id>")
     @jwt_required()
+    @invalidates_listings
     def update_rental(rental_id):
         """Update a rental (owner only)"""
         user_id = get_jwt_identity()
         
         try:
             db = get_db()
-            cur = db.cursor()
             
             # Check if user is owner
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or user_row[0] != "owner":
+            user = Users(db).get(user_id)
+            if not user or user.role != "owner":
                 return {"message": "Only property owners can update rentals."}, 403
             
             # Check if rental exists and belongs to owner
-            cur.execute("SELECT id FROM rentals WHERE id = ? AND owner_id = ?", (rental_id, user_id))
-            if not cur.fetchone():
+            rental = Rentals(db).get(rental_id)
+            if not rental or rental.owner_id != user.id:
                 return {"message": "Rental not found or you don't own it."}, 404
             
             body = request.get_json(silent=True) or {}
             
-            # Update fields
-            update_fields = []
-            update_values = []
-            
-            for field in ["start_date", "end_date", "rent_amount", "security_deposit", "status"]:
-                if field in body:
-                    update_fields.append(f"{field} = ?")
-                    update_values.append(body[field])
-            
-            if update_fields:
-                update_values.append(rental_id)
-                cur.execute(f"UPDATE rentals SET {', '.join(update_fields)} WHERE id = ?", update_values)
-                db.commit()
+            # One statement for every combination of fields
+            changes = {field: body[field] for field in Rentals.UPDATABLE if field in body}
+            try:
+                for field in ("start_date", "end_date"):
+                    if field in changes:
+                        changes[field] = parse_date(changes[field], field)
+            except ValueError as e:
+                return {"message": str(e)}, 400
+            start_date = changes.get("start_date", rental.start_date)
+            end_date = changes.get("end_date", rental.end_date)
+            if start_date and end_date and end_date < start_date:
+                return {"message": "end_date must not be before start_date."}, 400
+            if changes:
+                write(lambda conn: Rentals(conn).update(rental_id, changes))
             
             return {"message": "Rental updated successfully."}, 200
             
+        except sqlite3.IntegrityError as e:
+            if OVERLAP_ERROR in str(e):
+                return {"message": "The new dates overlap another lease on this property."}, 409
+            if DATE_ORDER_ERROR in str(e):
+                return {"message": "end_date must not be before start_date."}, 400
+            return {"message": f"Database error: {str(e)}"}, 500
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
     @app.delete("/rentals/<int:rental_id>")
     @jwt_required()
+    @invalidates_listings
     def delete_rental(rental_id):
         """Delete a rental (owner only)"""
         user_id = get_jwt_identity()
         
         try:
             db = get_db()
-            cur = db.cursor()
             
             # Check if user is owner
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or user_row[0] != "owner":
+            user = Users(db).get(user_id)
+            if not user or user.role != "owner":
                 return {"message": "Only property owners can delete rentals."}, 403
             
             # Get property_id before deleting
-            cur.execute("SELECT property_id FROM rentals WHERE id = ? AND owner_id = ?", (rental_id, user_id))
-            rental_row = cur.fetchone()
-            if not rental_row:
+            rental = Rentals(db).get(rental_id)
+            if not rental or rental.owner_id != user.id:
                 return {"message": "Rental not found or you don't own it."}, 404
             
-            property_id = rental_row[0]
+            property_id = rental.property_id
             
-            # Delete rental
-            cur.execute("DELETE FROM rentals WHERE id = ?", (rental_id,))
-            
-            # Update property status back to available
-            cur.execute("UPDATE properties SET status = 'available' WHERE id = ?", (property_id,))
-            
-            db.commit()
+            def remove_rental(conn):  # noqa: ANN001, ANN202
+                # Delete rental
+                Rentals(conn).delete(rental_id)
+
+                # Update property status back to available
+                Properties(conn).set_status(property_id, "available")
+
+            write(remove_rental)
             return {"message": "Rental deleted successfully."}, 200
             
         except sqlite3.Error as e:
@@ -1025,14 +1272,14 @@ def create_app() -> Flask:
         
         try:
             db = get_db()
-            cur = db.cursor()
             
             # Check if user is admin
-            cur.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-            user_row = cur.fetchone()
-            if not user_row or user_row[0] != "admin":
+            user = Users(db).get(user_id)
+            if not user or user.role != "admin":
                 return {"message": "Only administrators can view all rentals."}, 403
             
+            cur = tuple_cursor(db)
+            
             # Get all rentals with property and user details
             cur.execute("""
                 SELECT r.*, p.title as property_title, 
@@ -1045,27 +1292,185 @@ def create_app() -> Flask:
                 ORDER BY r.created_at DESC
             """)
             
-            rentals = []
-            for row in cur.fetchall():
-                rentals.append({
-                    "id": row[0],
-                    "property_id": row[1],
-                    "tenant_id": row[2],
-                    "owner_id": row[3],
-                    "start_date": row[4],
-                    "end_date": row[5],
-                    "rent_amount": float(row[6]) if row[6] else None,
-                    "security_deposit": float(row[7]) if row[7] else None,
-                    "status": row[8],
-                    "created_at": row[9],
-                    "property_title": row[11],
-                    "tenant_name": row[12],
-                    "tenant_email": row[13],
-                    "owner_name": row[14],
-                    "owner_email": row[15]
-                })
+            return json_list_response("rentals", admin_rental_rows.batches(cur, app.config["STREAM_BATCH_SIZE"]))
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    # Payments Ledger Endpoints
+    def ledger_scope(cur, user_id):  # noqa: ANN001, ANN202
+        """(role, SQL condition, params) limiting ledger rows to what the user may see, or None"""
+        user = Users(cur.connection).get(user_id)
+        if not user:
+            return None
+        if user.is_admin:
+            return "admin", "1 = 1", ()
+        if user.role == "owner":
+            return "owner", "owner_id = ?", (user_id,)
+        if user.role == "tenant":
+            return "tenant", "tenant_id = ?", (user_id,)
+        return None
+
+    @app.get("/invoices")
+    @jwt_required()
+    def get_invoices():
+        """Invoices for the current user (tenant: billed to them, owner: their leases, admin: all)"""
+        user_id = get_jwt_identity()
+        
+        try:
+            db = get_db()
+            cur = tuple_cursor(db)
+            scope = ledger_scope(cur, user_id)
+            if scope is None:
+                return {"message": "Access denied."}, 403
             
-            return {"rentals": rentals}, 200
+            _, condition, params = scope
+            query = f"""
+                SELECT i.*, p.title as property_title, t.name as tenant_name, o.name as owner_name
+                FROM invoices i
+                LEFT JOIN properties p ON i.property_id = p.id
+                LEFT JOIN users t ON i.tenant_id = t.id
+                LEFT JOIN users o ON i.owner_id = o.id
+                WHERE i.{condition}
+            """
+            params = list(params)
+            if request.args.get("status"):
+                query += " AND i.status = ?"
+                params.append(request.args["status"])
+            if request.args.get("period"):
+                query += " AND i.period = ?"
+                params.append(request.args["period"])
+            query += " ORDER BY i.period DESC, i.id DESC"
+            
+            cur.execute(query, params)
+            return {"invoices": invoice_rows.all(cur)}, 200
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    @app.post("/invoices/<int:invoice_id>/payments")
+    @jwt_required()
+    def create_payment(invoice_id):
+        """Record a payment against an invoice (the lease's owner or an admin)"""
+        user_id = get_jwt_identity()
+        
+        try:
+            db = get_db()
+            cur = db.cursor()
+            scope = ledger_scope(cur, user_id)
+            if scope is None or scope[0] == "tenant":
+                return {"message": "Only property owners can record payments."}, 403
+            
+            _, condition, params = scope
+            cur.execute(f"SELECT id FROM invoices WHERE id = ? AND {condition}", (invoice_id, *params))
+            if not cur.fetchone():
+                return {"message": "Invoice not found."}, 404
+            
+            body = request.get_json(silent=True) or {}
+            if not body.get("amount"):
+                return {"message": "Amount is required."}, 400
+            
+            # record_payment runs its own transaction, so it goes between write batches
+            result = write(lambda conn: record_payment(
+                conn, invoice_id, body["amount"],
+                method=body.get("method"), reference=body.get("reference"), recorded_by=user_id,
+            ), exclusive=True)
+            if result is None:
+                return {"message": "Invoice not found."}, 404
+            return {"message": "Payment recorded successfully.", **result}, 201
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    @app.get("/payments")
+    @jwt_required()
+    def get_payments():
+        """Payment history for the current user (tenant: paid, owner: received, admin: all)"""
+        user_id = get_jwt_identity()
+        
+        try:
+            db = get_db()
+            cur = tuple_cursor(db)
+            scope = ledger_scope(cur, user_id)
+            if scope is None:
+                return {"message": "Access denied."}, 403
+            
+            _, condition, params = scope
+            cur.execute(f"""
+                SELECT pay.*, i.invoice_number, i.period, p.title as property_title, t.name as tenant_name
+                FROM payments pay
+                JOIN invoices i ON pay.invoice_id = i.id
+                LEFT JOIN properties p ON i.property_id = p.id
+                LEFT JOIN users t ON pay.tenant_id = t.id
+                WHERE pay.{condition}
+                ORDER BY pay.paid_at DESC, pay.id DESC
+            """, params)
+            return {"payments": payment_rows.all(cur)}, 200
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    @app.get("/revenue")
+    @jwt_required()
+    def get_revenue():
+        """Precomputed revenue per billing month (owner: own leases, admin: per month and per owner)"""
+        user_id = get_jwt_identity()
+        
+        try:
+            db = get_db()
+            cur = tuple_cursor(db)
+            scope = ledger_scope(cur, user_id)
+            if scope is None or scope[0] == "tenant":
+                return {"message": "Access denied."}, 403
+            
+            role, condition, params = scope
+            cur.execute(f"""
+                SELECT period, SUM(invoiced) as invoiced, SUM(collected) as collected,
+                       SUM(invoice_count) as invoice_count, SUM(payment_count) as payment_count
+                FROM revenue_monthly
+                WHERE {condition}
+                GROUP BY period
+                ORDER BY period DESC
+            """, params)
+            months = monthly_revenue_rows.all(cur)
+            totals = {
+                "invoiced": round(sum(m["invoiced"] or 0 for m in months), 2),
+                "collected": round(sum(m["collected"] or 0 for m in months), 2),
+            }
+            totals["outstanding"] = round(totals["invoiced"] - totals["collected"], 2)
+            result = {"months": months, "totals": totals}
+            
+            if role == "admin":
+                cur.execute("""
+                    SELECT r.owner_id, u.name as owner_name, SUM(r.invoiced) as invoiced,
+                           SUM(r.collected) as collected, SUM(r.invoice_count) as invoice_count
+                    FROM revenue_monthly r
+                    LEFT JOIN users u ON r.owner_id = u.id
+                    GROUP BY r.owner_id
+                    ORDER BY collected DESC
+                """)
+                result["owners"] = owner_revenue_rows.all(cur)
+            return result, 200
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
+    @app.post("/admin/invoices/generate")
+    @jwt_required()
+    def generate_period_invoices():
+        """Generate a billing period's invoices for every active lease (admin only)"""
+        try:
+            user_id = get_jwt_identity()
+            # Check if current user is admin
+            user = Users(get_db()).get(user_id)
+            if not user or not user.is_admin:
+                return {"message": "Admin access required."}, 403
+            
+            body = request.get_json(silent=True) or {}
+            period = body.get("period") or datetime.now(timezone.utc).strftime("%Y-%m")
+            period_bounds(period)
+            due_day = int(os.getenv("INVOICE_DUE_DAY", "5"))
+            created = write(lambda conn: generate_invoices(conn, period, due_day=due_day), exclusive=True)
+            return {"message": f"{created} invoice(s) generated.", "period": period, "created": created}, 200
+        except ValueError as e:
+            return {"message": str(e)}, 400
         except sqlite3.Error as e:
             return {"message": f"Database error: {str(e)}"}, 500
 
@@ -1075,40 +1480,17 @@ def create_app() -> Flask:
         current_user_id = get_jwt_identity()
         
         try:
-            # Get messages sent by the current user
-            cursor = get_db().cursor()
-            cursor.execute('''
-                SELECT m.*, 
-                       u1.name as sender_name, u1.email as sender_email,
-                       u2.name as recipient_name, u2.email as recipient_email,
-                       p.title as property_title
-                FROM messages m
-                LEFT JOIN users u1 ON m.sender_id = u1.id
-                LEFT JOIN users u2 ON m.recipient_id = u2.id
-                LEFT JOIN properties p ON m.property_id = p.id
-                WHERE m.sender_id = ? OR m.recipient_id = ?
-                ORDER BY m.created_at DESC
-            ''', (current_user_id, current_user_id))
-            
-            messages = []
-            for row in cursor.fetchall():
-                messages.append({
-                    'id': row[0],
-                    'sender_id': row[1],
-                    'recipient_id': row[2],
-                    'subject': row[3],
-                    'message': row[4],
-                    'property_id': row[5],
-                    'inquiry_type': row[6],
-                    'created_at': row[7],
-                    'sender_name': row[8],
-                    'sender_email': row[9],
-                    'recipient_name': row[10],
-                    'recipient_email': row[11],
-                    'property_title': row[12]
-                })
-            
-            return jsonify({'messages': messages})
+            # Messages sent or received by the current user
+            page = page_args()
+            if page:
+                messages, next_cursor = user_list_page(get_db(), "messages", (current_user_id, current_user_id), *page)
+                return jsonify({'messages': messages, 'next_cursor': next_cursor})
+            messages = user_list_batches(
+                get_db(), "messages", (current_user_id, current_user_id), app.config["STREAM_BATCH_SIZE"]
+            )
+            return json_list_response("messages", messages)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -1119,50 +1501,17 @@ def create_app() -> Flask:
         data = request.get_json()
         
         try:
-            cursor = get_db().cursor()
-            cursor.execute('''
-                INSERT INTO messages (sender_id, recipient_id, subject, message, property_id, inquiry_type, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
-            ''', (
+            message_id = write(lambda conn: Messages(conn).insert(
                 current_user_id,
                 data.get('recipient_id'),
                 data.get('subject'),
                 data.get('message'),
                 data.get('property_id'),
-                data.get('inquiry_type', 'general')
+                data.get('inquiry_type', 'general'),
             ))
             
-            get_db().commit()
-            
             # Get the created message with details
-            cursor.execute('''
-                SELECT m.*, 
-                       u1.name as sender_name, u1.email as sender_email,
-                       u2.name as recipient_name, u2.email as recipient_email,
-                       p.title as property_title
-                FROM messages m
-                LEFT JOIN users u1 ON m.sender_id = u1.id
-                LEFT JOIN users u2 ON m.recipient_id = u2.id
-                LEFT JOIN properties p ON m.property_id = p.id
-                WHERE m.id = ?
-            ''', (cursor.lastrowid,))
-            
-            row = cursor.fetchone()
-            message = {
-                'id': row[0],
-                'sender_id': row[1],
-                'recipient_id': row[2],
-                'subject': row[3],
-                'message': row[4],
-                'property_id': row[5],
-                'inquiry_type': row[6],
-                'created_at': row[7],
-                'sender_name': row[8],
-                'sender_email': row[9],
-                'recipient_name': row[10],
-                'recipient_email': row[11],
-                'property_title': row[12]
-            }
+            message = Messages(get_db()).detail(message_id)
             
             return jsonify({'message': message}), 201
         except Exception as e:
@@ -1174,54 +1523,56 @@ def create_app() -> Flask:
         current_user_id = get_jwt_identity()
         
         try:
-            cursor = get_db().cursor()
-            
             # Get current user's role
-            cursor.execute('SELECT role FROM users WHERE id = ?', (current_user_id,))
-            current_user_role = cursor.fetchone()[0]
-            
-            # Fetch users based on role
-            if current_user_role == 'admin':
-                # Admin can see all users except themselves
-                cursor.execute('''
-                    SELECT id, name, email, role, phone
-                    FROM users 
-                    WHERE id != ?
-                    ORDER BY name
-                ''', (current_user_id,))
-            elif current_user_role == 'owner':
-                # Owners can see tenants
-                cursor.execute('''
-                    SELECT id, name, email, role, phone
-                    FROM users 
-                    WHERE role = 'tenant'
-                    ORDER BY name
-                ''')
-            elif current_user_role == 'tenant':
-                # Tenants can see owners
-                cursor.execute('''
-                    SELECT id, name, email, role, phone
-                    FROM users 
-                    WHERE role = 'owner'
-                    ORDER BY name
-                ''')
-            else:
-                return jsonify({'users': []})
-            
-            users = []
-            for row in cursor.fetchall():
-                users.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'email': row[2],
-                    'role': row[3],
-                    'phone': row[4]
-                })
+            current_user_role = Users(get_db()).get(current_user_id).role
+            
+            # Admins see everyone else, owners see tenants and tenants see owners
+            users = user_contacts(get_db(), current_user_id, current_user_role)
             
             return jsonify({'users': users})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
+    # Roles each role may look up: owners pick tenants, tenants pick owners
+    directory_roles = {"owner": ("tenant",), "tenant": ("owner",)}
+
+    @app.get("/users/search")
+    @jwt_required()
+    def search_user_directory():
+        """Typeahead over the people the user may contact (``?q=&role=&limit=&cursor=``)"""
+        user_id = get_jwt_identity()
+        query = request.args.get("q", "").strip()
+        role = request.args.get("role") or None
+        if len(query) > 100:
+            return {"message": "q is too long."}, 400
+        try:
+            limit = int(request.args.get("limit", "10"))
+        except ValueError:
+            return {"message": "limit must be an integer."}, 400
+        if limit < 1:
+            return {"message": "limit must be positive."}, 400
+
+        try:
+            db = get_db()
+            user = Users(db).get(user_id)
+            if not user:
+                return {"message": "User not found."}, 404
+            allowed = None if user.is_admin else directory_roles.get(user.role, ())
+            if role is not None:
+                if allowed is not None and role not in allowed:
+                    return {"message": f"You cannot search {role}s."}, 403
+                allowed = (role,)
+            if allowed == ():
+                return {"users": [], "next_cursor": None}, 200
+            return search_users(
+                db, query, allowed, exclude_id=user.id, cursor=request.args.get("cursor") or None,
+                limit=min(limit, USER_SEARCH_MAX_LIMIT), count=request.args.get("count", "").lower() in ("1", "true"),
+            ), 200
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        except sqlite3.Error as e:
+            return {"message": f"Database error: {str(e)}"}, 500
+
     @app.post('/contact-requests')
     @jwt_required()
     def create_contact_request():
@@ -1229,13 +1580,7 @@ def create_app() -> Flask:
         data = request.get_json()
         
         try:
-            cursor = get_db().cursor()
-            cursor.execute('''
-                INSERT INTO contact_requests (
-                    property_id, owner_id, tenant_id, tenant_name, tenant_email, 
-                    tenant_phone, message, preferred_date, inquiry_type, status, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            ''', (
+            request_id = write(lambda conn: ContactRequests(conn).insert(
                 data.get('property_id'),
                 data.get('owner_id'),
                 current_user_id,
@@ -1245,37 +1590,10 @@ def create_app() -> Flask:
                 data.get('message'),
                 data.get('preferred_date'),
                 data.get('inquiry_type', 'general'),
-                'pending'
             ))
             
-            get_db().commit()
-            
             # Get the created contact request with details
-            cursor.execute('''
-                SELECT cr.*, p.title as property_title, u.name as owner_name
-                FROM contact_requests cr
-                LEFT JOIN properties p ON cr.property_id = p.id
-                LEFT JOIN users u ON cr.owner_id = u.id
-                WHERE cr.id = ?
-            ''', (cursor.lastrowid,))
-            
-            row = cursor.fetchone()
-            contact_request = {
-                'id': row[0],
-                'property_id': row[1],
-                'owner_id': row[2],
-                'tenant_id': row[3],
-                'tenant_name': row[4],
-                'tenant_email': row[5],
-                'tenant_phone': row[6],
-                'message': row[7],
-                'preferred_date': row[8],
-                'inquiry_type': row[9],
-                'status': row[10],
-                'created_at': row[11],
-                'property_title': row[12],
-                'owner_name': row[13]
-            }
+            contact_request = ContactRequests(get_db()).detail(request_id)
             
             return jsonify({'contact_request': contact_request}), 201
         except Exception as e:
@@ -1287,54 +1605,20 @@ def create_app() -> Flask:
         current_user_id = get_jwt_identity()
         
         try:
-            cursor = get_db().cursor()
-            
             # Get current user's role
-            cursor.execute('SELECT role FROM users WHERE id = ?', (current_user_id,))
-            current_user_role = cursor.fetchone()[0]
+            current_user_role = Users(get_db()).get(current_user_id).role
             
-            if current_user_role == 'owner':
-                # Owners see contact requests for their properties
-                cursor.execute('''
-                    SELECT cr.*, p.title as property_title, u.name as tenant_name
-                    FROM contact_requests cr
-                    LEFT JOIN properties p ON cr.property_id = p.id
-                    LEFT JOIN users u ON cr.tenant_id = u.id
-                    WHERE cr.owner_id = ?
-                    ORDER BY cr.created_at DESC
-                ''', (current_user_id,))
-            else:
-                # Tenants see their own contact requests
-                cursor.execute('''
-                    SELECT cr.*, p.title as property_title, u.name as owner_name
-                    FROM contact_requests cr
-                    LEFT JOIN properties p ON cr.property_id = p.id
-                    LEFT JOIN users u ON cr.owner_id = u.id
-                    WHERE cr.tenant_id = ?
-                    ORDER BY cr.created_at DESC
-                ''', (current_user_id,))
-            
-            contact_requests = []
-            for row in cursor.fetchall():
-                contact_requests.append({
-                    'id': row[0],
-                    'property_id': row[1],
-                    'owner_id': row[2],
-                    'tenant_id': row[3],
-                    'tenant_name': row[4],
-                    'tenant_email': row[5],
-                    'tenant_phone': row[6],
-                    'message': row[7],
-                    'preferred_date': row[8],
-                    'inquiry_type': row[9],
-                    'status': row[10],
-                    'created_at': row[11],
-                    'property_title': row[12],
-                    'tenant_name': row[13] if current_user_role == 'owner' else None,
-                    'owner_name': row[13] if current_user_role != 'owner' else None
-                })
+            # Owners see requests for their properties, tenants their own
+            page = page_args()
+            if page:
+                name = "owner_contact_requests" if current_user_role == "owner" else "tenant_contact_requests"
+                contact_requests, next_cursor = user_list_page(get_db(), name, (current_user_id,), *page)
+                return jsonify({'contact_requests': contact_requests, 'next_cursor': next_cursor})
+            contact_requests = user_contact_requests(get_db(), current_user_id, current_user_role)
             
             return jsonify({'contact_requests': contact_requests})
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -1345,37 +1629,24 @@ def create_app() -> Flask:
         data = request.get_json()
         
         try:
-            cursor = get_db().cursor()
+            db = get_db()
             
             # Convert current_user_id to int for comparison
             current_user_id = int(current_user_id)
             
             # Get current user's role
-            cursor.execute('SELECT role FROM users WHERE id = ?', (current_user_id,))
-            user_result = cursor.fetchone()
-            if not user_result:
+            user = Users(db).get(current_user_id)
+            if not user:
                 return jsonify({'error': 'User not found'}), 404
-            current_user_role = user_result[0]
+            current_user_role = user.role
             
             # Verify the user owns the property for this contact request
-            cursor.execute('''
-                SELECT cr.owner_id, cr.status, cr.tenant_id
-                FROM contact_requests cr
-                WHERE cr.id = ?
-            ''', (request_id,))
-            
-            result = cursor.fetchone()
-            if not result:
+            contact_request = ContactRequests(db).get(request_id)
+            if not contact_request:
                 return jsonify({'error': 'Contact request not found'}), 404
             
-            owner_id, current_status, tenant_id = result
-            
-            # Debug logging
-            print(f"DEBUG: current_user_id={current_user_id} (type: {type(current_user_id)}), current_user_role={current_user_role}")
-            print(f"DEBUG: owner_id={owner_id} (type: {type(owner_id)}), tenant_id={tenant_id} (type: {type(tenant_id)})")
-            print(f"DEBUG: owner_id == current_user_id: {owner_id == current_user_id}")
-            print(f"DEBUG: owner_id != current_user_id: {owner_id != current_user_id}")
-            
+            owner_id, tenant_id = contact_request.owner_id, contact_request.tenant_id
+
             # Check access: owner can update any contact request for their properties
             # tenant can only update their own contact requests
             if current_user_role == 'owner':
@@ -1393,13 +1664,7 @@ def create_app() -> Flask:
             if new_status not in ['pending', 'responded', 'closed']:
                 return jsonify({'error': 'Invalid status'}), 400
             
-            cursor.execute('''
-                UPDATE contact_requests 
-                SET status = ? 
-                WHERE id = ?
-            ''', (new_status, request_id))
-            
-            get_db().commit()
+            write(lambda conn: ContactRequests(conn).set_status(request_id, new_status))
             
             return jsonify({'message': 'Status updated successfully'})
         except Exception as e:
@@ -1408,8 +1673,18 @@ def create_app() -> Flask:
     return app
 
 
-if __name__ == "__main__":
-    # Load dotenv if present (prefer backend/.env)
+def get_mail():  # noqa: ANN201
+    """Flask-Mail for the current app, imported and initialised on first use"""
+    mail = current_app.extensions.get("mail")
+    if mail is None:
+        from flask_mail import Mail
+
+        mail = Mail(current_app)
+    return mail
+
+
+def load_env() -> None:
+    """Load dotenv if present (prefer backend/.env)"""
     try:
         from dotenv import load_dotenv  # type: ignore
         import pathlib
@@ -1423,6 +1698,11 @@ if __name__ == "__main__":
     except Exception:
         pass
 
+
+if __name__ == "__main__":
+    # Development server only; production runs backend.wsgi under gunicorn
+    load_env()
+
     application = create_app()
     application.logger.info("MAIL_USERNAME=%s", application.config.get("MAIL_USERNAME"))
     application.run(host="0.0.0.0", port=int(os.getenv("PORT", "5000")))
@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import time
+
+# Hot/cold archival: messages, contact requests and leases that are past
+# their useful life move out of the main database into an attached archive
+# file (ARCHIVE_PATH, default archive.db next to the database), so the lists
+# users load every day only scan live rows. Whole lists read the live rows
+# together with the archived ones; paged list endpoints continue into the
+# archive once a cursor runs past the hot rows.
+#
+# Rows move in chunks of ARCHIVE_BATCH_SIZE in two short transactions: the
+# chunk is copied into the archive and committed, then the main rows are
+# deleted, but only those still identical to their archived copy. A crash in
+# between, or a row updated in between, leaves a row in both files, never in
+# neither; readers skip archived rows that are also hot, and the next run
+# copies them again. Each transaction holds one file's write lock for a
+# single chunk, so requests are never kept waiting long.
+
+# table -> (condition that makes a row cold, age setting, default age in days).
+# A lease stays hot while an invoice or renewal reminder still needs it.
+ARCHIVE_POLICIES = {
+    "messages": ("created_at < datetime('now', ?)", "ARCHIVE_MESSAGES_DAYS", 365),
+    "contact_requests": (
+        "status IN ('responded', 'closed') AND created_at < datetime('now', ?)",
+        "ARCHIVE_CONTACT_REQUESTS_DAYS", 90,
+    ),
+    "rentals": (
+        """status IN ('expired', 'terminated') AND end_date < date('now', ?)
+        AND NOT EXISTS (SELECT 1 FROM main.invoices i
+                        WHERE i.rental_id = rentals.id AND i.status IN ('pending', 'partial', 'overdue'))
+        AND NOT EXISTS (SELECT 1 FROM main.lease_reminders lr
+                        WHERE lr.rental_id = rentals.id AND lr.status = 'pending')""",
+        "ARCHIVE_RENTALS_DAYS", 180,
+    ),
+}
+
+# Archive indexes serve the per-user paged reads
+ARCHIVE_INDEXES = {
+    "messages": ("sender_id", "recipient_id"),
+    "contact_requests": ("owner_id", "tenant_id"),
+    "rentals": ("owner_id", "tenant_id"),
+}
+
+
+def default_archive_path(db_path: str) -> str:
+    return os.getenv("ARCHIVE_PATH") or os.path.join(os.path.dirname(os.path.abspath(db_path)), "archive.db")
+
+
+def attach_archive(db: sqlite3.Connection, archive_path: str | None = None) -> bool:
+    """Attach the archive as schema ``archive`` unless it already is; False when there is none.
+
+    Attached files open with the connection's flags, so a read-only request
+    connection reads the archive read-only.
+    """
+    if any(row[1] == "archive" for row in db.execute("PRAGMA database_list")):
+        return True
+    if archive_path is None:
+        main_path = db.execute("PRAGMA database_list").fetchone()[2]
+        if not main_path:
+            return False
+        archive_path = default_archive_path(main_path)
+    if not os.path.exists(archive_path):
+        return False
+    db.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    return True
+
+
+def _columns(db: sqlite3.Connection, schema: str, table: str) -> list[tuple[str, str, int]]:
+    return [(row[1], row[2], row[5]) for row in db.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def archived_rows(db: sqlite3.Connection, table: str) -> str:
+    """A subquery over ``archive.<table>`` with the main table's columns, in its order.
+
+    Columns a migration added to the main table since the archive was last
+    prepared read as NULL, so the result can be combined with the hot table
+    by UNION ALL.
+    """
+    archived = {name for name, _, _ in _columns(db, "archive", table)}
+    columns = ", ".join(
+        name if name in archived else f"NULL AS {name}" for name, _, _ in _columns(db, "main", table)
+    )
+    return f"(SELECT {columns} FROM archive.{table})"
+
+
+def prepare_archive(db: sqlite3.Connection, archive_path: str) -> None:
+    """Create or update the archive's tables to match the main ones."""
+    os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+    db.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    db.execute("PRAGMA archive.journal_mode=WAL")
+    for table, user_columns in ARCHIVE_INDEXES.items():
+        columns = _columns(db, "main", table)
+        archived = {name for name, _, _ in _columns(db, "archive", table)}
+        if not archived:
+            definition = ", ".join(
+                f"{name} INTEGER PRIMARY KEY" if pk else f"{name} {type_}" for name, type_, pk in columns
+            )
+            db.execute(f"CREATE TABLE archive.{table} ({definition})")
+        else:
+            # Columns added to the main table by later migrations
+            for name, type_, _ in columns:
+                if name not in archived:
+                    db.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {type_}")
+        for column in user_columns:
+            db.execute(f"CREATE INDEX IF NOT EXISTS archive.idx_{table}_{column} ON {table} ({column}, id)")
+    db.commit()
+
+
+def archive_chunk(db: sqlite3.Connection, table: str, days: int, batch_size: int) -> int:
+    """Move one chunk of cold ``table`` rows into the archive; returns how many moved."""
+    condition = ARCHIVE_POLICIES[table][0]
+    ids = [row[0] for row in db.execute(
+        f"SELECT id FROM main.{table} WHERE {condition} ORDER BY id LIMIT ?", (f"-{days} days", batch_size)
+    )]
+    if not ids:
+        return 0
+    columns = [name for name, _, _ in _columns(db, "main", table)]
+    column_list = ", ".join(columns)
+    placeholders = ", ".join("?" * len(ids))
+
+    # 1. Copy: only the archive is written
+    db.execute(
+        f"INSERT OR REPLACE INTO archive.{table} ({column_list}) "
+        f"SELECT {column_list} FROM main.{table} WHERE id IN ({placeholders})",
+        ids,
+    )
+    db.commit()
+
+    # 2. Delete the hot rows that still match their copy; only main is written
+    unchanged = " AND ".join(f"h.{name} IS a.{name}" for name in columns)
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        seq = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+        moved = db.execute(
+            f"""
+            DELETE FROM main.{table} WHERE id IN (
+                SELECT h.id FROM main.{table} h JOIN archive.{table} a ON a.id = h.id
+                WHERE h.id IN ({placeholders}) AND {unchanged}
+            )
+            """,
+            ids,
+        ).rowcount
+        # Archiving is not a deletion as far as GET /changes is concerned
+        db.execute(
+            "DELETE FROM change_log WHERE seq > ? AND table_name = ? AND op = 'delete'",
+            (seq[0] if seq else 0, table),
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return moved
+
+
+def archive_cold_rows(db: sqlite3.Connection, deadline: float, archive_path: str | None = None,
+                      batch_size: int | None = None) -> dict[str, int]:
+    """Move cold rows of every archived table, chunk by chunk, until done or ``deadline``."""
+    if archive_path is None:
+        archive_path = default_archive_path(db.execute("PRAGMA database_list").fetchone()[2])
+    batch_size = batch_size or int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+    prepare_archive(db, archive_path)
+    moved = {}
+    try:
+        for table, (_, setting, default_days) in ARCHIVE_POLICIES.items():
+            days = int(os.getenv(setting, str(default_days)))
+            moved[table] = 0
+            while time.monotonic() < deadline:
+                count = archive_chunk(db, table, days, batch_size)
+                moved[table] += count
+                if count < batch_size:
+                    break
+    finally:
+        if db.in_transaction:
+            db.rollback()
+        db.execute("DETACH DATABASE archive")
+    return moved
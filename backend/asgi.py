@@ -0,0 +1,265 @@
+"""
+Async read path for the hot public endpoints of Garissa House Rental Hub.
+
+GET /properties and GET /properties/<id> are answered by an asyncio service
+that runs its SQLite queries on a small pool of read-only reader threads, so
+thousands of slow clients can be in flight without holding a worker thread
+each. Every other request is handed to the regular Flask app. Whole-list
+GET /properties responses are streamed a batch at a time, as in Flask.
+
+Run from the project root (requires the optional uvicorn and asgiref packages):
+
+    uvicorn backend.asgi:app --workers 4
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+try:  # Support running as module or script
+    from .compression import COMPRESS_MIN_SIZE_DEFAULT, chunk_compressor, compress_body, supported_encodings
+    from .queries import get_property_detail, page_params, search_properties_page, search_property_batches
+    from .serialization import encode_json
+except Exception:  # pragma: no cover
+    from compression import COMPRESS_MIN_SIZE_DEFAULT, chunk_compressor, compress_body, supported_encodings  # type: ignore
+    from queries import get_property_detail, page_params, search_properties_page, search_property_batches  # type: ignore
+    from serialization import encode_json  # type: ignore
+
+_PROPERTY_PATH = re.compile(r"^/properties/(\d+)/?$")
+
+
+def _default_db_path() -> str:
+    return os.getenv("DATABASE_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.db")
+
+
+class ReadService:
+    """ASGI app serving the public property reads from reader threads.
+
+    ``fallback`` is another ASGI app that receives every request this
+    service does not handle itself. ``limiter`` is the Flask app's
+    RateLimiter; the property list takes from its "properties" buckets
+    exactly as the Flask view does.
+    """
+
+    def __init__(self, db_path: str | None = None, readers: int = 4, fallback=None, counters=None,  # noqa: ANN001
+                 batch_size: int = 500, limiter=None) -> None:  # noqa: ANN001
+        self.db_path = db_path or _default_db_path()
+        self.readers = readers
+        self.batch_size = batch_size
+        self.fallback = fallback
+        self.limiter = limiter
+        # The Flask app's WriteBehindBuffer, so views served here are counted too
+        self.counters = counters
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(readers, thread_name_prefix="db-reader")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    async def _read(self, query, *args):  # noqa: ANN001, ANN002, ANN202
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: query(self._connection(), *args))
+
+    def _stream_connection(self) -> sqlite3.Connection:
+        # A stream's batches are read on whichever reader thread is free, and
+        # the cursor stays open between them, so it gets its own connection
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=5.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    async def handle(self, path: str, query_string: bytes) -> tuple[int, dict]:
+        try:
+            if path in ("/properties", "/properties/"):
+                args = dict(parse_qsl(query_string.decode("latin-1")))
+                page = page_params(args)
+                properties, next_cursor = await self._read(search_properties_page, args, *page)
+                return 200, {"properties": properties, "next_cursor": next_cursor}
+            property_dict = await self._read(get_property_detail, int(_PROPERTY_PATH.match(path).group(1)))
+            if not property_dict:
+                return 404, {"message": "Property not found."}
+            if self.counters is not None:
+                self.counters.ensure_started()
+                self.counters.record_view(property_dict["id"])
+            return 200, property_dict
+        except ValueError as e:
+            return 400, {"message": str(e)}
+        except sqlite3.Error as e:
+            return 500, {"message": f"Database error: {str(e)}"}
+
+    def _handles(self, scope) -> bool:  # noqa: ANN001
+        if scope["method"] not in ("GET", "HEAD"):
+            return False
+        path = scope["path"]
+        # Signed-in callers may get per-user fields, so leave them to Flask
+        if any(name == b"authorization" for name, _ in scope["headers"]):
+            return False
+        return path in ("/properties", "/properties/") or _PROPERTY_PATH.match(path) is not None
+
+    async def __call__(self, scope, receive, send) -> None:  # noqa: ANN001
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http" or not self._handles(scope):
+            if self.fallback is None:
+                await self._respond(scope, send, 404, {"message": "Not found."})
+            else:
+                await self.fallback(scope, receive, send)
+            return
+
+        rate_headers = None
+        if scope["path"] in ("/properties", "/properties/"):
+            if self.limiter is not None and self.limiter.enabled:
+                allowed, rate_headers = await self._check_rate_limit(scope)
+                if not allowed:
+                    await self._respond(scope, send, 429, {"message": "Too many requests. Please slow down."},
+                                        rate_headers)
+                    return
+            args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+            try:
+                paged = page_params(args) is not None
+            except ValueError as e:
+                await self._respond(scope, send, 400, {"message": str(e)}, rate_headers)
+                return
+            if not paged:
+                await self._stream_properties(scope, send, args, rate_headers)
+                return
+        status, payload = await self.handle(scope["path"], scope.get("query_string", b""))
+        await self._respond(scope, send, status, payload, rate_headers)
+
+    async def _check_rate_limit(self, scope) -> tuple[bool, dict[str, str]]:  # noqa: ANN001
+        # Only anonymous callers get here, so the bucket is the client IP's,
+        # as with rate_limited(by=("user",)); a file-backed store may block
+        client = (scope.get("client") or ("unknown",))[0]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.limiter.check, "properties", [f"ip:{client}"])
+
+    async def _stream_properties(self, scope, send, args: dict,  # noqa: ANN001
+                                 rate_headers: dict[str, str] | None = None) -> None:
+        """Send the whole property list one batch at a time, like ``json_list_response``.
+
+        The first two batches are read before anything is sent, so filter and
+        query errors still get a 400/500 and a list that fits in one batch
+        goes out as an ordinary response.
+        """
+        loop = asyncio.get_running_loop()
+
+        def read(fn, *fn_args):  # noqa: ANN001, ANN002, ANN202
+            return loop.run_in_executor(self._executor, fn, *fn_args)
+
+        conn = None
+        try:
+            try:
+                conn = await read(self._stream_connection)
+                batches = await read(search_property_batches, conn, args, self.batch_size)
+                first = await read(next, batches, [])
+                second = await read(next, batches, None)
+            except ValueError as e:
+                await self._respond(scope, send, 400, {"message": str(e)}, rate_headers)
+                return
+            except sqlite3.Error as e:
+                await self._respond(scope, send, 500, {"message": f"Database error: {str(e)}"}, rate_headers)
+                return
+            if second is None:
+                await self._respond(scope, send, 200, {"properties": first}, rate_headers)
+                return
+
+            headers = self._headers(rate_headers)
+            encoding = self._encoding(scope)
+            if encoding:
+                compress, finish = chunk_compressor(encoding)
+                headers.append((b"content-encoding", encoding.encode()))
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            if scope["method"] == "HEAD":
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            async def send_chunk(chunk: bytes) -> None:
+                if encoding:
+                    chunk = compress(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+            await send_chunk(b'{"properties":[' + encode_json(first)[1:-1])
+            separator = b"," if first else b""
+            items = second
+            while items is not None:
+                if items:
+                    await send_chunk(separator + encode_json(items)[1:-1])
+                    separator = b","
+                items = await read(next, batches, None)
+            tail = b"]}\n"
+            await send({"type": "http.response.body", "body": compress(tail) + finish() if encoding else tail})
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _encoding(self, scope) -> str | None:  # noqa: ANN001
+        """The preferred encoding the client accepts, if any."""
+        accepted = b",".join(value for name, value in scope.get("headers", []) if name == b"accept-encoding")
+        return next((encoding for encoding in supported_encodings() if encoding.encode() in accepted), None)
+
+    def _headers(self, extra: dict[str, str] | None = None) -> list[tuple[bytes, bytes]]:
+        headers = [(b"content-type", b"application/json"), (b"vary", b"Accept-Encoding")]
+        headers.extend((name.lower().encode(), value.encode()) for name, value in (extra or {}).items())
+        return headers
+
+    async def _respond(self, scope, send, status: int, payload: dict,  # noqa: ANN001
+                       extra_headers: dict[str, str] | None = None) -> None:
+        body = encode_json(payload) + b"\n"
+        headers = self._headers(extra_headers)
+        encoding = self._encoding(scope)
+        if encoding and len(body) >= COMPRESS_MIN_SIZE_DEFAULT:
+            body = compress_body(body, encoding)
+            headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+    async def _lifespan(self, receive, send) -> None:  # noqa: ANN001
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app(flask_app=None, readers: int | None = None) -> ReadService:  # noqa: ANN001
+    """The read service mounted in front of the Flask app (wrapped with asgiref)."""
+    try:
+        from asgiref.wsgi import WsgiToAsgi
+    except ImportError as e:  # pragma: no cover
+        raise RuntimeError("Mounting the Flask app under ASGI requires `pip install asgiref`.") from e
+
+    if flask_app is None:
+        try:
+            from .app import create_app, load_env
+        except Exception:  # pragma: no cover
+            from app import create_app, load_env  # type: ignore
+        load_env()
+        flask_app = create_app()
+
+    readers = readers or int(os.getenv("ASYNC_READERS", "4"))
+    return ReadService(flask_app.config.get("DATABASE_PATH"), readers=readers, fallback=WsgiToAsgi(flask_app),
+                       counters=flask_app.extensions.get("counters"),
+                       batch_size=flask_app.config.get("STREAM_BATCH_SIZE", 500),
+                       limiter=flask_app.extensions.get("rate_limiter"))
+
+
+def __getattr__(name: str):  # noqa: ANN202
+    # `uvicorn backend.asgi:app` builds the app on first access, so importing
+    # ReadService alone (e.g. from the benchmarks) stays cheap.
+    if name == "app":
+        globals()["app"] = create_asgi_app()
+        return globals()["app"]
+    raise AttributeError(name)
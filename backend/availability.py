@@ -0,0 +1,121 @@
+import sqlite3
+from datetime import date
+
+# Availability calendar: a property is free from its available_date (or
+# straight away without one) except over every active or pending lease on it,
+# start_date to end_date inclusive. Leases that ended (expired or
+# terminated) drop out of the partial index idx_rentals_booked (schema v11),
+# so checking one property costs an index seek past its ended leases to the
+# few current ones, whatever its lease history.
+#
+# Triggers on rentals refuse a booking that overlaps another on the same
+# property, inside the writing transaction, so two leases created at once
+# cannot both win; create_rental checks first to report the conflict. An
+# interval that ends before it starts overlaps nothing, so further triggers
+# (schema v13) refuse those outright.
+
+BOOKED = "status IN ('active', 'pending')"  # the partial index's condition, repeated so it is used
+OVERLAP_ERROR = "rental overlaps an existing lease"
+DATE_ORDER_ERROR = "rental ends before it starts"
+
+# Properties with no booking overlapping [?, ?] (correlated on p.id)
+NOT_BOOKED_BETWEEN = f"""NOT EXISTS (
+            SELECT 1 FROM rentals r
+            WHERE r.property_id = p.id AND r.{BOOKED} AND r.end_date >= ? AND r.start_date <= ?
+        )"""
+
+
+def parse_date(value: str, name: str) -> str:
+    """``value`` as an ISO ``YYYY-MM-DD`` string; ``ValueError`` naming ``name`` otherwise."""
+    try:
+        return date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise ValueError(f"{name} must be a date like 2025-07-01.") from None
+
+
+def date_range(start: str | None, end: str | None) -> tuple[str, str] | None:
+    """The (from, to) of an ``available_from``/``available_to`` filter, or None without one.
+
+    Either end may be left out: ``from`` alone asks for that move-in day,
+    ``to`` alone for today until then. Raises ``ValueError`` for bad dates.
+    """
+    if not start and not end:
+        return None
+    start = parse_date(start, "available_from") if start else date.today().isoformat()
+    end = parse_date(end, "available_to") if end else start
+    if end < start:
+        raise ValueError("available_to must not be before available_from.")
+    return start, end
+
+
+def overlapping_rental(db: sqlite3.Connection, property_id: int, start: str, end: str,
+                       exclude_id: int | None = None) -> dict | None:
+    """The first active or pending lease on ``property_id`` overlapping [start, end], if any."""
+    query = f"""
+        SELECT id, start_date, end_date, status FROM rentals
+        WHERE property_id = ? AND {BOOKED} AND end_date >= ? AND start_date <= ?
+    """
+    params: list = [property_id, start, end]
+    if exclude_id is not None:
+        query += " AND id != ?"
+        params.append(exclude_id)
+    row = db.execute(query + " ORDER BY end_date LIMIT 1", params).fetchone()
+    return dict(zip(("id", "start_date", "end_date", "status"), row)) if row else None
+
+
+def property_calendar(db: sqlite3.Connection, property_id: int, since: str | None = None) -> dict | None:
+    """When a property is free: its available_date and the booked periods ending on or after ``since``."""
+    row = db.execute("SELECT available_date, status FROM properties WHERE id = ?", (property_id,)).fetchone()
+    if row is None:
+        return None
+    since = since or date.today().isoformat()
+    booked = [
+        {"start_date": start, "end_date": end}
+        for start, end in db.execute(
+            f"""
+            SELECT start_date, end_date FROM rentals
+            WHERE property_id = ? AND {BOOKED} AND end_date >= ?
+            ORDER BY start_date
+            """,
+            (property_id, since),
+        )
+    ]
+    return {"property_id": property_id, "available_date": row[0], "status": row[1], "booked": booked}
+
+
+def create_booking_guards(cur: sqlite3.Cursor) -> None:
+    """Interval index and overlap triggers on rentals (schema v11)."""
+    cur.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_rentals_booked ON rentals (property_id, end_date, start_date) WHERE {BOOKED}"
+    )
+    for name, event, other in (
+        ("insert", "INSERT", ""),
+        ("update", "UPDATE OF property_id, start_date, end_date, status", " AND r.id != NEW.id"),
+    ):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS rentals_no_overlap_{name} BEFORE {event} ON rentals
+            WHEN NEW.{BOOKED}
+            BEGIN
+                SELECT RAISE(ABORT, '{OVERLAP_ERROR}') WHERE EXISTS (
+                    SELECT 1 FROM rentals r
+                    WHERE r.property_id = NEW.property_id AND r.{BOOKED}
+                      AND r.end_date >= NEW.start_date AND r.start_date <= NEW.end_date{other}
+                );
+            END
+            """
+        )
+
+
+def create_date_order_guards(cur: sqlite3.Cursor) -> None:
+    """Triggers refusing leases whose end_date is before their start_date (schema v13)."""
+    for name, event in (("insert", "INSERT"), ("update", "UPDATE OF start_date, end_date")):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS rentals_date_order_{name} BEFORE {event} ON rentals
+            WHEN NEW.end_date < NEW.start_date
+            BEGIN
+                SELECT RAISE(ABORT, '{DATE_ORDER_ERROR}');
+            END
+            """
+        )
@@ -0,0 +1,248 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+
+try:  # Support running as module or script
+    from .archive import default_archive_path
+except Exception:  # pragma: no cover
+    from archive import default_archive_path  # type: ignore
+
+# Online snapshots of the live database through SQLite's backup API, taken
+# while requests keep reading and writing. Each snapshot is a gzipped,
+# self-contained database file next to a JSON manifest holding its SHA-256.
+# When the archive database (backend.archive) exists it is snapshotted with
+# it into a companion file listed in the same manifest, and the two are
+# restored together.
+
+SNAPSHOT_PREFIX = "garissa-"
+SNAPSHOT_SUFFIX = ".db.gz"
+ARCHIVE_SUFFIX = ".archive.gz"
+
+
+def default_backup_dir() -> str:
+    return os.getenv("BACKUP_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "backups")
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_path(snapshot: str) -> str:
+    return snapshot[: -len(SNAPSHOT_SUFFIX)] + ".json"
+
+
+def _archive_snapshot_path(snapshot: str) -> str:
+    return snapshot[: -len(SNAPSHOT_SUFFIX)] + ARCHIVE_SUFFIX
+
+
+def copy_database(source: sqlite3.Connection, dest_path: str, pages: int = 0, sleep: float = 0.005) -> None:
+    """Copy ``source`` into a standalone file ``pages`` pages per step.
+
+    ``pages=0`` picks the step size from the journal mode. In WAL mode the
+    copy reads from one snapshot in a single step: WAL readers never block
+    writers, while a stepped copy starts over whenever another connection
+    writes and may never finish on a busy site. With a rollback journal the
+    read lock does block writers, so the copy goes 256 pages at a time and
+    sleeps in between to let them through.
+    """
+    if not pages:
+        wal = source.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        pages = -1 if wal else 256
+    dest = sqlite3.connect(dest_path)
+    try:
+        source.backup(dest, pages=pages, sleep=sleep)
+        # The copy inherits WAL mode; switch back so the file stands alone
+        dest.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dest.close()
+
+
+def list_snapshots(backup_dir: str) -> list[str]:
+    """Snapshot files in ``backup_dir``, oldest first (names sort by time)."""
+    if not os.path.isdir(backup_dir):
+        return []
+    return sorted(
+        os.path.join(backup_dir, name) for name in os.listdir(backup_dir)
+        if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)
+    )
+
+
+def rotate_snapshots(backup_dir: str, keep: int) -> list[str]:
+    """Delete all but the newest ``keep`` snapshots; returns the removed files."""
+    snapshots = list_snapshots(backup_dir)
+    removed = snapshots[: max(len(snapshots) - keep, 0)] if keep > 0 else []
+    for snapshot in removed:
+        os.remove(snapshot)
+        for companion in (_manifest_path(snapshot), _archive_snapshot_path(snapshot)):
+            if os.path.exists(companion):
+                os.remove(companion)
+    return removed
+
+
+def _snapshot_file(db_path: str, snapshot: str, pages: int, sleep: float) -> dict:
+    """Copy ``db_path`` into the gzipped file ``snapshot``; returns its manifest entry."""
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(snapshot)) as tmp:
+        raw_path = os.path.join(tmp, "snapshot.db")
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            copy_database(source, raw_path, pages=pages, sleep=sleep)
+        finally:
+            source.close()
+
+        copy = sqlite3.connect(raw_path)
+        try:
+            schema_version = copy.execute("PRAGMA user_version").fetchone()[0]
+            page_count = copy.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            copy.close()
+
+        # Write under a temporary name so a crash never leaves a truncated snapshot
+        partial = snapshot + ".partial"
+        with open(raw_path, "rb") as src, gzip.open(partial, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        raw_size = os.path.getsize(raw_path)
+    os.replace(partial, snapshot)
+    return {
+        "schema_version": schema_version,
+        "page_count": page_count,
+        "size": raw_size,
+        "compressed_size": os.path.getsize(snapshot),
+        "sha256": _sha256(snapshot),
+    }
+
+
+def create_snapshot(db_path: str, backup_dir: str, pages: int = 0, sleep: float = 0.005,
+                    keep: int = 7, label: str = "", archive_path: str | None = None) -> dict:
+    """Back up ``db_path`` (and its archive, if any) while it stays in use and return the snapshot's manifest."""
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    name = f"{SNAPSHOT_PREFIX}{stamp}{'-' + label if label else ''}"
+    snapshot = os.path.join(backup_dir, name + SNAPSHOT_SUFFIX)
+    archive_path = archive_path or default_archive_path(db_path)
+
+    started = time.perf_counter()
+    main = _snapshot_file(db_path, snapshot, pages, sleep)
+    # The main file goes first: rows are copied into the archive before they
+    # leave the main database, so one moved in between lands in both
+    # snapshots (the hot copy wins) rather than in neither
+    archive = None
+    if os.path.exists(archive_path):
+        archive_snapshot = _archive_snapshot_path(snapshot)
+        archive = {"snapshot": os.path.basename(archive_snapshot),
+                   **_snapshot_file(archive_path, archive_snapshot, pages, sleep)}
+
+    manifest = {
+        "snapshot": os.path.basename(snapshot),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": os.path.abspath(db_path),
+        **main,
+        "archive": archive,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    with open(_manifest_path(snapshot), "w") as f:
+        json.dump(manifest, f, indent=2)
+    manifest["removed"] = [os.path.basename(path) for path in rotate_snapshots(backup_dir, keep)]
+    return manifest
+
+
+def _extract(snapshot: str, dest_path: str) -> None:
+    with gzip.open(snapshot, "rb") as src, open(dest_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+
+
+def _check_file(snapshot: str, sha256: str | None) -> dict:
+    """Checksum and integrity check of one gzipped database file."""
+    result = {"ok": False}
+    if not os.path.exists(snapshot):
+        result["error"] = f"{os.path.basename(snapshot)} missing"
+        return result
+    if _sha256(snapshot) != sha256:
+        result["error"] = f"checksum mismatch in {os.path.basename(snapshot)}"
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = os.path.join(tmp, "verify.db")
+        try:
+            _extract(snapshot, raw_path)
+        except (OSError, EOFError) as e:
+            result["error"] = f"cannot decompress: {e}"
+            return result
+        conn = sqlite3.connect(raw_path)
+        try:
+            integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+            result["schema_version"] = conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            integrity = str(e)
+        finally:
+            conn.close()
+
+    result["integrity"] = integrity
+    result["ok"] = integrity == "ok"
+    return result
+
+
+def verify_snapshot(snapshot: str) -> dict:
+    """Check a snapshot's checksums against its manifest and run an integrity check on its files."""
+    result = {"snapshot": os.path.basename(snapshot), "ok": False}
+    try:
+        with open(_manifest_path(snapshot)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        result["error"] = "manifest missing or unreadable"
+        return result
+
+    result.update(_check_file(snapshot, manifest.get("sha256")))
+    result["archive"] = manifest.get("archive")
+    if result["ok"] and result["archive"]:
+        archive = _check_file(_archive_snapshot_path(snapshot), result["archive"].get("sha256"))
+        if not archive["ok"]:
+            result.update(ok=False, error=archive.get("error") or f"archive: {archive['integrity']}")
+    return result
+
+
+def _restore_file(snapshot: str, db_path: str, pages: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = os.path.join(tmp, "restore.db")
+        _extract(snapshot, raw_path)
+        source = sqlite3.connect(raw_path)
+        dest = sqlite3.connect(db_path, timeout=30)
+        try:
+            source.backup(dest, pages=pages)
+            dest.execute("PRAGMA journal_mode=WAL")
+        finally:
+            dest.close()
+            source.close()
+
+
+def restore_snapshot(snapshot: str, db_path: str, pages: int = -1, archive_path: str | None = None) -> dict:
+    """Replace the contents of ``db_path`` and its archive with a verified snapshot.
+
+    The data is written through the backup API into the existing files, so
+    their WALs stay consistent and connections opened afterwards see the
+    restored data. Writers are blocked while the copy runs. A snapshot taken
+    before there was an archive removes the current archive file, whose rows
+    would not belong with the restored database.
+    """
+    check = verify_snapshot(snapshot)
+    if not check["ok"]:
+        raise ValueError(f"Snapshot {check['snapshot']} failed verification: {check.get('error') or check.get('integrity')}")
+
+    archive_path = archive_path or default_archive_path(db_path)
+    _restore_file(snapshot, db_path, pages)
+    if check["archive"]:
+        _restore_file(_archive_snapshot_path(snapshot), archive_path, pages)
+    else:
+        for path in (archive_path, f"{archive_path}-wal", f"{archive_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+    return check
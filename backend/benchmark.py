@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the Garissa House Rental Hub backend.
+Run from the project root:  python -m backend.benchmark <name>
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+try:  # Support running as module or script
+    from .asgi import ReadService
+    from .backup import create_snapshot
+    from .models import MIGRATIONS, migrate, schema_version, seed_admin_user
+    from .passwords import PasswordHasher
+    from .queries import owner_properties_page, search_properties_page
+    from .repositories import Properties, Users
+    from .sorting import SORT_MODES
+    from .serialization import PROPERTY_CONVERTERS, FastJSONProvider, RowMapper, tuple_cursor
+    from .writer import WriteQueue
+except Exception:  # pragma: no cover
+    from asgi import ReadService  # type: ignore
+    from backup import create_snapshot  # type: ignore
+    from models import MIGRATIONS, migrate, schema_version, seed_admin_user  # type: ignore
+    from passwords import PasswordHasher  # type: ignore
+    from queries import owner_properties_page, search_properties_page  # type: ignore
+    from repositories import Properties, Users  # type: ignore
+    from sorting import SORT_MODES  # type: ignore
+    from serialization import PROPERTY_CONVERTERS, FastJSONProvider, RowMapper, tuple_cursor  # type: ignore
+    from writer import WriteQueue  # type: ignore
+
+
+def _timeit(fn, repeat: int) -> float:
+    """Best-of-N wall time for one call, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _report(title: str, results: list[tuple[str, float]]) -> None:
+    print(f"\n{title}")
+    baseline = results[0][1]
+    for label, ms in results:
+        print(f"   {label:<40} {ms:9.2f} ms   x{baseline / ms:5.2f}")
+
+
+def _sample_db(rows: int) -> sqlite3.Connection:
+    """In-memory database with ``rows`` listings shaped like ``properties``."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        """
+        CREATE TABLE properties (
+            id INTEGER PRIMARY KEY, owner_id INTEGER, title TEXT, description TEXT,
+            property_type TEXT, bedrooms INTEGER, bathrooms INTEGER, square_feet INTEGER,
+            rent_amount DECIMAL(10,2), security_deposit DECIMAL(10,2), lease_duration TEXT,
+            available_date DATE, address TEXT, city TEXT, neighborhood TEXT,
+            latitude REAL, longitude REAL, furnished BOOLEAN, parking_available BOOLEAN,
+            pet_policy TEXT, smoking_policy TEXT, amenities TEXT, contact_info TEXT,
+            status TEXT, created_at TIMESTAMP, updated_at TIMESTAMP
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO properties VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                i, i % 50, f"Listing {i}", "Spacious family home near the market " * 3,
+                "house", 1 + i % 5, 1 + i % 3, 600 + i, 15000 + i, 15000, "1 Year",
+                "2025-09-01", f"Plot {i}", "Garissa", "Bulla Iftin", 0.45, 39.65, i % 2, 1,
+                "No Pets", "Not Allowed", json.dumps(["Water", "Parking", "Security"]),
+                json.dumps({"phone": "0700000000", "preferred_contact": "phone"}),
+                "available", "2025-08-30 13:05:45", "2025-08-30 13:05:45",
+            )
+            for i in range(rows)
+        ],
+    )
+    return conn
+
+
+def bench_serialization(args: argparse.Namespace) -> None:
+    """Row mapping + JSON encoding of a ``GET /properties`` sized payload."""
+    conn = _sample_db(args.rows)
+    query = "SELECT * FROM properties ORDER BY id"
+
+    stdlib_app = Flask("bench_stdlib")
+    fast_app = Flask("bench_fast")
+    fast_app.json = FastJSONProvider(fast_app)
+    mapper = RowMapper(converters=PROPERTY_CONVERTERS)
+
+    def legacy() -> None:
+        cur = conn.cursor()
+        cur.execute(query)
+        properties = []
+        for row in cur.fetchall():
+            property_dict = dict(row)
+            property_dict["amenities"] = json.loads(property_dict["amenities"] or "[]")
+            property_dict["contact_info"] = json.loads(property_dict["contact_info"] or "{}")
+            properties.append(property_dict)
+        stdlib_app.json.response({"properties": properties}).get_data()
+
+    def mapped_stdlib() -> None:
+        cur = tuple_cursor(conn)
+        cur.execute(query)
+        stdlib_app.json.response({"properties": mapper.all(cur)}).get_data()
+
+    def mapped_fast() -> None:
+        cur = tuple_cursor(conn)
+        cur.execute(query)
+        fast_app.json.response({"properties": mapper.all(cur)}).get_data()
+
+    with stdlib_app.app_context():
+        results = [("dict(row) + stdlib provider", _timeit(legacy, args.repeat))]
+        results.append(("RowMapper + stdlib provider", _timeit(mapped_stdlib, args.repeat)))
+    with fast_app.app_context():
+        label = "RowMapper + orjson provider" if fast_app.json.use_orjson else "RowMapper + fast provider (no orjson)"
+        results.append((label, _timeit(mapped_fast, args.repeat)))
+    _report(f"GET /properties serialization, {args.rows} rows", results)
+
+
+def bench_passwords(args: argparse.Namespace) -> None:
+    """Login (hash verification) throughput, inline vs. the hashing process pool."""
+    method = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    logins = max(args.rows // 100, 8)
+    cores = os.cpu_count() or 1
+    stored = PasswordHasher(method).hash("password123")
+
+    print(f"\nLogin throughput, {logins} logins, {method}, {cores} cores")
+    for workers in sorted({0, 1, min(2, cores), cores}):
+        hasher = PasswordHasher(method, workers=workers, max_pending=logins, wait_timeout=60)
+        hasher.verify(stored, "password123")  # warm the pool
+        # Request threads submit concurrently, like a burst of /login calls
+        with ThreadPoolExecutor(max_workers=max(workers, 1) * 2) as requests_pool:
+            start = time.perf_counter()
+            list(requests_pool.map(lambda _: hasher.verify(stored, "password123"), range(logins)))
+            elapsed = time.perf_counter() - start
+        hasher.shutdown()
+        used = max(workers, 1)
+        label = "inline" if not workers else f"pool, {workers} worker(s)"
+        print(f"   {label:<24} {logins / elapsed:8.1f} logins/s   {logins / elapsed / used:8.1f} per core")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _load(url: str, clients: int, duration: float) -> tuple[int, int]:
+    """Hammer ``url`` from ``clients`` threads for ``duration`` seconds."""
+    deadline = time.perf_counter() + duration
+    counts = {"ok": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def client() -> None:
+        ok = failed = 0
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(url, timeout=10) as response:
+                    response.read()
+                ok += 1
+            except Exception:
+                failed += 1
+        with lock:
+            counts["ok"] += ok
+            counts["failed"] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts["ok"], counts["failed"]
+
+
+def bench_serving(args: argparse.Namespace) -> None:
+    """GET /properties throughput: Flask dev server vs. gunicorn (backend.wsgi)."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_PATH=os.path.join(tmp, "bench.db"),
+            RATE_LIMIT_ENABLED="false",
+            LISTING_CACHE_TTL="0",
+            PASSWORD_HASH_WORKERS="0",
+        )
+        # Boot once to create the schema, then fill it with listings
+        subprocess.run([sys.executable, "-c", "from backend.app import create_app; create_app()"],
+                       cwd=project_root, env=env, check=True, capture_output=True)
+        conn = sqlite3.connect(env["DATABASE_PATH"])
+        conn.executemany(
+            """INSERT INTO properties (owner_id, title, description, property_type, bedrooms, bathrooms,
+                   rent_amount, address, city, amenities, contact_info) VALUES (1, ?, ?, 'house', 3, 2, ?, ?, 'Garissa', ?, '{}')""",
+            [(f"Listing {i}", "Family home " * 10, 15000 + i, f"Plot {i}", '["Water", "Parking"]') for i in range(args.rows)],
+        )
+        conn.commit()
+        conn.close()
+
+        servers = {
+            "flask dev server": [sys.executable, "-m", "backend.app"],
+            "gunicorn (backend.wsgi)": [sys.executable, "-m", "gunicorn", "-c", "backend/gunicorn.conf.py",
+                                        "--access-logfile", "/dev/null", "backend.wsgi:app"],
+        }
+        print(f"\nGET /properties?city=Garissa, {args.rows} listings, {args.clients} clients, {args.duration:.0f}s")
+        for label, command in servers.items():
+            port = _free_port()
+            server_env = dict(env, PORT=str(port), BIND=f"127.0.0.1:{port}")
+            server = subprocess.Popen(command, cwd=project_root, env=server_env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                base = f"http://127.0.0.1:{port}"
+                for _ in range(100):
+                    try:
+                        urllib.request.urlopen(base + "/health", timeout=1).read()
+                        break
+                    except Exception:
+                        time.sleep(0.1)
+                ok, failed = _load(base + "/properties?city=Garissa", args.clients, args.duration)
+                print(f"   {label:<26} {ok / args.duration:8.1f} req/s   {failed} failed")
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+
+_STARTUP_PROBE = """
+import time
+start = time.perf_counter()
+import backend.app
+imported = time.perf_counter()
+backend.app.create_app()
+booted = time.perf_counter()
+print((imported - start) * 1000, (booted - imported) * 1000)
+"""
+
+
+def bench_startup(args: argparse.Namespace) -> None:
+    """Worker spawn cost: importing backend.app and running create_app() in a fresh interpreter."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        env = dict(os.environ, DATABASE_PATH=db_path, PASSWORD_HASH_WORKERS="0")
+        subprocess.run([sys.executable, "-m", "backend.manage", "bootstrap"], cwd=project_root, env=env,
+                       check=True, capture_output=True)
+
+        best_import = best_boot = float("inf")
+        for _ in range(args.repeat):
+            out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE], cwd=project_root, env=env,
+                                 check=True, capture_output=True, text=True).stdout.split()
+            best_import = min(best_import, float(out[-2]))
+            best_boot = min(best_boot, float(out[-1]))
+
+        # What every boot used to do vs. the version check it does now
+        conn = sqlite3.connect(db_path)
+
+        def legacy_boot() -> None:
+            for step in MIGRATIONS:
+                step(conn.cursor())
+            conn.commit()
+            seed_admin_user(conn)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            full = _timeit(legacy_boot, args.repeat)
+        check = _timeit(lambda: schema_version(conn), args.repeat)
+        conn.close()
+
+    print("\nCold start (best of %d fresh interpreters)" % args.repeat)
+    print(f"   import backend.app           {best_import:9.2f} ms")
+    print(f"   create_app()                 {best_boot:9.2f} ms")
+    _report("Per-boot schema work on an up-to-date database", [
+        ("init_db() + seed_admin_user()", full),
+        ("ensure_schema() version check", check),
+    ])
+
+
+def _listing_db(path: str, rows: int) -> None:
+    """A migrated database at ``path`` holding ``rows`` available listings."""
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_admin_user(conn)
+    conn.executemany(
+        """INSERT INTO properties (owner_id, title, description, property_type, bedrooms, bathrooms,
+               rent_amount, address, city, amenities, contact_info) VALUES (1, ?, ?, 'house', 3, 2, ?, ?, 'Garissa', ?, '{}')""",
+        [(f"Listing {i}", "Family home " * 10, 15000 + i, f"Plot {i}", '["Water", "Parking"]') for i in range(rows)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def bench_async(args: argparse.Namespace) -> None:
+    """Concurrent GET /properties/<id> with slow clients: async read service vs. WSGI threads."""
+    threads = 4
+    latency = args.latency / 1000
+    requests_total = args.clients * 10
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _listing_db(db_path, args.rows)
+        paths = [f"/properties/{1 + i % args.rows}" for i in range(requests_total)]
+
+        # WSGI: each request holds one of the worker's threads until the slow client is served
+        os.environ.update(DATABASE_PATH=db_path, RATE_LIMIT_ENABLED="false", LISTING_CACHE_TTL="0")
+        from backend.app import create_app
+
+        flask_app = create_app()
+        client = flask_app.test_client()
+        in_flight = peak = 0
+        lock = threading.Lock()
+
+        def wsgi_request(path: str) -> None:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            client.get(path).get_data()
+            time.sleep(latency)  # sending to a slow mobile client
+            with lock:
+                in_flight -= 1
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(wsgi_request, paths))
+        wsgi_elapsed, wsgi_peak = time.perf_counter() - start, peak
+
+        # ASGI: slow clients only hold a coroutine; DB work shares the reader threads
+        service = ReadService(db_path, readers=threads)
+        in_flight = peak = 0
+
+        async def asgi_request(path: str) -> None:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+
+            async def receive() -> dict:
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message: dict) -> None:
+                if message["type"] == "http.response.body":
+                    await asyncio.sleep(latency)
+
+            scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+            await service(scope, receive, send)
+            in_flight -= 1
+
+        async def run_async() -> None:
+            semaphore = asyncio.Semaphore(args.clients)
+
+            async def bounded(path: str) -> None:
+                async with semaphore:
+                    await asgi_request(path)
+
+            await asyncio.gather(*(bounded(path) for path in paths))
+
+        start = time.perf_counter()
+        asyncio.run(run_async())
+        asgi_elapsed, asgi_peak = time.perf_counter() - start, peak
+
+    print(f"\nGET /properties/<id>, {requests_total} requests, {args.clients} clients, "
+          f"{args.latency:.0f} ms client latency, {threads} threads")
+    print(f"   {'WSGI worker threads':<24} {requests_total / wsgi_elapsed:8.1f} req/s   peak in flight {wsgi_peak}")
+    print(f"   {'async read service':<24} {requests_total / asgi_elapsed:8.1f} req/s   peak in flight {asgi_peak}")
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)] * 1000 if ordered else 0.0
+
+
+def bench_backup(args: argparse.Namespace) -> None:
+    """Request and write latency while online snapshots run back to back."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _listing_db(db_path, args.rows)
+        os.environ.update(DATABASE_PATH=db_path, RATE_LIMIT_ENABLED="false", LISTING_CACHE_TTL="0",
+                          MAINTENANCE_ENABLED="false")
+        from backend.app import create_app
+
+        client = create_app().test_client()
+        paths = [f"/properties/{1 + i % args.rows}" for i in range(args.rows)]
+
+        def measure(backups: bool) -> tuple[list[float], list[float], list[float]]:
+            reads, writes, snapshots = [], [], []
+            deadline = time.perf_counter() + args.duration
+
+            def reader(offset: int) -> None:
+                i = offset
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    client.get(paths[i % len(paths)]).get_data()
+                    reads.append(time.perf_counter() - start)
+                    i += args.clients
+
+            def writer() -> None:
+                conn = sqlite3.connect(db_path, timeout=30)
+                i = 0
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    conn.execute("UPDATE properties SET updated_at = CURRENT_TIMESTAMP WHERE id = ?", (1 + i % args.rows,))
+                    conn.commit()
+                    writes.append(time.perf_counter() - start)
+                    i += 1
+                    time.sleep(0.01)
+                conn.close()
+
+            threads = [threading.Thread(target=reader, args=(n,)) for n in range(args.clients)]
+            threads.append(threading.Thread(target=writer))
+            for thread in threads:
+                thread.start()
+            while backups and time.perf_counter() < deadline:
+                snapshots.append(create_snapshot(db_path, os.path.join(tmp, "backups"), keep=1)["duration_ms"])
+            for thread in threads:
+                thread.join()
+            return reads, writes, snapshots
+
+        size_mb = os.path.getsize(db_path) / 1e6
+        print(f"\nGET /properties/<id> with {args.clients} clients + 1 writer, {args.duration:.0f}s per phase, {size_mb:.1f} MB database")
+        for label, backups in (("no backup", False), ("back-to-back snapshots", True)):
+            reads, writes, snapshots = measure(backups)
+            line = (f"   {label:<24} reads p50 {_percentile(reads, 0.5):6.2f} ms  p99 {_percentile(reads, 0.99):7.2f} ms   "
+                    f"writes p99 {_percentile(writes, 0.99):7.2f} ms  max {_percentile(writes, 1.0):7.2f} ms")
+            if snapshots:
+                line += f"   {len(snapshots)} snapshots, {sum(snapshots) / len(snapshots):.0f} ms each"
+            print(line)
+
+
+def bench_writes(args: argparse.Namespace) -> None:
+    """Favorite inserts from concurrent clients: a commit per request vs. the group-committing write queue."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _listing_db(db_path, args.rows)
+        conn = sqlite3.connect(db_path)
+        conn.executemany(
+            "INSERT INTO users (name, email, password_hash, role) VALUES (?, ?, 'x', 'tenant')",
+            [(f"Tenant {n}", f"tenant{n}@example.com") for n in range(args.clients)],
+        )
+        conn.commit()
+        tenants = [row[0] for row in conn.execute("SELECT id FROM users WHERE role = 'tenant'")]
+        conn.close()
+
+        def favorite(db: sqlite3.Connection, tenant_id: int, property_id: int) -> None:
+            db.execute("INSERT OR IGNORE INTO favorites (tenant_id, property_id) VALUES (?, ?)", (tenant_id, property_id))
+
+        def measure(label: str, run_write) -> None:  # noqa: ANN001
+            latencies = []
+            deadline = time.perf_counter() + args.duration
+
+            def client(tenant_id: int) -> None:
+                i = 0
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    run_write(tenant_id, 1 + i % args.rows)
+                    latencies.append(time.perf_counter() - start)
+                    i += 1
+
+            threads = [threading.Thread(target=client, args=(tenant_id,)) for tenant_id in tenants]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            print(f"   {label:<28} {len(latencies) / args.duration:8.0f} writes/s   "
+                  f"p50 {_percentile(latencies, 0.5):6.2f} ms  p99 {_percentile(latencies, 0.99):7.2f} ms")
+
+        local = threading.local()
+
+        def own_connection(tenant_id: int, property_id: int) -> None:
+            if not hasattr(local, "conn"):
+                local.conn = sqlite3.connect(db_path, timeout=30)
+            favorite(local.conn, tenant_id, property_id)
+            local.conn.commit()
+
+        print(f"\nINSERT INTO favorites from {args.clients} clients, {args.duration:.0f}s per phase")
+        measure("commit per request", own_connection)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("DELETE FROM favorites")
+        queue = WriteQueue(db_path)
+        measure("write queue", lambda tenant_id, property_id: queue.execute(favorite, tenant_id, property_id))
+        queue.stop()
+        stats = queue.stats()
+        print(f"   {'':<28} {stats['operations_per_commit']} writes per commit, largest batch {stats['largest_batch']}")
+
+
+def bench_repositories(args: argparse.Namespace) -> None:
+    """CPU and Python allocations per PUT /properties shaped request: ad hoc SQL vs. pooled repositories."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _listing_db(db_path, args.rows)
+        requests = args.repeat * 100
+        # Each request updates a different handful of fields, as owners' edit forms do
+        fields = [field for field in Properties.UPDATABLE if field != "status"]
+        changes = [
+            {fields[(i * 7 + k * 3) % len(fields)]: str(i) for k in range(1 + i % 4)} for i in range(requests)
+        ]
+
+        def ad_hoc(db: sqlite3.Connection, i: int) -> None:
+            property_id = 1 + i % args.rows
+            role = db.execute("SELECT role FROM users WHERE id = ?", ("1",)).fetchone()[0]
+            owner_id = db.execute("SELECT owner_id FROM properties WHERE id = ?", (property_id,)).fetchone()[0]
+            assert role == "admin" and owner_id == 1
+            update_fields = [f"{field} = ?" for field in changes[i]] + ["updated_at = CURRENT_TIMESTAMP"]
+            db.execute(f"UPDATE properties SET {', '.join(update_fields)} WHERE id = ?",
+                       [*changes[i].values(), property_id])
+            db.rollback()
+
+        def repository(db: sqlite3.Connection, i: int) -> None:
+            property_id = 1 + i % args.rows
+            user = Users(db).get("1")
+            prop = Properties(db).get(property_id)
+            assert user.role == "admin" and prop.owner_id == 1
+            Properties(db).update(property_id, changes[i])
+            db.rollback()
+
+        def connect() -> sqlite3.Connection:
+            conn = sqlite3.connect(db_path)
+            conn.row_factory = sqlite3.Row
+            return conn
+
+        pooled = connect()
+
+        def per_request(handler):  # noqa: ANN001, ANN202
+            def run(i: int) -> None:
+                conn = connect()
+                try:
+                    handler(conn, i)
+                finally:
+                    conn.close()
+            return run
+
+        def reused(handler):  # noqa: ANN001, ANN202
+            return lambda i: handler(pooled, i)
+
+        variants = [
+            ("connection per request, ad hoc SQL", per_request(ad_hoc)),
+            ("pooled connection, ad hoc SQL", reused(ad_hoc)),
+            ("pooled connection, repositories", reused(repository)),
+        ]
+        print(f"\n{requests} requests: role check, ownership check, UPDATE of 1-4 fields (rolled back)")
+        baseline = None
+        for label, run in variants:
+            run(0)  # warm the statement cache the way a long-lived worker would be
+            start = time.process_time()
+            for i in range(requests):
+                run(i)
+            cpu_us = (time.process_time() - start) / requests * 1e6
+            tracemalloc.start()
+            peaks = []
+            for i in range(min(requests, 200)):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                run(i)
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+            tracemalloc.stop()
+            baseline = baseline or cpu_us
+            print(f"   {label:<36} {cpu_us:8.1f} us CPU   x{baseline / cpu_us:5.2f}   "
+                  f"{sum(peaks) / len(peaks) / 1024:6.1f} KiB peak Python allocations")
+        pooled.close()
+
+
+def bench_sorts(args: argparse.Namespace) -> None:
+    """GET /properties and /my-properties pages in every ``?sort=`` order, and their query plans.
+
+    Exits non-zero if any order (first page or a cursor page) makes SQLite
+    sort rows in a temporary B-tree instead of reading them off an index.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _listing_db(db_path, args.rows)
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            """UPDATE properties SET bedrooms = id % 6, square_feet = 400 + id * 37 % 3000,
+                   latitude = -0.45 + id % 100 * 0.001, longitude = 39.64 + id / 100 % 100 * 0.001,
+                   description = CASE WHEN id % 10 = 0 THEN 'Quiet bungalow near the river' ELSE description END,
+                   created_at = datetime('2025-01-01', '+' || (id * 7919 % 100000) || ' minutes')"""
+        )
+        conn.commit()
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+
+        owner_id = conn.execute("SELECT owner_id FROM properties LIMIT 1").fetchone()[0]
+        lists = {
+            "/properties": lambda query, cursor: search_properties_page(conn, query, cursor, 20),
+            "/my-properties": lambda query, cursor: owner_properties_page(conn, owner_id, query, cursor, 20),
+        }
+        failures = []
+        for path, read in lists.items():
+            results = []
+            for sort in SORT_MODES:
+                query = {"sort": sort, "q": "bungalow river" if sort == "relevance" else "",
+                         "lat": "-0.40", "lng": "39.66", "radius": "3"}
+                statements.clear()
+                _, cursor = read(query, None)
+                read(query, cursor)
+                for sql in [sql for sql in statements if sql.lstrip().startswith("SELECT")]:
+                    plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+                    if "TEMP B-TREE" in plan:
+                        failures.append(f"{path}?sort={sort}: {plan}")
+                results.append((f"{path}?sort={sort} (2 pages)", _timeit(lambda: read(query, read(query, None)[1]), args.repeat)))
+            _report(f"{path}, {args.rows} listings, pages of 20", results)
+        conn.close()
+
+    print("\nQuery plans: " + ("every order reads an index" if not failures else "temp B-tree sorts found"))
+    for failure in failures:
+        print(f"   {failure}")
+    if failures:
+        sys.exit(1)
+
+
+def bench_streaming(args: argparse.Namespace) -> None:
+    """Unpaged GET /properties: whole list encoded at once vs. streamed in batches (peak memory, first byte)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _listing_db(db_path, args.rows)
+        os.environ.update(DATABASE_PATH=db_path, RATE_LIMIT_ENABLED="false", LISTING_CACHE_TTL="0",
+                          COMPRESS_ENABLED="false")
+        from backend.app import create_app
+
+        print(f"\nGET /properties, {args.rows} listings")
+        for label, batch_size in (("buffered (one batch)", str(args.rows + 1)), ("streamed (default batches)", "500")):
+            os.environ["STREAM_BATCH_SIZE"] = batch_size
+            client = create_app().test_client()
+            client.get("/properties").get_data()  # warm up the pool and statement cache
+            first_ms, total_ms, peaks = [], [], []
+            for _ in range(args.repeat):
+                tracemalloc.start()
+                start = time.perf_counter()
+                response = client.get("/properties", buffered=False)
+                chunks = iter(response.response)
+                size = len(next(chunks))
+                first_ms.append((time.perf_counter() - start) * 1000)
+                size += sum(len(chunk) for chunk in chunks)
+                response.close()
+                total_ms.append((time.perf_counter() - start) * 1000)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            print(f"   {label:<28} first byte {min(first_ms):8.1f} ms   whole body {min(total_ms):8.1f} ms   "
+                  f"peak {max(peaks) / 2 ** 20:6.1f} MiB   ({size / 2 ** 20:.1f} MiB sent)")
+        del os.environ["STREAM_BATCH_SIZE"]
+
+
+BENCHMARKS = {
+    "async": bench_async,
+    "backup": bench_backup,
+    "passwords": bench_passwords,
+    "repositories": bench_repositories,
+    "startup": bench_startup,
+    "serving": bench_serving,
+    "serialization": bench_serialization,
+    "sorts": bench_sorts,
+    "streaming": bench_streaming,
+    "writes": bench_writes,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("name", choices=sorted(BENCHMARKS), help="benchmark to run")
+    parser.add_argument("--rows", type=int, default=5000, help="rows in the synthetic dataset")
+    parser.add_argument("--repeat", type=int, default=20, help="repetitions (best time is reported)")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients for server benchmarks")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per server benchmark")
+    parser.add_argument("--latency", type=float, default=50.0, help="simulated per-client latency in ms")
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.name](args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Flask, current_app, make_response, request
+
+
+class CacheEntry:
+    """A rendered response body plus its lazily built compressed variants."""
+
+    __slots__ = ("body", "status", "mimetype", "expires", "_encoded", "_lock")
+
+    def __init__(self, body: bytes, status: int, mimetype: str, expires: float) -> None:
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.expires = expires
+        self._encoded: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str, compress) -> bytes:  # noqa: ANN001
+        """Return the body compressed with ``encoding``, compressing only once."""
+        data = self._encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._encoded.get(encoding)
+                if data is None:
+                    data = compress(self.body, encoding)
+                    self._encoded[encoding] = data
+        return data
+
+
+class ResponseCache:
+    """Small thread-safe LRU of rendered public listing responses.
+
+    Entries expire after ``ttl`` seconds so other workers' writes become
+    visible, and views wrapped in :func:`invalidates_listings` drop the whole
+    cache after a successful write in this process.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, body: bytes, status: int, mimetype: str,
+            generation: int | None = None) -> CacheEntry:
+        """Store a rendered body, unless a write invalidated it mid-render."""
+        entry = CacheEntry(body, status, mimetype, time.monotonic() + self.ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+def get_response_cache() -> ResponseCache | None:
+    return current_app.extensions.get("response_cache")
+
+
+def cached_listing(view):  # noqa: ANN001, ANN201
+    """Serve anonymous GETs of a public listing view from the response cache.
+
+    The cache entry is attached to the response as ``cache_entry`` so the
+    compression layer can reuse its precompressed bodies. A streamed body is
+    passed through as it is generated and cached once complete, unless it
+    outgrows ``LISTING_CACHE_MAX_BODY`` bytes.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+        cache = get_response_cache()
+        if cache is None or request.method != "GET" or "Authorization" in request.headers:
+            return view(*args, **kwargs)
+
+        key = request.full_path
+        entry = cache.get(key)
+        if entry is None:
+            generation = cache.generation
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            if response.is_streamed:
+                response.response = _cache_when_complete(
+                    response.response, cache, key, response.mimetype, generation,
+                    current_app.config["LISTING_CACHE_MAX_BODY"],
+                )
+                return response
+            entry = cache.put(key, response.get_data(), response.status_code, response.mimetype, generation)
+        else:
+            response = current_app.response_class(entry.body, status=entry.status, mimetype=entry.mimetype)
+        response.cache_entry = entry
+        return response
+
+    return wrapper
+
+
+def _cache_when_complete(chunks, cache: ResponseCache, key: str, mimetype: str, generation: int,
+                         max_size: int):  # noqa: ANN001, ANN202
+    """Yield a streamed body's chunks, keeping a copy to cache while it stays under ``max_size`` bytes."""
+    body: list[bytes] | None = []
+    size = 0
+    try:
+        for chunk in chunks:
+            if body is not None:
+                size += len(chunk)
+                if size <= max_size:
+                    body.append(chunk)
+                else:
+                    body = None
+            yield chunk
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    # Only reached when the whole body was sent
+    if body is not None:
+        cache.put(key, b"".join(body), 200, mimetype, generation)
+
+
+def invalidates_listings(view):  # noqa: ANN001, ANN201
+    """Drop cached listings after a successful write that can change them."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+        response = make_response(view(*args, **kwargs))
+        cache = get_response_cache()
+        if cache is not None and response.status_code < 400:
+            cache.clear()
+        return response
+
+    return wrapper
+
+
+def init_response_cache(app: Flask) -> ResponseCache:
+    app.config.setdefault("LISTING_CACHE_TTL", float(os.getenv("LISTING_CACHE_TTL", "30")))
+    app.config.setdefault("LISTING_CACHE_SIZE", int(os.getenv("LISTING_CACHE_SIZE", "256")))
+    app.config.setdefault("LISTING_CACHE_MAX_BODY", int(os.getenv("LISTING_CACHE_MAX_BODY", str(4 * 1024 * 1024))))
+    cache = ResponseCache(app.config["LISTING_CACHE_TTL"], app.config["LISTING_CACHE_SIZE"])
+    app.extensions["response_cache"] = cache
+    return cache
@@ -0,0 +1,199 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import typing as t
+
+from flask import Flask, current_app
+
+try:  # Support running as module or script
+    from .leases import get_checkpoint, set_checkpoint
+    from .models import get_db
+except Exception:  # pragma: no cover
+    from leases import get_checkpoint, set_checkpoint  # type: ignore
+    from models import get_db  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Change data capture: triggers (schema v6) append one change_log row per
+# insert, update or delete on properties, rentals, favorites, messages and
+# contact_requests, numbered by an AUTOINCREMENT seq that never goes
+# backwards or gets reused. Rows carry only what changed (table, id, op; a
+# favorite by its property id) and who may see it (user_a/user_b, NULL for
+# public rows), so clients poll GET /changes?since=<seq> and refetch just
+# those records.
+#
+# Entries older than CHANGES_RETENTION_DAYS are compacted away by the
+# maintenance scheduler; a client whose cursor falls behind that horizon is
+# told to reload in full.
+
+CHANGE_TABLES = ("properties", "rentals", "favorites", "messages", "contact_requests")
+# Tables whose changes can alter a cached listing response
+LISTING_TABLES = ("properties", "rentals")
+HORIZON_CHECKPOINT = "changes.compacted_through"
+
+
+def current_seq(db: sqlite3.Connection) -> int:
+    """The newest sequence number handed out so far (0 on an empty log)."""
+    row = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return row[0] if row else 0
+
+
+def compacted_through(db: sqlite3.Connection) -> int:
+    return int(get_checkpoint(db, HORIZON_CHECKPOINT, "0"))
+
+
+def read_changes(db: sqlite3.Connection, since: int, user_id: int | None, tables: list[str] | None = None,
+                 limit: int = 500) -> dict:
+    """Changes after ``since`` visible to ``user_id`` (``None`` sees all), one per record.
+
+    Several changes to the same record within the page collapse into the
+    latest. ``next`` is the cursor for the following call.
+    """
+    # Bounded by the newest seq up front, so ``next`` is right even without a transaction
+    newest = current_seq(db)
+    query = "SELECT seq, table_name, row_id, op FROM change_log WHERE seq > ? AND seq <= ?"
+    params: list = [since, newest]
+    if user_id is not None:
+        query += " AND (user_a IS NULL OR user_a = ? OR user_b = ?)"
+        params += [user_id, user_id]
+    if tables:
+        query += f" AND table_name IN ({', '.join('?' * len(tables))})"
+        params += tables
+    query += " ORDER BY seq LIMIT ?"
+    params.append(limit + 1)
+    rows = db.execute(query, params).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest = {}
+    for seq, table, row_id, op in rows:
+        latest.pop((table, row_id), None)
+        latest[(table, row_id)] = {"seq": seq, "table": table, "id": row_id, "op": op}
+    # A full page moves the cursor past it; otherwise the caller is now current
+    return {
+        "changes": list(latest.values()),
+        "next": rows[-1][0] if has_more else max(newest, since),
+        "has_more": has_more,
+    }
+
+
+def compact_changes(db: sqlite3.Connection, deadline: float, retention_days: int = 7, batch_size: int = 1000) -> int:
+    """Delete change log entries older than ``retention_days``, oldest first."""
+    cutoff = f"-{retention_days} days"
+    removed = 0
+    while time.monotonic() < deadline:
+        # seq and changed_at grow together, so the expired entries are a prefix of the log
+        row = db.execute(
+            """
+            SELECT MAX(seq), COUNT(*) FROM (
+                SELECT seq FROM change_log
+                WHERE seq > ? AND changed_at < datetime('now', ?)
+                ORDER BY seq LIMIT ?
+            )
+            """,
+            (compacted_through(db), cutoff, batch_size),
+        ).fetchone()
+        if not row[1]:
+            break
+        db.execute("DELETE FROM change_log WHERE seq <= ?", (row[0],))
+        set_checkpoint(db, HORIZON_CHECKPOINT, str(row[0]))
+        db.commit()
+        removed += row[1]
+        if row[1] < batch_size:
+            break
+    return removed
+
+
+class ChangeListener:
+    """Follows the change log so this worker's caches see other workers' writes.
+
+    At most once per ``interval`` a request reads the entries added since the
+    last look: property and rental changes drop the cached listing responses
+    (availability is read from rentals), favorite changes drop the tenant's
+    cached favorite set. Falling more than
+    ``max_batch`` entries behind drops both caches entirely.
+    """
+
+    def __init__(self, interval: float = 1.0, response_cache=None, favorite_cache=None,
+                 max_batch: int = 1000) -> None:  # noqa: ANN001
+        self.interval = interval
+        self.response_cache = response_cache
+        self.favorite_cache = favorite_cache
+        self.max_batch = max_batch
+        self.polls = 0
+        self.invalidations = 0
+        self._seq = None
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+
+    def poll(self, connect: t.Callable[[], sqlite3.Connection]) -> None:
+        now = time.monotonic()
+        if now < self._next_poll or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_poll = now + self.interval
+            db = connect()
+            if self._seq is None:
+                # Caches start empty, so there is nothing to catch up on
+                self._seq = current_seq(db)
+                return
+            rows = db.execute(
+                "SELECT seq, table_name, user_a FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?",
+                (self._seq, self.max_batch + 1),
+            ).fetchall()
+            self.polls += 1
+            if not rows:
+                return
+            if len(rows) > self.max_batch:
+                self._invalidate_all()
+                self._seq = current_seq(db)
+                return
+            tenants = {user_a for _, table, user_a in rows if table == "favorites"}
+            if self.response_cache is not None and any(table in LISTING_TABLES for _, table, _ in rows):
+                self.response_cache.clear()
+                self.invalidations += 1
+            if self.favorite_cache is not None:
+                for tenant_id in tenants:
+                    self.favorite_cache.invalidate(tenant_id)
+            self._seq = rows[-1][0]
+        finally:
+            self._lock.release()
+
+    def _invalidate_all(self) -> None:
+        self.invalidations += 1
+        if self.response_cache is not None:
+            self.response_cache.clear()
+        if self.favorite_cache is not None:
+            self.favorite_cache.clear()
+
+    def stats(self) -> dict:
+        return {"seq": self._seq, "polls": self.polls, "invalidations": self.invalidations}
+
+
+def get_change_listener() -> ChangeListener | None:
+    return current_app.extensions.get("change_listener")
+
+
+def init_changes(app: Flask) -> ChangeListener | None:
+    app.config.setdefault("CHANGES_PAGE_SIZE", int(os.getenv("CHANGES_PAGE_SIZE", "500")))
+    app.config.setdefault("CHANGES_SYNC_INTERVAL", float(os.getenv("CHANGES_SYNC_INTERVAL", "1")))
+    if app.config["CHANGES_SYNC_INTERVAL"] <= 0:
+        return None
+
+    listener = ChangeListener(
+        interval=app.config["CHANGES_SYNC_INTERVAL"],
+        response_cache=app.extensions.get("response_cache"),
+        favorite_cache=app.extensions.get("favorite_cache"),
+    )
+    app.extensions["change_listener"] = listener
+
+    @app.before_request
+    def sync_caches() -> None:
+        try:
+            listener.poll(get_db)
+        except sqlite3.Error:  # caches still expire on their own
+            logger.exception("Change log poll failed")
+
+    return listener
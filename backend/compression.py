@@ -0,0 +1,109 @@
+import gzip
+import os
+import typing as t
+import zlib
+
+from flask import Flask, request
+
+try:  # brotli is optional; gzip is always available
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+COMPRESS_MIN_SIZE_DEFAULT = 500
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/html",
+    "text/plain",
+    "image/svg+xml",
+}
+
+
+def supported_encodings() -> list[str]:
+    """Encodings this process can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress_body(body: bytes, encoding: str, level: int = 6, br_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=br_quality)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def chunk_compressor(encoding: str, level: int = 6,
+                     br_quality: int = 5) -> tuple[t.Callable[[bytes], bytes], t.Callable[[], bytes]]:
+    """(compress and flush one chunk, finish the stream) for a body sent in pieces."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=br_quality)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def _stream_compressed(chunks, encoding: str, level: int, br_quality: int):  # noqa: ANN001, ANN202
+    """Compress a streamed body chunk by chunk, flushing after every chunk."""
+    compress, finish = chunk_compressor(encoding, level, br_quality)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+    if hasattr(chunks, "close"):
+        chunks.close()
+
+
+def init_compression(app: Flask) -> None:
+    """Compress responses the client accepts, reusing cached compressed bodies.
+
+    Bodies smaller than ``COMPRESS_MIN_SIZE`` bytes are sent as-is since the
+    gzip/brotli framing would outweigh the saving.
+    """
+    app.config.setdefault("COMPRESS_MIN_SIZE", int(os.getenv("COMPRESS_MIN_SIZE", str(COMPRESS_MIN_SIZE_DEFAULT))))
+    app.config.setdefault("COMPRESS_LEVEL", int(os.getenv("COMPRESS_LEVEL", "6")))
+    app.config.setdefault("COMPRESS_BR_QUALITY", int(os.getenv("COMPRESS_BR_QUALITY", "5")))
+    app.config.setdefault("COMPRESS_ENABLED", os.getenv("COMPRESS_ENABLED", "true").lower() == "true")
+
+    @app.after_request
+    def compress_response(response):  # noqa: ANN001, ANN202
+        if not app.config["COMPRESS_ENABLED"]:
+            return response
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(supported_encodings())
+        if encoding is None:
+            return response
+
+        level = app.config["COMPRESS_LEVEL"]
+        br_quality = app.config["COMPRESS_BR_QUALITY"]
+        if response.is_streamed:
+            response.response = _stream_compressed(response.response, encoding, level, br_quality)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            return response
+
+        size = response.calculate_content_length() or 0
+        if size < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        entry = getattr(response, "cache_entry", None)
+        if entry is not None:
+            body = entry.encoded(encoding, lambda data, enc: compress_body(data, enc, level, br_quality))
+        else:
+            body = compress_body(response.get_data(), encoding, level, br_quality)
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        return response
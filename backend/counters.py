@@ -0,0 +1,257 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from functools import wraps
+
+from flask import Flask, current_app, make_response
+
+logger = logging.getLogger(__name__)
+
+# Write-behind buffer for the high-frequency, low-value writes: listing views
+# and favorite toggles. Events are coalesced in memory (a view counter per
+# property, the latest state per tenant/property pair) and flushed in one
+# transaction every COUNTER_FLUSH_INTERVAL seconds or once COUNTER_FLUSH_SIZE
+# keys are pending, whichever comes first.
+#
+# Durability: a clean shutdown flushes what is pending; a crash loses at most
+# one interval of views and toggles. favorite_count is recounted from the
+# favorites table for every property a flush touches, so it never drifts from
+# the rows that survived (`python -m backend.manage counters` recounts all).
+
+
+def apply_counters(db: sqlite3.Connection, views: dict[int, int], favorites: dict[tuple[int, int], bool]) -> None:
+    """Write one batch of coalesced events; the caller owns the transaction."""
+    # Properties deleted since the event was buffered are skipped
+    db.executemany(
+        "INSERT OR IGNORE INTO favorites (tenant_id, property_id) SELECT ?, id FROM properties WHERE id = ?",
+        [key for key, on in favorites.items() if on],
+    )
+    db.executemany(
+        "DELETE FROM favorites WHERE tenant_id = ? AND property_id = ?",
+        [key for key, on in favorites.items() if not on],
+    )
+    db.executemany(
+        """
+        INSERT INTO property_stats (property_id, views) SELECT id, ? FROM properties WHERE id = ?
+        ON CONFLICT(property_id) DO UPDATE SET
+            views = views + excluded.views, updated_at = CURRENT_TIMESTAMP
+        """,
+        [(count, property_id) for property_id, count in views.items()],
+    )
+    db.executemany(
+        """
+        INSERT INTO property_stats (property_id, favorite_count)
+        SELECT id, (SELECT COUNT(*) FROM favorites WHERE property_id = properties.id) FROM properties WHERE id = ?
+        ON CONFLICT(property_id) DO UPDATE SET
+            favorite_count = excluded.favorite_count, updated_at = CURRENT_TIMESTAMP
+        """,
+        [(property_id,) for property_id in {property_id for _, property_id in favorites}],
+    )
+
+
+def rebuild_favorite_counts(db: sqlite3.Connection) -> int:
+    """Recount favorite_count for every property from the favorites table."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute(
+            """
+            INSERT INTO property_stats (property_id, favorite_count)
+            SELECT p.id, (SELECT COUNT(*) FROM favorites f WHERE f.property_id = p.id) FROM properties p WHERE true
+            ON CONFLICT(property_id) DO UPDATE SET
+                favorite_count = excluded.favorite_count, updated_at = CURRENT_TIMESTAMP
+            """
+        )
+        rows = db.execute("SELECT COUNT(*) FROM property_stats").fetchone()[0]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return rows
+
+
+class WriteBehindBuffer:
+    """Coalesces view and favorite events in memory and flushes them in batches.
+
+    Flushes go through ``writer`` (a :class:`backend.writer.WriteQueue`) when
+    one is given, otherwise through the buffer's own connection. A failed
+    flush puts its events back so the next one retries them. With
+    ``flush_interval=0`` every event is written through immediately.
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = 2.0, flush_size: int = 1000,
+                 writer=None, busy_timeout: float = 5.0) -> None:  # noqa: ANN001
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.writer = writer
+        self.busy_timeout = busy_timeout
+        self.flushes = 0
+        self.events = 0
+        self.rows_written = 0
+        self._views: dict[int, int] = {}
+        self._favorites: dict[tuple[int, int], bool] = {}
+        self._in_flight: dict[tuple[int, int], bool] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def ensure_started(self) -> None:
+        # Threads do not survive fork, so each worker starts its own on first use
+        pid = os.getpid()
+        if self._pid == pid or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # Anything buffered in the parent belongs to the parent
+            self._views, self._favorites, self._in_flight = {}, {}, {}
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._loop, name="counter-flush", daemon=True)
+            self._thread.start()
+            self._pid = pid
+
+    def stop(self) -> None:
+        """Stop the flusher thread and write out whatever is still pending."""
+        if self._pid == os.getpid():
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._pid = None
+        self.flush()
+
+    def record_view(self, property_id: int) -> None:
+        with self._lock:
+            self._views[property_id] = self._views.get(property_id, 0) + 1
+            self.events += 1
+            pending = len(self._views) + len(self._favorites)
+        self._after_event(pending)
+
+    def set_favorite(self, tenant_id: int, property_id: int, favorite: bool) -> None:
+        # Only the latest state matters, so add/remove/add collapses to one write
+        with self._lock:
+            self._favorites[(int(tenant_id), int(property_id))] = favorite
+            self.events += 1
+            pending = len(self._views) + len(self._favorites)
+        self._after_event(pending)
+
+    def _after_event(self, pending: int) -> None:
+        if self.flush_interval <= 0:
+            self.flush()
+        elif pending >= self.flush_size:
+            self._wake.set()
+
+    def has_pending_favorites(self, tenant_id: int) -> bool:
+        tenant_id = int(tenant_id)
+        with self._lock:
+            return any(key[0] == tenant_id for key in (*self._favorites, *self._in_flight))
+
+    def pending_favorites(self, tenant_id: int) -> dict[int, bool]:
+        """A tenant's toggles not yet committed, by property id (latest state wins)."""
+        tenant_id = int(tenant_id)
+        with self._lock:
+            return {
+                property_id: favorite
+                for pending in (self._in_flight, self._favorites)
+                for (tenant, property_id), favorite in pending.items() if tenant == tenant_id
+            }
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._views) + len(self._favorites)
+
+    def flush(self) -> int:
+        """Write everything pending in one transaction; returns the number of keys written."""
+        with self._flush_lock:
+            with self._lock:
+                views, favorites = self._views, self._favorites
+                self._views, self._favorites = {}, {}
+                self._in_flight = favorites
+            if not views and not favorites:
+                return 0
+            try:
+                self._apply(views, favorites)
+            except Exception:
+                with self._lock:
+                    for property_id, count in views.items():
+                        self._views[property_id] = self._views.get(property_id, 0) + count
+                    for key, favorite in favorites.items():
+                        self._favorites.setdefault(key, favorite)  # a newer toggle wins
+                    self._in_flight = {}
+                raise
+            with self._lock:
+                self._in_flight = {}
+            self.flushes += 1
+            self.rows_written += len(views) + len(favorites)
+            return len(views) + len(favorites)
+
+    def _apply(self, views: dict[int, int], favorites: dict[tuple[int, int], bool]) -> None:
+        if self.writer is not None:
+            self.writer.execute(apply_counters, views, favorites)
+            return
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+        try:
+            with conn:
+                apply_counters(conn, views, favorites)
+        finally:
+            conn.close()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:  # keep the thread alive; the events stay buffered
+                logger.exception("Counter flush failed")
+
+    def stats(self) -> dict:
+        return {
+            "events": self.events,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "pending": self.pending(),
+        }
+
+
+def get_counters() -> WriteBehindBuffer | None:
+    return current_app.extensions.get("counters")
+
+
+def counts_views(view):  # noqa: ANN001, ANN201
+    """Count a view of ``property_id`` for every successful response, cached or not."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+        response = make_response(view(*args, **kwargs))
+        counters = get_counters()
+        if counters is not None and response.status_code == 200:
+            counters.record_view(kwargs["property_id"])
+        return response
+
+    return wrapper
+
+
+def init_counters(app: Flask) -> WriteBehindBuffer:
+    app.config.setdefault("COUNTER_FLUSH_INTERVAL", float(os.getenv("COUNTER_FLUSH_INTERVAL", "2")))
+    app.config.setdefault("COUNTER_FLUSH_SIZE", int(os.getenv("COUNTER_FLUSH_SIZE", "1000")))
+    counters = WriteBehindBuffer(
+        app.config["DATABASE_PATH"],
+        flush_interval=app.config["COUNTER_FLUSH_INTERVAL"],
+        flush_size=app.config["COUNTER_FLUSH_SIZE"],
+        writer=app.extensions.get("write_queue"),
+        busy_timeout=app.config.get("DATABASE_BUSY_TIMEOUT", 5.0),
+    )
+    app.extensions["counters"] = counters
+
+    @app.before_request
+    def start_counter_flush() -> None:
+        counters.ensure_started()
+
+    # Daemon threads, the writer's included, still run while atexit handlers do
+    atexit.register(counters.stop)
+    return counters
@@ -0,0 +1,278 @@
+import hashlib
+import math
+import os
+import random
+import re
+import sqlite3
+import struct
+import typing as t
+
+# Near-duplicate listings: the same unit posted again with a reworded title
+# or description. Each listing's title, description and address are cut into
+# overlapping 5-character shingles and summarised by a 64-value MinHash
+# signature; the share of positions two signatures agree on estimates the
+# Jaccard similarity of their shingle sets.
+#
+# Signatures are split into 16 bands of 4 values and each band is indexed
+# (listing_bands), so a new listing only compares itself with the listings
+# sharing at least one band: an index lookup per band instead of a scan of
+# every listing. Pairs at 0.8 similarity share a band 99.9% of the time.
+# Listings within DUPLICATE_DISTANCE_METERS of each other (found through a
+# latitude range scan) are compared too, and need less textual similarity.
+#
+# A new listing that looks like an existing one is created as
+# pending_approval and its matches recorded in listing_duplicates for an
+# admin to review; `python -m backend.manage dedupe` does the same for the
+# listings already in the table.
+
+SIGNATURE_SIZE = 64
+BANDS = 16
+BAND_ROWS = SIGNATURE_SIZE // BANDS
+SHINGLE_SIZE = 5
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are stored, so the hash family must never change
+_rng = random.Random(20250101)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(SIGNATURE_SIZE)]
+_SIGNATURE = struct.Struct(f"<{SIGNATURE_SIZE}Q")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+# Metres per degree of latitude
+_METRES_PER_DEGREE = 111_320.0
+
+
+def thresholds() -> tuple[float, float, float]:
+    """(similarity, similarity when nearby, nearby distance in metres) from the environment."""
+    return (
+        float(os.getenv("DUPLICATE_SIMILARITY", "0.8")),
+        float(os.getenv("DUPLICATE_NEARBY_SIMILARITY", "0.5")),
+        float(os.getenv("DUPLICATE_DISTANCE_METERS", "50")),
+    )
+
+
+def listing_text(listing: t.Mapping) -> str:
+    parts = (listing.get("title"), listing.get("description"), listing.get("address"))
+    return " ".join(_NON_WORD.sub(" ", str(part).lower()).strip() for part in parts if part)
+
+
+def signature(listing: t.Mapping) -> tuple[int, ...] | None:
+    """MinHash signature of a listing's title, description and address; None when all are empty."""
+    text = listing_text(listing)
+    if not text:
+        return None
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little") % _PRIME
+        for shingle in shingles
+    ]
+    return tuple(min([(a * x + b) % _PRIME for x in hashes]) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: t.Sequence[int], b: t.Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_SIZE
+
+
+def band_keys(sig: t.Sequence[int]) -> list[int]:
+    """One signed 64-bit key per band, as stored in listing_bands."""
+    keys = []
+    for band in range(BANDS):
+        values = sig[band * BAND_ROWS:(band + 1) * BAND_ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<{BAND_ROWS}Q", *values), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def distance_metres(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Metres between two points; an equirectangular approximation, plenty within a city."""
+    x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return math.hypot(x, y) * 6_371_000
+
+
+def bounding_box(lat: float, lng: float, metres: float) -> tuple[float, float, float, float]:
+    """(min lat, max lat, min lng, max lng) of a box holding every point within ``metres``."""
+    dlat = metres / _METRES_PER_DEGREE
+    dlng = dlat / max(math.cos(math.radians(lat)), 0.01)
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def _coordinates(listing: t.Mapping) -> tuple[float, float] | None:
+    try:
+        lat, lng = float(listing.get("latitude")), float(listing.get("longitude"))
+    except (TypeError, ValueError):
+        return None
+    return lat, lng
+
+
+def find_duplicates(db: sqlite3.Connection, sig: t.Sequence[int] | None, listing: t.Mapping,
+                    exclude_id: int | None = None) -> list[tuple[int, float]]:
+    """Indexed listings that ``listing`` likely duplicates, as (property id, similarity), closest first."""
+    if sig is None:
+        return []
+    threshold, nearby_threshold, distance = thresholds()
+    keys = band_keys(sig)
+    bands = " OR ".join("(band = ? AND key = ?)" for _ in keys)
+    candidates = {
+        row[0] for row in db.execute(
+            f"SELECT DISTINCT property_id FROM listing_bands WHERE {bands}",
+            [value for band, key in enumerate(keys) for value in (band, key)],
+        )
+    }
+    nearby = set()
+    point = _coordinates(listing)
+    if point is not None and distance > 0:
+        lat, lng = point
+        for row in db.execute(
+            """
+            SELECT id, latitude, longitude FROM properties
+            WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?
+            """,
+            bounding_box(lat, lng, distance),
+        ):
+            if distance_metres(lat, lng, row[1], row[2]) <= distance:
+                nearby.add(row[0])
+    candidates.discard(exclude_id)
+    nearby.discard(exclude_id)
+    if not candidates and not nearby:
+        return []
+    ids = sorted(candidates | nearby)
+    matches = []
+    for property_id, blob in db.execute(
+        f"SELECT property_id, signature FROM listing_signatures WHERE property_id IN ({', '.join('?' * len(ids))})",
+        ids,
+    ):
+        score = similarity(sig, _SIGNATURE.unpack(blob))
+        if score >= threshold or (property_id in nearby and score >= nearby_threshold):
+            matches.append((property_id, round(score, 3)))
+    matches.sort(key=lambda match: (-match[1], match[0]))
+    return matches
+
+
+def index_listing(db: sqlite3.Connection, property_id: int, sig: t.Sequence[int] | None,
+                  duplicates: t.Iterable[tuple[int, float]] = ()) -> None:
+    """Store (or replace) a listing's signature and bands, and record its likely duplicates."""
+    db.execute("DELETE FROM listing_bands WHERE property_id = ?", (property_id,))
+    if sig is None:
+        db.execute("DELETE FROM listing_signatures WHERE property_id = ?", (property_id,))
+    else:
+        db.execute(
+            "INSERT OR REPLACE INTO listing_signatures (property_id, signature) VALUES (?, ?)",
+            (property_id, _SIGNATURE.pack(*sig)),
+        )
+        db.executemany(
+            "INSERT OR IGNORE INTO listing_bands (band, key, property_id) VALUES (?, ?, ?)",
+            [(band, key, property_id) for band, key in enumerate(band_keys(sig))],
+        )
+    db.executemany(
+        "INSERT OR REPLACE INTO listing_duplicates (property_id, duplicate_of, similarity) VALUES (?, ?, ?)",
+        [(property_id, other, score) for other, score in duplicates],
+    )
+
+
+def reindex_listing(db: sqlite3.Connection, property_id: int) -> None:
+    """Refresh a listing's signature after its title, description or address changed."""
+    row = db.execute(
+        "SELECT title, description, address FROM properties WHERE id = ?", (property_id,)
+    ).fetchone()
+    if row is not None:
+        index_listing(db, property_id, signature({"title": row[0], "description": row[1], "address": row[2]}))
+
+
+def create_listing_index(cur: sqlite3.Cursor) -> None:
+    """Tables behind duplicate detection (schema v10), with every current listing indexed."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS listing_signatures (
+            property_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS listing_bands (
+            band INTEGER NOT NULL,
+            key INTEGER NOT NULL,
+            property_id INTEGER NOT NULL,
+            PRIMARY KEY (band, key, property_id)
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_listing_bands_property ON listing_bands (property_id)")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS listing_duplicates (
+            property_id INTEGER NOT NULL,
+            duplicate_of INTEGER NOT NULL,
+            similarity REAL NOT NULL,
+            flagged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (property_id, duplicate_of)
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_properties_location ON properties (latitude, longitude)")
+    # Foreign keys are not enforced on these connections, so clear up here
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS listing_index_properties_delete AFTER DELETE ON properties
+        BEGIN
+            DELETE FROM listing_signatures WHERE property_id = OLD.id;
+            DELETE FROM listing_bands WHERE property_id = OLD.id;
+            DELETE FROM listing_duplicates WHERE property_id = OLD.id OR duplicate_of = OLD.id;
+        END
+        """
+    )
+    for row in cur.execute("SELECT id, title, description, address FROM properties").fetchall():
+        index_listing(cur.connection, row[0], signature({"title": row[1], "description": row[2], "address": row[3]}))
+
+
+def dedupe_listings(db: sqlite3.Connection, batch_size: int = 500) -> dict[str, int]:
+    """Re-index every listing oldest first and flag each one that duplicates an older one.
+
+    Only available listings are moved to pending_approval; rented or
+    maintenance ones just get their matches recorded. Signatures are
+    computed outside the write transactions, one batch at a time.
+    """
+    result = {"indexed": 0, "duplicates": 0, "flagged": 0}
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM listing_bands")
+        db.execute("DELETE FROM listing_signatures")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    last_id = 0
+    while True:
+        rows = db.execute(
+            """
+            SELECT id, title, description, address, latitude, longitude, status FROM properties
+            WHERE id > ? ORDER BY id LIMIT ?
+            """,
+            (last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        batch = []
+        for row in rows:
+            listing = dict(zip(("title", "description", "address", "latitude", "longitude"), row[1:6]))
+            batch.append((row[0], row[6], listing, signature(listing)))
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for property_id, status, listing, sig in batch:
+                # Only listings indexed before this one (older ids) can match
+                duplicates = find_duplicates(db, sig, listing, exclude_id=property_id)
+                index_listing(db, property_id, sig, duplicates)
+                result["indexed"] += 1
+                if duplicates:
+                    result["duplicates"] += 1
+                    if status == "available":
+                        db.execute("UPDATE properties SET status = 'pending_approval' WHERE id = ?", (property_id,))
+                        result["flagged"] += 1
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return result
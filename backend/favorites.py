@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from flask import Flask, current_app
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+# Per-tenant favorite sets used to flag listings with ``is_favorited``. Each
+# set is a sorted array of 64-bit property ids (8 bytes per favorite), so a
+# membership test is a binary search and annotating a page of listings runs
+# no SQL once the tenant's set is loaded.
+#
+# The favorite endpoints update the cached set as they buffer each toggle.
+# Toggles made through other worker processes reach this one through the
+# change log (backend.changes); sets also expire after FAVORITE_CACHE_TTL
+# seconds as a backstop.
+
+
+def _contains(ids: array, property_id: int) -> bool:
+    i = bisect_left(ids, property_id)
+    return i < len(ids) and ids[i] == property_id
+
+
+class FavoriteSetCache:
+    """LRU cache of tenant id -> sorted ``array('q')`` of favorited property ids."""
+
+    def __init__(self, ttl: float = 60.0, max_users: int = 10000, counters=None) -> None:  # noqa: ANN001
+        self.ttl = ttl
+        self.max_users = max_users
+        self.counters = counters
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[float, array]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: sqlite3.Connection, tenant_id: int) -> array:
+        tenant_id = int(tenant_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(tenant_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        ids = array("q", (row[0] for row in db.execute(
+            "SELECT property_id FROM favorites WHERE tenant_id = ? ORDER BY property_id", (tenant_id,)
+        )))
+        # Toggles still waiting in the write-behind buffer are not in the table yet
+        if self.counters is not None:
+            for property_id, favorite in self.counters.pending_favorites(tenant_id).items():
+                ids = self._with(ids, property_id, favorite)
+
+        with self._lock:
+            self._entries[tenant_id] = (now + self.ttl, ids)
+            self._entries.move_to_end(tenant_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return ids
+
+    @staticmethod
+    def _with(ids: array, property_id: int, favorite: bool) -> array:
+        # Copy on write: readers may be searching the old array
+        i = bisect_left(ids, property_id)
+        present = i < len(ids) and ids[i] == property_id
+        if favorite == present:
+            return ids
+        if favorite:
+            return ids[:i] + array("q", (property_id,)) + ids[i:]
+        return ids[:i] + ids[i + 1:]
+
+    def update(self, tenant_id: int, property_id: int, favorite: bool) -> None:
+        """Apply a toggle to the tenant's cached set, if it is loaded."""
+        tenant_id = int(tenant_id)
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None:
+                self._entries[tenant_id] = (entry[0], self._with(entry[1], int(property_id), favorite))
+
+    def invalidate(self, tenant_id: int) -> None:
+        """Forget a tenant's set so the next lookup reloads it."""
+        with self._lock:
+            self._entries.pop(int(tenant_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def annotate(self, db: sqlite3.Connection, tenant_id: int, properties: list[dict]) -> None:
+        """Set ``is_favorited`` on each property dict."""
+        ids = self.get(db, tenant_id)
+        for prop in properties:
+            prop["is_favorited"] = _contains(ids, prop["id"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = len(self._entries)
+            favorites = sum(len(ids) for _, ids in self._entries.values())
+        return {"users": users, "favorites": favorites, "bytes": favorites * 8, "hits": self.hits, "misses": self.misses}
+
+
+def get_favorite_cache() -> FavoriteSetCache:
+    return current_app.extensions["favorite_cache"]
+
+
+def current_tenant_id() -> int | None:
+    """The signed-in tenant's id from the token, or ``None`` (bad tokens count as anonymous)."""
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return None
+    if get_jwt().get("role") != "tenant":
+        return None
+    return int(get_jwt_identity())
+
+
+def init_favorite_cache(app: Flask) -> FavoriteSetCache:
+    app.config.setdefault("FAVORITE_CACHE_TTL", float(os.getenv("FAVORITE_CACHE_TTL", "60")))
+    app.config.setdefault("FAVORITE_CACHE_SIZE", int(os.getenv("FAVORITE_CACHE_SIZE", "10000")))
+    cache = FavoriteSetCache(
+        ttl=app.config["FAVORITE_CACHE_TTL"],
+        max_users=app.config["FAVORITE_CACHE_SIZE"],
+        counters=app.extensions.get("counters"),
+    )
+    app.extensions["favorite_cache"] = cache
+    return cache
@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for Garissa House Rental Hub.
+Every value can be overridden through the environment variable named next to it.
+"""
+
+import multiprocessing
+import os
+
+cores = multiprocessing.cpu_count()
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Requests mostly wait on SQLite, so a few threads per process keep each core
+# busy while processes sidestep the GIL. Password hashing has its own pool.
+workers = int(os.getenv("WEB_CONCURRENCY", str(cores + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+# Import the app once in the master and fork it, so workers spawn quickly
+# and share the imported code pages. Set PRELOAD_APP=false to make
+# `kill -HUP` pick up code changes; with preload, deploy new code with
+# USR2 (start a new master) followed by QUIT to the old one.
+preload_app = os.getenv("PRELOAD_APP", "true").lower() == "true"
+
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers now and then to cap slow memory growth; jitter avoids
+# every worker restarting at the same moment.
+max_requests = int(os.getenv("MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "200"))
+
+accesslog = os.getenv("ACCESS_LOG", "-")
+errorlog = os.getenv("ERROR_LOG", "-")
+loglevel = os.getenv("LOG_LEVEL", "info")
+
@@ -0,0 +1,259 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from flask import Flask, current_app
+
+try:  # Support running as module or script
+    from .passwords import pool_context
+except Exception:  # pragma: no cover
+    from passwords import pool_context  # type: ignore
+
+try:  # Pillow is needed for uploads only; external image URLs work without it
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover
+    Image = ImageOps = None
+
+IMAGES_AVAILABLE = Image is not None
+
+logger = logging.getLogger(__name__)
+
+# Uploaded property images are stored content-addressed: the SHA-256 of the
+# original bytes names every file derived from it, so a rendition's URL never
+# changes meaning and can be cached by browsers forever. Each size is
+# rendered as WebP and JPEG off the request path by a small process pool:
+#
+#   <IMAGE_DIR>/ab/<key>.jpg             the upload as received (.jpg/.png/.webp)
+#   <IMAGE_DIR>/ab/<key>-card.webp       one file per size and format
+#
+# property_images.image_url holds "<MEDIA_URL>/<key>/full" for uploads.
+
+IMAGE_SIZES = {"thumb": 320, "card": 800, "full": 1600}  # longest edge in pixels
+IMAGE_FORMATS = {"webp": ("WEBP", "image/webp"), "jpg": ("JPEG", "image/jpeg")}
+ORIGINAL_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}  # formats accepted for upload
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def default_image_dir() -> str:
+    return os.getenv("IMAGE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "media")
+
+
+def original_path(image_dir: str, key: str) -> str | None:
+    for ext in ORIGINAL_EXTENSIONS.values():
+        path = os.path.join(image_dir, key[:2], f"{key}.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def variant_path(image_dir: str, key: str, size: str, ext: str) -> str:
+    return os.path.join(image_dir, key[:2], f"{key}-{size}.{ext}")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".partial")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def inspect_upload(data: bytes, max_pixels: int) -> str:
+    """Check an upload is a JPEG/PNG/WebP of sane dimensions; returns its format.
+
+    Only the header is parsed, so this is cheap enough for the request thread.
+    Raises ``ValueError`` for anything else.
+    """
+    if not IMAGES_AVAILABLE:
+        raise RuntimeError("Image uploads require `pip install Pillow`.")
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            fmt, (width, height) = img.format, img.size
+    except Exception:
+        raise ValueError("File is not a readable image.") from None
+    if fmt not in ORIGINAL_EXTENSIONS:
+        raise ValueError("Images must be JPEG, PNG or WebP.")
+    if width * height > max_pixels:
+        raise ValueError(f"Image is too large ({width}x{height}).")
+    return fmt
+
+
+def store_original(image_dir: str, data: bytes, fmt: str) -> str:
+    """Save an upload under its content hash and return the key (no-op if already stored)."""
+    key = hashlib.sha256(data).hexdigest()
+    if original_path(image_dir, key) is None:
+        _write_atomic(os.path.join(image_dir, key[:2], f"{key}.{ORIGINAL_EXTENSIONS[fmt]}"), data)
+    return key
+
+
+def variants_ready(image_dir: str, key: str) -> bool:
+    return all(
+        os.path.exists(variant_path(image_dir, key, size, ext)) for size in IMAGE_SIZES for ext in IMAGE_FORMATS
+    )
+
+
+def render_variants(image_dir: str, key: str) -> list[str]:
+    """Render every size and format of ``key`` that does not exist yet.
+
+    Runs in the pipeline's worker processes. Returns the files written.
+    """
+    source = original_path(image_dir, key)
+    if source is None:
+        raise FileNotFoundError(f"No original stored for image {key}")
+    written = []
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)  # phone photos are often stored sideways
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        for size, edge in IMAGE_SIZES.items():
+            resized = None
+            for ext, (fmt, _) in IMAGE_FORMATS.items():
+                path = variant_path(image_dir, key, size, ext)
+                if os.path.exists(path):
+                    continue
+                if resized is None:
+                    resized = img.copy()
+                    resized.thumbnail((edge, edge), Image.LANCZOS)  # never upscales
+                out = io.BytesIO()
+                if fmt == "WEBP":
+                    resized.save(out, fmt, quality=80, method=4)
+                else:
+                    resized.save(out, fmt, quality=82, optimize=True, progressive=True)
+                _write_atomic(path, out.getvalue())
+                written.append(path)
+    return written
+
+
+def mark_images(db: sqlite3.Connection, key: str, status: str) -> None:
+    db.execute("UPDATE property_images SET status = ? WHERE image_key = ?", (status, key))
+
+
+class ImagePipeline:
+    """Renders the sizes of uploaded images in a background process pool.
+
+    Uploads return as soon as the original is stored; their rows read
+    ``pending`` until the renditions exist, then ``ready`` (or ``failed``).
+    Meanwhile the media endpoint falls back to the original. With
+    ``workers=0`` rendering runs inline on the calling thread.
+    """
+
+    def __init__(self, image_dir: str, db_path: str, workers: int = 1, writer=None,
+                 response_cache=None) -> None:  # noqa: ANN001
+        self.image_dir = image_dir
+        self.db_path = db_path
+        self.workers = workers
+        self.writer = writer
+        self.response_cache = response_cache
+        self.rendered = 0
+        self.failed = 0
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Pools do not survive fork, so each worker process builds its own (from
+        # a fork server, like the password hasher's).
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != pid:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+                    self._pool_pid = pid
+        return self._pool
+
+    def submit(self, key: str) -> Future:
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(render_variants(self.image_dir, key))
+            except Exception as e:  # noqa: BLE001 - recorded by _finished
+                future.set_exception(e)
+            self._finished(key, future)
+            return future
+        future = self._executor().submit(render_variants, self.image_dir, key)
+        future.add_done_callback(lambda done: self._finished(key, done))
+        return future
+
+    def _finished(self, key: str, future: Future) -> None:
+        error = future.exception()
+        if error is None:
+            self.rendered += 1
+        else:
+            self.failed += 1
+            logger.error("Rendering image %s failed: %s", key, error)
+        status = "failed" if error else "ready"
+        try:
+            if self.writer is not None:
+                self.writer.execute(mark_images, key, status)
+            else:
+                conn = sqlite3.connect(self.db_path, timeout=5.0)
+                try:
+                    with conn:
+                        mark_images(conn, key, status)
+                finally:
+                    conn.close()
+        except sqlite3.Error:
+            # The row stays pending; `python -m backend.manage images` finishes it
+            logger.exception("Could not mark image %s %s", key, status)
+            return
+        if self.response_cache is not None:
+            self.response_cache.clear()  # cached listings still say pending
+
+    def shutdown(self) -> None:
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=True)
+        self._pool = None
+
+
+def render_pending(db: sqlite3.Connection, image_dir: str) -> dict:
+    """Render every upload left pending or failed (after a crash, or for new sizes)."""
+    keys = [row[0] for row in db.execute(
+        "SELECT DISTINCT image_key FROM property_images WHERE image_key IS NOT NULL AND status != 'ready'"
+    )]
+    done = failed = 0
+    for key in keys:
+        try:
+            render_variants(image_dir, key)
+            status = "ready"
+            done += 1
+        except Exception:  # noqa: BLE001 - reported in the summary
+            logger.exception("Rendering image %s failed", key)
+            status = "failed"
+            failed += 1
+        mark_images(db, key, status)
+        db.commit()
+    return {"rendered": done, "failed": failed}
+
+
+def get_image_pipeline() -> ImagePipeline:
+    return current_app.extensions["image_pipeline"]
+
+
+def init_images(app: Flask) -> ImagePipeline:
+    app.config.setdefault("IMAGE_DIR", default_image_dir())
+    app.config.setdefault("MEDIA_URL", os.getenv("MEDIA_URL", "/media").rstrip("/"))
+    app.config.setdefault("IMAGE_MAX_BYTES", int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024))))
+    app.config.setdefault("IMAGE_MAX_PIXELS", int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000))))
+    app.config.setdefault("IMAGE_WORKERS", int(os.getenv("IMAGE_WORKERS", "1")))
+    # Lets nginx/Apache send the files themselves (X-Sendfile); off by default
+    app.config.setdefault("USE_X_SENDFILE", os.getenv("USE_X_SENDFILE", "false").lower() == "true")
+
+    pipeline = ImagePipeline(
+        app.config["IMAGE_DIR"],
+        app.config["DATABASE_PATH"],
+        workers=app.config["IMAGE_WORKERS"],
+        writer=app.extensions.get("write_queue"),
+        response_cache=app.extensions.get("response_cache"),
+    )
+    app.extensions["image_pipeline"] = pipeline
+    return pipeline
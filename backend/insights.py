@@ -0,0 +1,242 @@
+import math
+import sqlite3
+
+# Rent market insights: count, mean and percentiles of asking rent per market
+# segment (city, neighborhood, property type, bedrooms), answered without
+# scanning properties.
+#
+# Every segment keeps a listing count, a rent total (for the mean) and a
+# log-bucket histogram of rents: bucket i holds rents in
+# (GAMMA^(i-1), GAMMA^i], so any percentile read back from it is within
+# RENT_SKETCH_ACCURACY of a rent actually listed. Unlike sampling sketches the
+# histogram is exact about counts, so a deleted or edited listing is simply
+# taken back out of its bucket.
+#
+# Triggers on properties (schema v9) keep the tables current in the same
+# transaction as the listing write, including deletes cascaded from a user.
+# Each listing is counted in all 16 roll-ups of its segment, with '*' for
+# "any", so a query with any mix of filters reads one segment: a single row
+# plus at most a few hundred histogram buckets, however many listings there
+# are. Listings awaiting approval are left out.
+
+RENT_SKETCH_ACCURACY = 0.01
+GAMMA = (1 + RENT_SKETCH_ACCURACY) / (1 - RENT_SKETCH_ACCURACY)
+# Bucket 0 holds everything up to 1; the last bucket everything above ~10^9
+RENT_SKETCH_BUCKETS = math.ceil(math.log(1e9) / math.log(GAMMA)) + 1
+
+ANY = "*"
+
+# Segment column -> how a listing's value is normalised into its key
+SEGMENT_KEYS = {
+    "city": "lower(trim(coalesce({row}.city, '')))",
+    "neighborhood": "lower(trim(coalesce({row}.neighborhood, '')))",
+    "property_type": "lower(trim(coalesce({row}.property_type, '')))",
+    "bedrooms": "coalesce(CAST(CAST({row}.bedrooms AS INTEGER) AS TEXT), '')",
+}
+SEGMENT_COLUMNS = ", ".join(SEGMENT_KEYS)
+
+PERCENTILES = {"p10": 0.10, "p25": 0.25, "median": 0.50, "p75": 0.75, "p90": 0.90}
+
+
+def _rent(row: str) -> str:
+    return f"CAST({row}.rent_amount AS REAL)"
+
+
+def _bucket(row: str) -> str:
+    return (
+        f"coalesce((SELECT bucket FROM rent_buckets WHERE upper >= {_rent(row)} ORDER BY upper LIMIT 1), "
+        f"{RENT_SKETCH_BUCKETS - 1})"
+    )
+
+
+def _segments(row: str, source: str = "") -> str:
+    """One SELECT per roll-up of ``row``'s segment, each with its rent and bucket."""
+    selects = []
+    for mask in range(1 << len(SEGMENT_KEYS)):
+        keys = ", ".join(
+            f"{expr.format(row=row) if mask & (1 << i) else repr(ANY)} AS {column}"
+            for i, (column, expr) in enumerate(SEGMENT_KEYS.items())
+        )
+        selects.append(
+            f"SELECT {keys}, {_rent(row)} AS rent, {_bucket(row)} AS bucket {source} "
+            f"WHERE {row}.status IS NOT 'pending_approval'"
+        )
+    return " UNION ALL ".join(selects)
+
+
+def _add(row: str) -> list[str]:
+    segments = _segments(row)
+    return [
+        f"""
+        INSERT INTO rent_segments ({SEGMENT_COLUMNS}, listings, rent_total)
+        SELECT {SEGMENT_COLUMNS}, 1, rent FROM ({segments}) WHERE true
+        ON CONFLICT ({SEGMENT_COLUMNS}) DO UPDATE SET
+            listings = listings + 1, rent_total = rent_total + excluded.rent_total;
+        """,
+        f"""
+        INSERT INTO rent_sketch ({SEGMENT_COLUMNS}, bucket, listings)
+        SELECT {SEGMENT_COLUMNS}, bucket, 1 FROM ({segments}) WHERE true
+        ON CONFLICT ({SEGMENT_COLUMNS}, bucket) DO UPDATE SET listings = listings + 1;
+        """,
+    ]
+
+
+def _remove(row: str) -> list[str]:
+    segments = f"SELECT {SEGMENT_COLUMNS} FROM ({_segments(row)})"
+    return [
+        f"""
+        UPDATE rent_segments SET listings = listings - 1, rent_total = rent_total - {_rent(row)}
+        WHERE ({SEGMENT_COLUMNS}) IN ({segments});
+        """,
+        f"DELETE FROM rent_segments WHERE listings <= 0 AND ({SEGMENT_COLUMNS}) IN ({segments});",
+        f"""
+        UPDATE rent_sketch SET listings = listings - 1
+        WHERE bucket = {_bucket(row)} AND ({SEGMENT_COLUMNS}) IN ({segments});
+        """,
+        f"""
+        DELETE FROM rent_sketch
+        WHERE listings <= 0 AND bucket = {_bucket(row)} AND ({SEGMENT_COLUMNS}) IN ({segments});
+        """,
+    ]
+
+
+def create_rent_sketch(cur: sqlite3.Cursor) -> None:
+    """Tables and triggers behind the rent insights (schema v9), filled from current listings."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rent_buckets (
+            bucket INTEGER PRIMARY KEY,
+            upper REAL NOT NULL UNIQUE,
+            value REAL NOT NULL
+        )
+        """
+    )
+    # The value reported for bucket i is the point whose relative error to
+    # both ends of (GAMMA^(i-1), GAMMA^i] is RENT_SKETCH_ACCURACY
+    cur.executemany(
+        "INSERT OR REPLACE INTO rent_buckets (bucket, upper, value) VALUES (?, ?, ?)",
+        [(0, 1.0, 1.0)] + [
+            (i, GAMMA ** i, 2 * GAMMA ** i / (GAMMA + 1)) for i in range(1, RENT_SKETCH_BUCKETS)
+        ],
+    )
+    key_columns = ", ".join(f"{column} TEXT NOT NULL" for column in SEGMENT_KEYS)
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS rent_segments (
+            {key_columns},
+            listings INTEGER NOT NULL,
+            rent_total REAL NOT NULL,
+            PRIMARY KEY ({SEGMENT_COLUMNS})
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS rent_sketch (
+            {key_columns},
+            bucket INTEGER NOT NULL,
+            listings INTEGER NOT NULL,
+            PRIMARY KEY ({SEGMENT_COLUMNS}, bucket)
+        ) WITHOUT ROWID
+        """
+    )
+    watched = f"rent_amount, status, {SEGMENT_COLUMNS}"
+    for name, event, statements in (
+        ("insert", "INSERT", _add("NEW")),
+        ("update", f"UPDATE OF {watched}", _remove("OLD") + _add("NEW")),
+        ("delete", "DELETE", _remove("OLD")),
+    ):
+        body = "".join(statements)
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS rent_sketch_properties_{name} AFTER {event} ON properties
+            BEGIN
+                {body}
+            END
+            """
+        )
+    _fill(cur)
+
+
+def _fill(db: sqlite3.Connection | sqlite3.Cursor) -> None:
+    segments = _segments("p", "FROM properties p")
+    db.execute(
+        f"""
+        INSERT INTO rent_segments ({SEGMENT_COLUMNS}, listings, rent_total)
+        SELECT {SEGMENT_COLUMNS}, COUNT(*), SUM(rent) FROM ({segments}) GROUP BY {SEGMENT_COLUMNS}
+        """
+    )
+    db.execute(
+        f"""
+        INSERT INTO rent_sketch ({SEGMENT_COLUMNS}, bucket, listings)
+        SELECT {SEGMENT_COLUMNS}, bucket, COUNT(*) FROM ({segments}) GROUP BY {SEGMENT_COLUMNS}, bucket
+        """
+    )
+
+
+def rebuild_rent_insights(db: sqlite3.Connection) -> int:
+    """Recompute the rent sketches from properties (repair after manual edits); returns segments."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM rent_sketch")
+        db.execute("DELETE FROM rent_segments")
+        _fill(db)
+        rows = db.execute("SELECT COUNT(*) FROM rent_segments").fetchone()[0]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return rows
+
+
+def segment_key(filters: dict) -> tuple[str, ...]:
+    """The rent_segments key for ``filters``; a missing or blank filter means any value."""
+    key = []
+    for column in SEGMENT_KEYS:
+        value = filters.get(column)
+        if value is None or str(value).strip() == "":
+            key.append(ANY)
+        elif column == "bedrooms":
+            key.append(str(int(value)))
+        else:
+            key.append(str(value).strip().lower())
+    return tuple(key)
+
+
+def rent_insights(db: sqlite3.Connection, filters: dict) -> dict:
+    """Count, mean and percentile rents of the listings matching ``filters``.
+
+    Raises ValueError for a bedrooms filter that is not a whole number.
+    """
+    key = segment_key(filters)
+    where = " AND ".join(f"{column} = ?" for column in SEGMENT_KEYS)
+    joined = " AND ".join(f"s.{column} = ?" for column in SEGMENT_KEYS)
+    segment = db.execute(f"SELECT listings, rent_total FROM rent_segments WHERE {where}", key).fetchone()
+    result: dict = {"listings": 0, "mean": None, **{name: None for name in PERCENTILES}}
+    if segment is None or segment[0] <= 0:
+        return result
+    listings, total = segment[0], segment[1]
+    buckets = db.execute(
+        f"""
+        SELECT b.value, s.listings FROM rent_sketch s JOIN rent_buckets b ON b.bucket = s.bucket
+        WHERE {joined}
+        ORDER BY s.bucket
+        """,
+        key,
+    ).fetchall()
+    result["listings"] = listings
+    result["mean"] = round(total / listings, 2)
+    # Nearest-rank percentiles walked off the cumulative bucket counts
+    targets = sorted((max(1, math.ceil(q * listings)), name) for name, q in PERCENTILES.items())
+    seen = 0
+    pending = iter(targets)
+    rank, name = next(pending)
+    for value, count in buckets:
+        seen += count
+        while seen >= rank:
+            result[name] = round(value, 2)
+            try:
+                rank, name = next(pending)
+            except StopIteration:
+                return result
+    return result
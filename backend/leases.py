@@ -0,0 +1,104 @@
+import sqlite3
+from datetime import date, timedelta
+
+# Lease lifecycle engine: expires active rentals whose end_date has passed,
+# releases their properties and queues renewal reminders ahead of expiry.
+# Every scan runs on idx_rentals_status_end_date and only touches rows that
+# change, and each batch commits separately so the write lock is held briefly.
+
+REMINDER_CHECKPOINT = "lease_reminders.horizon"
+RENTAL_ID_CHECKPOINT = "lease_reminders.last_rental_id"
+
+
+def get_checkpoint(db: sqlite3.Connection, name: str, default: str | None = None) -> str | None:
+    row = db.execute("SELECT value FROM job_checkpoints WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else default
+
+
+def set_checkpoint(db: sqlite3.Connection, name: str, value: str) -> None:
+    db.execute(
+        """
+        INSERT INTO job_checkpoints (name, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+        """,
+        (name, value),
+    )
+
+
+def expire_leases(db: sqlite3.Connection, today: date, batch_size: int = 500) -> int:
+    """Mark active leases that ended before ``today`` as expired and free their properties."""
+    cutoff = today.isoformat()
+    expired = 0
+    while True:
+        rows = db.execute(
+            """
+            SELECT id, property_id FROM rentals
+            WHERE status = 'active' AND end_date < ?
+            ORDER BY end_date
+            LIMIT ?
+            """,
+            (cutoff, batch_size),
+        ).fetchall()
+        if not rows:
+            return expired
+
+        db.executemany(
+            "UPDATE rentals SET status = 'expired', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            [(rental_id,) for rental_id, _ in rows],
+        )
+        # Only release a property no other active lease still covers
+        db.executemany(
+            """
+            UPDATE properties SET status = 'available', updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'rented' AND NOT EXISTS (
+                SELECT 1 FROM rentals WHERE property_id = ? AND status = 'active' AND end_date >= ?
+            )
+            """,
+            [(property_id, property_id, cutoff) for property_id in {row[1] for row in rows}],
+        )
+        db.commit()
+        expired += len(rows)
+
+
+def queue_renewal_reminders(db: sqlite3.Connection, today: date, days_ahead: int = 30) -> int:
+    """Queue one reminder per active lease ending within ``days_ahead`` days.
+
+    The end_date window already covered is checkpointed, so a run only scans
+    leases whose end_date entered the window since the last run, plus leases
+    created since then (which may end inside the old window).
+    """
+    horizon = (today + timedelta(days=days_ahead)).isoformat()
+    covered = get_checkpoint(db, REMINDER_CHECKPOINT, today.isoformat())
+    if covered < today.isoformat():
+        covered = today.isoformat()
+    last_rental_id = int(get_checkpoint(db, RENTAL_ID_CHECKPOINT, "0"))
+
+    insert = """
+        INSERT OR IGNORE INTO lease_reminders (rental_id, tenant_id, owner_id, end_date, kind)
+        SELECT id, tenant_id, owner_id, end_date, 'renewal' FROM rentals
+    """
+    cur = db.cursor()
+    cur.execute(
+        insert + " WHERE status = 'active' AND end_date > ? AND end_date <= ?",
+        (covered, horizon),
+    )
+    queued = cur.rowcount
+    cur.execute(
+        insert + " WHERE id > ? AND status = 'active' AND end_date >= ? AND end_date <= ?",
+        (last_rental_id, today.isoformat(), covered),
+    )
+    queued += cur.rowcount
+
+    max_id = db.execute("SELECT COALESCE(MAX(id), 0) FROM rentals").fetchone()[0]
+    set_checkpoint(db, REMINDER_CHECKPOINT, max(horizon, covered))
+    set_checkpoint(db, RENTAL_ID_CHECKPOINT, str(max(max_id, last_rental_id)))
+    db.commit()
+    return queued
+
+
+def run_lease_lifecycle(db: sqlite3.Connection, today: date | None = None,
+                        batch_size: int = 500, reminder_days: int = 30) -> dict:
+    today = today or date.today()
+    expired = expire_leases(db, today, batch_size)
+    reminders = queue_renewal_reminders(db, today, reminder_days)
+    return {"expired": expired, "reminders_queued": reminders}
@@ -0,0 +1,212 @@
+import calendar
+import re
+import sqlite3
+from datetime import date
+
+# Rent ledger: monthly invoices generated for every active lease, payments
+# recorded against them, and revenue_monthly kept as materialized
+# per-owner/per-month totals. Every write updates revenue_monthly in the same
+# transaction, so dashboards read precomputed rows instead of summing the ledger.
+
+_PERIOD = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+
+def current_period(today: date | None = None) -> str:
+    return (today or date.today()).strftime("%Y-%m")
+
+
+def period_bounds(period: str) -> tuple[str, str]:
+    """First and last day of a ``YYYY-MM`` period; ``ValueError`` if malformed."""
+    if not _PERIOD.match(period or ""):
+        raise ValueError("Period must look like YYYY-MM.")
+    year, month = int(period[:4]), int(period[5:])
+    last_day = calendar.monthrange(year, month)[1]
+    return f"{period}-01", f"{period}-{last_day:02d}"
+
+
+def generate_invoices(db: sqlite3.Connection, period: str, due_day: int = 5) -> int:
+    """Invoice every lease active during ``period`` in a single transaction.
+
+    Leases that already have an invoice for the period are skipped, so the
+    job can be re-run safely. Returns the number of invoices created.
+    """
+    return _invoice_leases(db, period, due_day, "rentals", "", ())
+
+
+def generate_invoice_batch(db: sqlite3.Connection, period: str, due_day: int, after_rental_id: int,
+                           batch_size: int) -> tuple[int, int | None]:
+    """``generate_invoices`` for the next ``batch_size`` active leases by id after ``after_rental_id``.
+
+    Returns (invoices created, id of the last lease covered), with ``None``
+    once no leases are left, so a caller can checkpoint its way through the
+    leases in short transactions.
+    """
+    start, end = period_bounds(period)
+    # NOT INDEXED: walk the id range rather than every active lease in the status index
+    row = db.execute(
+        """
+        SELECT MAX(id) FROM (
+            SELECT id FROM rentals NOT INDEXED
+            WHERE id > ? AND status = 'active' AND start_date <= ? AND end_date >= ?
+            ORDER BY id LIMIT ?
+        )
+        """,
+        (after_rental_id, end, start, batch_size),
+    ).fetchone()
+    if row[0] is None:
+        return 0, None
+    created = _invoice_leases(
+        db, period, due_day, "rentals NOT INDEXED", " AND id > ? AND id <= ?", (after_rental_id, row[0])
+    )
+    return created, row[0]
+
+
+def _invoice_leases(db: sqlite3.Connection, period: str, due_day: int, source: str, where: str,
+                    params: tuple) -> int:
+    start, end = period_bounds(period)
+    due_date = f"{period}-{min(max(due_day, 1), 28):02d}"
+
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        last_id = db.execute("SELECT COALESCE(MAX(id), 0) FROM invoices").fetchone()[0]
+        db.execute(
+            f"""
+            INSERT OR IGNORE INTO invoices
+                (invoice_number, rental_id, property_id, tenant_id, owner_id, period, amount_due, due_date)
+            SELECT printf('INV-%s-%06d', replace(?, '-', ''), id),
+                   id, property_id, tenant_id, owner_id, ?, rent_amount, ?
+            FROM {source}
+            WHERE status = 'active' AND start_date <= ? AND end_date >= ?{where}
+            """,
+            (period, period, due_date, end, start, *params),
+        )
+        # Fold only this run's invoices into the materialized totals
+        db.execute(
+            """
+            INSERT INTO revenue_monthly (owner_id, period, invoiced, invoice_count)
+            SELECT owner_id, period, ROUND(SUM(amount_due), 2), COUNT(*)
+            FROM invoices WHERE id > ?
+            GROUP BY owner_id, period
+            ON CONFLICT(owner_id, period) DO UPDATE SET
+                invoiced = ROUND(invoiced + excluded.invoiced, 2),
+                invoice_count = invoice_count + excluded.invoice_count
+            """,
+            (last_id,),
+        )
+        created = db.execute("SELECT COUNT(*) FROM invoices WHERE id > ?", (last_id,)).fetchone()[0]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return created
+
+
+def mark_overdue(db: sqlite3.Connection, today: date | None = None, limit: int = -1) -> int:
+    """Flag unpaid invoices whose due date has passed, at most ``limit`` of them (all by default)."""
+    cur = db.execute(
+        """
+        UPDATE invoices SET status = 'overdue', updated_at = CURRENT_TIMESTAMP
+        WHERE id IN (
+            SELECT id FROM invoices WHERE status IN ('pending', 'partial') AND due_date < ? LIMIT ?
+        )
+        """,
+        ((today or date.today()).isoformat(), limit),
+    )
+    db.commit()
+    return cur.rowcount
+
+
+def record_payment(db: sqlite3.Connection, invoice_id: int, amount: float, method: str | None = None,
+                   reference: str | None = None, recorded_by: int | None = None) -> dict | None:
+    """Apply a payment to an invoice and its owner's revenue for the invoice's period.
+
+    Returns the updated invoice totals, ``None`` if the invoice does not
+    exist, and raises ``ValueError`` for amounts the invoice cannot take.
+    """
+    try:
+        amount = round(float(amount), 2)
+    except (TypeError, ValueError):
+        raise ValueError("Payment amount must be a number.") from None
+    if amount <= 0:
+        raise ValueError("Payment amount must be positive.")
+
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute(
+            "SELECT tenant_id, owner_id, period, amount_due, amount_paid, status FROM invoices WHERE id = ?",
+            (invoice_id,),
+        ).fetchone()
+        if row is None:
+            db.rollback()
+            return None
+        tenant_id, owner_id, period, amount_due, amount_paid, status = row
+        balance = round(amount_due - amount_paid, 2)
+        if status == "void":
+            raise ValueError("Invoice has been voided.")
+        if amount > balance:
+            raise ValueError(f"Payment exceeds the outstanding balance of {balance:.2f}.")
+
+        cur = db.execute(
+            """
+            INSERT INTO payments (invoice_id, tenant_id, owner_id, amount, method, reference, recorded_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (invoice_id, tenant_id, owner_id, amount, method, reference, recorded_by),
+        )
+        payment_id = cur.lastrowid
+        amount_paid = round(amount_paid + amount, 2)
+        if amount_paid >= amount_due:
+            status = "paid"
+        elif status == "pending":
+            status = "partial"
+        db.execute(
+            "UPDATE invoices SET amount_paid = ?, status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (amount_paid, status, invoice_id),
+        )
+        db.execute(
+            """
+            INSERT INTO revenue_monthly (owner_id, period, collected, payment_count) VALUES (?, ?, ?, 1)
+            ON CONFLICT(owner_id, period) DO UPDATE SET
+                collected = ROUND(collected + excluded.collected, 2),
+                payment_count = payment_count + 1
+            """,
+            (owner_id, period, amount),
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {
+        "payment_id": payment_id,
+        "invoice_id": invoice_id,
+        "amount_paid": amount_paid,
+        "balance": round(amount_due - amount_paid, 2),
+        "status": status,
+    }
+
+
+def rebuild_revenue(db: sqlite3.Connection) -> int:
+    """Recompute revenue_monthly from the ledger (repair after manual edits)."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM revenue_monthly")
+        db.execute(
+            """
+            INSERT INTO revenue_monthly (owner_id, period, invoiced, collected, invoice_count, payment_count)
+            SELECT i.owner_id, i.period, ROUND(SUM(i.amount_due), 2),
+                   ROUND(COALESCE(SUM(p.collected), 0), 2), COUNT(*), COALESCE(SUM(p.payments), 0)
+            FROM invoices i
+            LEFT JOIN (
+                SELECT invoice_id, SUM(amount) AS collected, COUNT(*) AS payments
+                FROM payments GROUP BY invoice_id
+            ) p ON p.invoice_id = i.id
+            WHERE i.status != 'void'
+            GROUP BY i.owner_id, i.period
+            """
+        )
+        rows = db.execute("SELECT COUNT(*) FROM revenue_monthly").fetchone()[0]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return rows
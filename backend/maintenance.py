@@ -0,0 +1,291 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from flask import Flask
+
+try:  # Support running as module or script
+    from .archive import archive_cold_rows
+    from .changes import compact_changes
+    from .leases import get_checkpoint, run_lease_lifecycle, set_checkpoint
+    from .ledger import current_period, generate_invoice_batch, mark_overdue
+except Exception:  # pragma: no cover
+    from archive import archive_cold_rows  # type: ignore
+    from changes import compact_changes  # type: ignore
+    from leases import get_checkpoint, run_lease_lifecycle, set_checkpoint  # type: ignore
+    from ledger import current_period, generate_invoice_batch, mark_overdue  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Seconds between runs of each job; override with MAINTENANCE_<NAME>_INTERVAL
+# (0 disables a job).
+DEFAULT_JOB_INTERVALS = {
+    "purge_reset_codes": 3600,
+    "wal_checkpoint": 300,
+    "optimize": 6 * 3600,
+    "incremental_vacuum": 3600,
+    "leases": 3600,
+    "invoices": 24 * 3600,
+    "changes": 3600,
+    "archive": 3600,
+}
+
+LEADER_CHECKPOINT = "maintenance.leader"
+# "<period>|<last rental id invoiced, or done>" of an invoice run still in progress
+INVOICE_CHECKPOINT = "invoices.rental_id"
+
+
+def purge_reset_codes(db: sqlite3.Connection, deadline: float, batch_size: int = 500) -> int:
+    """Delete expired password reset codes in small batches."""
+    now = int(time.time())
+    purged = 0
+    while time.monotonic() < deadline:
+        cur = db.execute(
+            "DELETE FROM reset_codes WHERE id IN (SELECT id FROM reset_codes WHERE expiry < ? LIMIT ?)",
+            (now, batch_size),
+        )
+        db.commit()
+        purged += cur.rowcount
+        if cur.rowcount < batch_size:
+            break
+    return purged
+
+
+def optimize(db: sqlite3.Connection, deadline: float) -> str:
+    """Refresh planner statistics for tables whose contents changed noticeably."""
+    # analysis_limit samples large indexes instead of scanning them in full
+    db.execute("PRAGMA analysis_limit = 400")
+    db.execute("PRAGMA optimize")
+    return "ok"
+
+
+def wal_checkpoint(db: sqlite3.Connection, deadline: float, max_wal_bytes: int | None = None) -> dict:
+    """Copy WAL frames back into the database.
+
+    A PASSIVE checkpoint never waits on readers or writers; once the WAL
+    grows past ``max_wal_bytes`` a TRUNCATE checkpoint also shrinks the file,
+    waiting at most the connection's (short) busy timeout for the lock.
+    """
+    max_wal_bytes = max_wal_bytes or int(os.getenv("WAL_CHECKPOINT_MAX_BYTES", str(16 * 1024 * 1024)))
+    path = db.execute("PRAGMA database_list").fetchone()[2]
+    wal_path = f"{path}-wal"
+    wal_size = os.path.getsize(wal_path) if path and os.path.exists(wal_path) else 0
+    mode = "TRUNCATE" if wal_size > max_wal_bytes else "PASSIVE"
+    busy, log_frames, checkpointed = db.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    return {"mode": mode, "wal_bytes": wal_size, "busy": bool(busy), "frames": log_frames, "checkpointed": checkpointed}
+
+
+def incremental_vacuum(db: sqlite3.Connection, deadline: float, pages: int = 256) -> int:
+    """Return free pages to the filesystem a few hundred at a time.
+
+    Only works on databases in auto_vacuum=INCREMENTAL mode; run
+    ``python -m backend.manage vacuum`` once to convert an existing file.
+    """
+    if db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return 0
+    start = free = db.execute("PRAGMA freelist_count").fetchone()[0]
+    while free and time.monotonic() < deadline:
+        db.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+        remaining = db.execute("PRAGMA freelist_count").fetchone()[0]
+        if remaining >= free:  # nothing more can be released right now
+            break
+        free = remaining
+    return start - free
+
+
+def lease_lifecycle(db: sqlite3.Connection, deadline: float) -> dict:
+    return run_lease_lifecycle(db, batch_size=100, reminder_days=int(os.getenv("LEASE_REMINDER_DAYS", "30")))
+
+
+def monthly_invoices(db: sqlite3.Connection, deadline: float, batch_size: int = 200) -> dict:
+    """Invoice active leases, then flag overdue invoices, a batch at a time.
+
+    The last lease id invoiced is checkpointed after every batch ("done" once
+    all are), so a run cut short by ``deadline`` picks up where it stopped on
+    the next tick. A finished run resets the checkpoint, so the next daily
+    run looks at every lease again.
+    """
+    today = date.today()
+    period = current_period(today)
+    due_day = int(os.getenv("INVOICE_DUE_DAY", "5"))
+    checkpoint_period, _, last_id = (get_checkpoint(db, INVOICE_CHECKPOINT) or "").partition("|")
+    after_id = 0
+    if checkpoint_period == period:
+        after_id = None if last_id == "done" else int(last_id)
+    created = overdue = 0
+    while after_id is not None and time.monotonic() < deadline:
+        batch_created, after_id = generate_invoice_batch(db, period, due_day, after_id, batch_size)
+        created += batch_created
+        set_checkpoint(db, INVOICE_CHECKPOINT, f"{period}|{'done' if after_id is None else after_id}")
+        db.commit()
+    while after_id is None and time.monotonic() < deadline:
+        marked = mark_overdue(db, today, batch_size)
+        overdue += marked
+        if marked < batch_size:
+            set_checkpoint(db, INVOICE_CHECKPOINT, f"{period}|0")
+            db.commit()
+            return {"created": created, "overdue": overdue}
+    return {"created": created, "overdue": overdue, "complete": False}
+
+
+def change_log_compaction(db: sqlite3.Connection, deadline: float) -> int:
+    return compact_changes(db, deadline, retention_days=int(os.getenv("CHANGES_RETENTION_DAYS", "7")))
+
+
+JOBS = {
+    "purge_reset_codes": purge_reset_codes,
+    "wal_checkpoint": wal_checkpoint,
+    "optimize": optimize,
+    "incremental_vacuum": incremental_vacuum,
+    "leases": lease_lifecycle,
+    "invoices": monthly_invoices,
+    "changes": change_log_compaction,
+    "archive": archive_cold_rows,
+}
+
+
+class MaintenanceScheduler:
+    """Runs the housekeeping jobs from one background thread per process.
+
+    Every worker runs a scheduler thread, but only the one holding the leader
+    lease (a row in ``job_checkpoints`` renewed each tick) does any work, so
+    jobs run once per host no matter how many workers there are. Each job
+    gets ``budget`` seconds: SQLite interrupts any statement still running
+    past it and the job's open transaction is rolled back, so housekeeping
+    never holds the write lock long enough to stall requests. A job that
+    returns ``{"complete": False}`` ran out of time with work left and runs
+    again on the next tick instead of waiting out its interval.
+    """
+
+    def __init__(self, db_path: str, intervals: dict[str, float], tick: float = 30.0,
+                 budget: float = 0.25, busy_timeout: float = 0.1) -> None:
+        self.db_path = db_path
+        self.intervals = {name: interval for name, interval in intervals.items() if interval > 0}
+        self.tick = tick
+        self.budget = budget
+        self.busy_timeout = busy_timeout
+        self.identity = f"{socket.gethostname()}:{os.getpid()}"
+        self.results: dict[str, dict] = {}
+        self._thread = None
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+
+    def ensure_started(self) -> None:
+        # Threads do not survive fork, so each worker starts its own on first use
+        pid = os.getpid()
+        if self._thread_pid == pid:
+            return
+        with self._lock:
+            if self._thread_pid == pid:
+                return
+            self.identity = f"{socket.gethostname()}:{pid}"
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._loop, name="maintenance", daemon=True)
+            self._thread.start()
+            self._thread_pid = pid
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.tick):
+            try:
+                self.run_pending()
+            except Exception:  # keep the thread alive whatever a tick hits
+                logger.exception("Maintenance tick failed")
+
+    def acquire_leadership(self, db: sqlite3.Connection) -> bool:
+        """Take or renew the leader lease; it lapses if the leader stops renewing it."""
+        now = time.time()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:  # a writer is busy; try again next tick
+            return False
+        try:
+            holder, _, expires = (get_checkpoint(db, LEADER_CHECKPOINT) or "").rpartition("|")
+            if holder and holder != self.identity and float(expires) > now:
+                db.rollback()
+                return False
+            set_checkpoint(db, LEADER_CHECKPOINT, f"{self.identity}|{now + self.tick * 3}")
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+
+    def run_pending(self, force: bool = False, only: str | None = None) -> dict[str, dict]:
+        """Run every due job (or all of them with ``force``) and return their results."""
+        db = self._connect()
+        try:
+            if not force and not self.acquire_leadership(db):
+                return {}
+            ran = {}
+            for name, interval in self.intervals.items():
+                if only and name != only:
+                    continue
+                last_run = float(get_checkpoint(db, f"maintenance.{name}.last_run", "0"))
+                if not force and time.time() - last_run < interval:
+                    continue
+                ran[name] = self.run_job(db, name)
+            return ran
+        finally:
+            db.close()
+
+    def run_job(self, db: sqlite3.Connection, name: str) -> dict:
+        started = time.monotonic()
+        deadline = started + self.budget
+        db.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        try:
+            result = {"result": JOBS[name](db, deadline)}
+        except sqlite3.Error as e:
+            # Out of time or locked out: retried on the next tick
+            db.rollback()
+            result = {"error": str(e)}
+            logger.warning("Maintenance job %s stopped: %s", name, e)
+        finally:
+            db.set_progress_handler(None, 0)
+        result["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+        result["finished_at"] = time.time()
+        self.results[name] = result
+
+        unfinished = isinstance(result.get("result"), dict) and result["result"].get("complete") is False
+        if "error" not in result and not unfinished:
+            try:
+                set_checkpoint(db, f"maintenance.{name}.last_run", str(time.time()))
+                db.commit()
+            except sqlite3.OperationalError:
+                db.rollback()
+        return result
+
+
+def init_maintenance(app: Flask) -> MaintenanceScheduler:
+    app.config.setdefault("MAINTENANCE_ENABLED", os.getenv("MAINTENANCE_ENABLED", "true").lower() == "true")
+    app.config.setdefault("MAINTENANCE_TICK", float(os.getenv("MAINTENANCE_TICK", "30")))
+    app.config.setdefault("MAINTENANCE_JOB_BUDGET_MS", int(os.getenv("MAINTENANCE_JOB_BUDGET_MS", "250")))
+    for name, interval in DEFAULT_JOB_INTERVALS.items():
+        key = f"MAINTENANCE_{name.upper()}_INTERVAL"
+        app.config.setdefault(key, float(os.getenv(key, str(interval))))
+    intervals = {name: float(app.config[f"MAINTENANCE_{name.upper()}_INTERVAL"]) for name in DEFAULT_JOB_INTERVALS}
+
+    scheduler = MaintenanceScheduler(
+        app.config["DATABASE_PATH"],
+        intervals,
+        tick=app.config["MAINTENANCE_TICK"],
+        budget=app.config["MAINTENANCE_JOB_BUDGET_MS"] / 1000,
+    )
+    app.extensions["maintenance"] = scheduler
+
+    if app.config["MAINTENANCE_ENABLED"]:
+        @app.before_request
+        def start_maintenance() -> None:
+            scheduler.ensure_started()
+
+    return scheduler
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Database management commands for Garissa House Rental Hub.
+Run from the project root:
+
+    python -m backend.manage bootstrap   # create/upgrade the schema and seed the admin user
+    python -m backend.manage migrate     # create/upgrade the schema only
+    python -m backend.manage version     # print the schema version
+    python -m backend.manage leases      # expire ended leases and queue renewal reminders
+    python -m backend.manage invoices    # invoice active leases for this month (--period YYYY-MM)
+    python -m backend.manage revenue     # rebuild the materialized revenue totals from the ledger
+    python -m backend.manage counters    # recount every property's favorite_count from the favorites table
+    python -m backend.manage insights    # rebuild the rent market sketches from the listings
+    python -m backend.manage dedupe      # re-index every listing and flag near-duplicates for admin review
+    python -m backend.manage images      # render uploaded images left pending or failed
+    python -m backend.manage archive     # move cold messages, contact requests and ended leases to the archive
+    python -m backend.manage maintenance # run the housekeeping jobs now (--job NAME for one)
+    python -m backend.manage vacuum      # compact the file and enable incremental vacuum (offline)
+    python -m backend.manage backup      # online, compressed and checksummed snapshot (--keep N)
+    python -m backend.manage verify      # verify every snapshot, or just the one given
+    python -m backend.manage restore SNAPSHOT
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+try:  # Support running as module or script
+    from .archive import archive_cold_rows, default_archive_path
+    from .backup import create_snapshot, default_backup_dir, list_snapshots, restore_snapshot, verify_snapshot
+    from .counters import rebuild_favorite_counts
+    from .duplicates import dedupe_listings
+    from .images import default_image_dir, render_pending
+    from .insights import rebuild_rent_insights
+    from .leases import run_lease_lifecycle
+    from .ledger import current_period, generate_invoices, mark_overdue, rebuild_revenue
+    from .maintenance import DEFAULT_JOB_INTERVALS, MaintenanceScheduler
+    from .models import SCHEMA_VERSION, migrate, schema_version, seed_admin_user
+except Exception:  # pragma: no cover
+    from archive import archive_cold_rows, default_archive_path  # type: ignore
+    from backup import create_snapshot, default_backup_dir, list_snapshots, restore_snapshot, verify_snapshot  # type: ignore
+    from counters import rebuild_favorite_counts  # type: ignore
+    from duplicates import dedupe_listings  # type: ignore
+    from images import default_image_dir, render_pending  # type: ignore
+    from insights import rebuild_rent_insights  # type: ignore
+    from leases import run_lease_lifecycle  # type: ignore
+    from ledger import current_period, generate_invoices, mark_overdue, rebuild_revenue  # type: ignore
+    from maintenance import DEFAULT_JOB_INTERVALS, MaintenanceScheduler  # type: ignore
+    from models import SCHEMA_VERSION, migrate, schema_version, seed_admin_user  # type: ignore
+
+
+def default_db_path() -> str:
+    return os.getenv("DATABASE_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.db")
+
+
+def cmd_migrate(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    start = migrate(conn)
+    if start == SCHEMA_VERSION:
+        print(f"ℹ️  Schema already at version {SCHEMA_VERSION}")
+    else:
+        print(f"✅ Schema migrated from version {start} to {SCHEMA_VERSION}")
+
+
+def cmd_bootstrap(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    cmd_migrate(conn, args)
+    seed_admin_user(conn)
+
+
+def cmd_version(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    print(f"Schema version {schema_version(conn)} (code expects {SCHEMA_VERSION})")
+
+
+def cmd_leases(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    result = run_lease_lifecycle(conn, reminder_days=int(os.getenv("LEASE_REMINDER_DAYS", "30")))
+    print(f"✅ {result['expired']} lease(s) expired, {result['reminders_queued']} renewal reminder(s) queued")
+
+
+def cmd_invoices(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    period = args.period or current_period()
+    created = generate_invoices(conn, period, due_day=int(os.getenv("INVOICE_DUE_DAY", "5")))
+    overdue = mark_overdue(conn)
+    print(f"✅ {created} invoice(s) generated for {period}, {overdue} invoice(s) now overdue")
+
+
+def cmd_revenue(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    rows = rebuild_revenue(conn)
+    print(f"✅ Revenue totals rebuilt ({rows} owner-month row(s))")
+
+
+def cmd_counters(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    rows = rebuild_favorite_counts(conn)
+    print(f"✅ Favorite counts recounted ({rows} property row(s))")
+
+
+def cmd_insights(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    rows = rebuild_rent_insights(conn)
+    print(f"✅ Rent insights rebuilt ({rows} segment(s))")
+
+
+def cmd_dedupe(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    result = dedupe_listings(conn)
+    print(
+        f"✅ {result['indexed']} listing(s) indexed, {result['duplicates']} likely duplicate(s), "
+        f"{result['flagged']} moved to pending_approval"
+    )
+
+
+def cmd_images(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    result = render_pending(conn, default_image_dir())
+    print(f"✅ Images rendered: {result['rendered']}, failed: {result['failed']}")
+
+
+def cmd_archive(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    # No time limit from the shell: keep going chunk by chunk until nothing cold is left
+    moved = archive_cold_rows(conn, float("inf"), default_archive_path(args.database))
+    print(f"✅ Archived: {', '.join(f'{count} {table}' for table, count in moved.items())}")
+
+
+def cmd_maintenance(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    # Run from the shell there is no request latency to protect, so give each job a generous budget
+    scheduler = MaintenanceScheduler(args.database, DEFAULT_JOB_INTERVALS, budget=60.0, busy_timeout=30.0)
+    for name, result in scheduler.run_pending(force=True, only=args.job).items():
+        if "error" in result:
+            print(f"❌ {name}: {result['error']}")
+        else:
+            print(f"✅ {name}: {result['result']} ({result['duration_ms']} ms)")
+
+
+def cmd_vacuum(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    # Rewrites the whole file and blocks writers meanwhile; run during a quiet period
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    print("✅ Database compacted; incremental vacuum enabled")
+
+
+def _snapshot(args: argparse.Namespace, label: str = "") -> dict:
+    return create_snapshot(
+        args.database, args.backup_dir,
+        pages=int(os.getenv("BACKUP_STEP_PAGES", "0")),
+        sleep=int(os.getenv("BACKUP_STEP_SLEEP_MS", "5")) / 1000,
+        keep=args.keep, label=label,
+    )
+
+
+def cmd_backup(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    manifest = _snapshot(args)
+    print(
+        f"✅ {manifest['snapshot']}: {manifest['size']} bytes -> {manifest['compressed_size']} compressed "
+        f"in {manifest['duration_ms']} ms (sha256 {manifest['sha256'][:12]})"
+    )
+    archive = manifest["archive"]
+    if archive:
+        print(f"ℹ️  Archive {archive['snapshot']}: {archive['size']} bytes -> {archive['compressed_size']} compressed")
+    for name in manifest["removed"]:
+        print(f"ℹ️  Rotated out {name}")
+
+
+def cmd_verify(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    snapshots = [args.snapshot] if args.snapshot else list_snapshots(args.backup_dir)
+    if not snapshots:
+        raise ValueError(f"No snapshots in {args.backup_dir}")
+    failed = 0
+    for snapshot in snapshots:
+        result = verify_snapshot(snapshot)
+        if result["ok"]:
+            print(f"✅ {result['snapshot']}: ok (schema version {result['schema_version']})")
+        else:
+            failed += 1
+            print(f"❌ {result['snapshot']}: {result.get('error') or result.get('integrity')}")
+    if failed:
+        raise ValueError(f"{failed} snapshot(s) failed verification")
+
+
+def cmd_restore(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    if not args.snapshot:
+        raise ValueError("Give the snapshot file to restore")
+    # Keep the current state so a wrong restore can be undone
+    safety = _snapshot(args, label="pre-restore")
+    restore_snapshot(args.snapshot, args.database)
+    print(f"✅ Restored {os.path.basename(args.snapshot)} (previous data saved as {safety['snapshot']})")
+
+
+COMMANDS = {
+    "archive": cmd_archive,
+    "backup": cmd_backup,
+    "bootstrap": cmd_bootstrap,
+    "counters": cmd_counters,
+    "dedupe": cmd_dedupe,
+    "images": cmd_images,
+    "insights": cmd_insights,
+    "invoices": cmd_invoices,
+    "leases": cmd_leases,
+    "maintenance": cmd_maintenance,
+    "migrate": cmd_migrate,
+    "restore": cmd_restore,
+    "revenue": cmd_revenue,
+    "vacuum": cmd_vacuum,
+    "verify": cmd_verify,
+    "version": cmd_version,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("snapshot", nargs="?", help="Snapshot file for `restore` and `verify`")
+    parser.add_argument("--database", default=default_db_path(), help="SQLite file (default: DATABASE_PATH or backend/database.db)")
+    parser.add_argument("--period", help="Billing month for `invoices` as YYYY-MM (default: current month)")
+    parser.add_argument("--job", choices=sorted(DEFAULT_JOB_INTERVALS), help="Single job for `maintenance`")
+    parser.add_argument("--backup-dir", default=default_backup_dir(), help="Snapshot directory (default: BACKUP_DIR or backend/backups)")
+    parser.add_argument("--keep", type=int, default=int(os.getenv("BACKUP_KEEP", "7")), help="Snapshots kept by `backup`")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.database, timeout=30)
+    try:
+        COMMANDS[args.command](conn, args)
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return 1
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,18 @@
 import os
 import sqlite3
-from flask import current_app, g
+import threading
+from flask import current_app, g, has_request_context
+
+try:  # Support running as module or script
+    from .availability import create_booking_guards, create_date_order_guards
+    from .duplicates import create_listing_index
+    from .insights import create_rent_sketch
+    from .sorting import create_sort_indexes
+except Exception:  # pragma: no cover
+    from availability import create_booking_guards, create_date_order_guards  # type: ignore
+    from duplicates import create_listing_index  # type: ignore
+    from insights import create_rent_sketch  # type: ignore
+    from sorting import create_sort_indexes  # type: ignore
 
 
 def _ensure_db_path() -> str:
@@ -13,25 +25,119 @@ def _ensure_db_path() -> str:
     return db_path
 
 
+class ConnectionPool:
+    """Idle request connections kept open between requests.
+
+    sqlite3 caches compiled statements per connection, so a connection that
+    lives across requests stops re-preparing the same SQL on every call. Idle
+    connections are keyed by how they were opened (read-only or not), handed
+    back with no transaction open, and forgotten after a fork: the child
+    opens its own instead of sharing the parent's file handles.
+    """
+
+    def __init__(self, size: int = 8) -> None:
+        self.size = size
+        self.opened = 0
+        self.reused = 0
+        self._idle: dict[tuple, list[sqlite3.Connection]] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: tuple) -> sqlite3.Connection | None:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._idle, self._pid = {}, os.getpid()
+            idle = self._idle.get(key)
+            if idle:
+                self.reused += 1
+                return idle.pop()
+            self.opened += 1
+            return None
+
+    def release(self, key: tuple, conn: sqlite3.Connection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if self._pid == os.getpid() and len(idle) < self.size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        if self._pid == os.getpid():
+            for conns in idle.values():
+                for conn in conns:
+                    conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "idle": sum(len(conns) for conns in self._idle.values()),
+                "opened": self.opened,
+                "reused": self.reused,
+            }
+
+
 def get_db() -> sqlite3.Connection:
+    """The request's connection; read-only while writes go through the write queue."""
     if "db" not in g:
         db_path = _ensure_db_path()
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
+        busy_timeout = current_app.config.get("DATABASE_BUSY_TIMEOUT", 5.0)
+        writer = current_app.extensions.get("write_queue")
+        read_only = writer is not None and has_request_context()
+        if read_only:
+            writer.ensure_started()
+        key = (db_path, read_only)
+        pool = current_app.extensions.get("db_pool")
+        conn = pool.acquire(key) if pool is not None else None
+        if conn is None:
+            # Pooled connections move between request threads, one at a time
+            options = dict(
+                timeout=busy_timeout,
+                cached_statements=current_app.config.get("DATABASE_STATEMENT_CACHE", 256),
+                check_same_thread=pool is None,
+            )
+            if read_only:
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, **options)
+            else:
+                conn = sqlite3.connect(db_path, **options)
+            conn.row_factory = sqlite3.Row
         g.db = conn
+        g.db_key = key
     return g.db
 
 
 def close_db(e=None):  # noqa: ANN001
     db = g.pop("db", None)
-    if db is not None:
+    key = g.pop("db_key", None)
+    if db is None:
+        return
+    pool = current_app.extensions.get("db_pool")
+    if pool is not None:
+        pool.release(key, db)
+    else:
         db.close()
 
 
-def init_db() -> None:
-    db = get_db()
-    cur = db.cursor()
-    
+def init_db_pool(app) -> ConnectionPool | None:  # noqa: ANN001
+    app.config.setdefault("DATABASE_POOL_SIZE", int(os.getenv("DATABASE_POOL_SIZE", "8")))
+    app.config.setdefault("DATABASE_STATEMENT_CACHE", int(os.getenv("DATABASE_STATEMENT_CACHE", "256")))
+    if app.config["DATABASE_POOL_SIZE"] <= 0:
+        return None
+    pool = ConnectionPool(app.config["DATABASE_POOL_SIZE"])
+    app.extensions["db_pool"] = pool
+    return pool
+
+
+def _schema_v1(cur: sqlite3.Cursor) -> None:
+    """Initial schema"""
     # Users table
     cur.execute(
         """
@@ -164,13 +270,292 @@ def init_db() -> None:
         )
     ''')
 
-    db.commit()
+    # Contact requests table
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS contact_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            property_id INTEGER NOT NULL,
+            owner_id INTEGER NOT NULL,
+            tenant_id INTEGER NOT NULL,
+            tenant_name TEXT NOT NULL,
+            tenant_email TEXT NOT NULL,
+            tenant_phone TEXT,
+            message TEXT NOT NULL,
+            preferred_date DATE,
+            inquiry_type TEXT DEFAULT 'general',
+            status TEXT DEFAULT 'pending',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (property_id) REFERENCES properties (id),
+            FOREIGN KEY (owner_id) REFERENCES users (id),
+            FOREIGN KEY (tenant_id) REFERENCES users (id)
+        )
+    ''')
+
 
-def seed_admin_user() -> None:
+def _schema_v2(cur: sqlite3.Cursor) -> None:
+    """Lease lifecycle: end_date index, renewal reminder queue, job checkpoints"""
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_rentals_status_end_date ON rentals (status, end_date)")
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS lease_reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rental_id INTEGER NOT NULL,
+            tenant_id INTEGER NOT NULL,
+            owner_id INTEGER NOT NULL,
+            end_date DATE NOT NULL,
+            kind TEXT NOT NULL DEFAULT 'renewal',
+            status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'dismissed')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(rental_id) REFERENCES rentals(id) ON DELETE CASCADE,
+            UNIQUE(rental_id, kind, end_date)
+        )
+    ''')
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS job_checkpoints (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _schema_v3(cur: sqlite3.Cursor) -> None:
+    """Payments ledger: invoices, payments and materialized revenue totals"""
+    # Tenant, owner and property are copied onto each invoice so the ledger
+    # survives the rental being edited or deleted.
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_number TEXT NOT NULL UNIQUE,
+            rental_id INTEGER NOT NULL,
+            property_id INTEGER NOT NULL,
+            tenant_id INTEGER NOT NULL,
+            owner_id INTEGER NOT NULL,
+            period TEXT NOT NULL, -- YYYY-MM
+            amount_due DECIMAL(10,2) NOT NULL,
+            amount_paid DECIMAL(10,2) NOT NULL DEFAULT 0,
+            due_date DATE NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'partial', 'paid', 'overdue', 'void')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(rental_id) REFERENCES rentals(id),
+            UNIQUE(rental_id, period)
+        )
+    ''')
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_invoices_tenant ON invoices (tenant_id, period)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_invoices_owner ON invoices (owner_id, period)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_invoices_status_due_date ON invoices (status, due_date)")
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_id INTEGER NOT NULL,
+            tenant_id INTEGER NOT NULL,
+            owner_id INTEGER NOT NULL,
+            amount DECIMAL(10,2) NOT NULL CHECK (amount > 0),
+            method TEXT,
+            reference TEXT,
+            recorded_by INTEGER,
+            paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(invoice_id) REFERENCES invoices(id)
+        )
+    ''')
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payments_invoice ON payments (invoice_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payments_tenant ON payments (tenant_id, paid_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payments_owner ON payments (owner_id, paid_at)")
+    # One row per owner and billing month, kept current by backend.ledger
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS revenue_monthly (
+            owner_id INTEGER NOT NULL,
+            period TEXT NOT NULL,
+            invoiced DECIMAL(12,2) NOT NULL DEFAULT 0,
+            collected DECIMAL(12,2) NOT NULL DEFAULT 0,
+            invoice_count INTEGER NOT NULL DEFAULT 0,
+            payment_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (owner_id, period)
+        ) WITHOUT ROWID
+    ''')
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_revenue_monthly_period ON revenue_monthly (period)")
+
+
+def _schema_v4(cur: sqlite3.Cursor) -> None:
+    """Per-property view and favorite counters, written behind by backend.counters"""
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS property_stats (
+            property_id INTEGER PRIMARY KEY,
+            views INTEGER NOT NULL DEFAULT 0,
+            favorite_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(property_id) REFERENCES properties(id) ON DELETE CASCADE
+        )
+    ''')
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_favorites_property ON favorites (property_id)")
+    cur.execute('''
+        INSERT OR IGNORE INTO property_stats (property_id, favorite_count)
+        SELECT property_id, COUNT(*) FROM favorites GROUP BY property_id
+    ''')
+
+
+def _schema_v5(cur: sqlite3.Cursor) -> None:
+    """Content keys and render status for images uploaded through backend.images"""
+    cur.execute("ALTER TABLE property_images ADD COLUMN image_key TEXT")
+    cur.execute("ALTER TABLE property_images ADD COLUMN status TEXT NOT NULL DEFAULT 'ready'")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_property_images_key ON property_images (image_key)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_property_images_property ON property_images (property_id, is_primary)")
+
+
+def _schema_v6(cur: sqlite3.Cursor) -> None:
+    """Trigger-maintained change log read by backend.changes"""
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+            user_a INTEGER,
+            user_b INTEGER,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # table -> (row id reported to clients, user_a, user_b) of the changed row;
+    # user_a/user_b are the users who may see the change, NULL meaning everyone
+    tables = {
+        "properties": ("id", "NULL", "NULL"),
+        "rentals": ("id", "owner_id", "tenant_id"),
+        "favorites": ("property_id", "tenant_id", "NULL"),
+        "messages": ("id", "sender_id", "recipient_id"),
+        "contact_requests": ("id", "owner_id", "tenant_id"),
+    }
+    for table, columns in tables.items():
+        for op, row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+            values = ", ".join(column if column == "NULL" else f"{row}.{column}" for column in columns)
+            cur.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS change_log_{table}_{op} AFTER {op.upper()} ON {table}
+                BEGIN
+                    INSERT INTO change_log (table_name, row_id, user_a, user_b, op)
+                    VALUES ('{table}', {values}, '{op}');
+                END
+            ''')
+
+
+def _schema_v7(cur: sqlite3.Cursor) -> None:
+    """Indexes behind the archival rules in backend.archive"""
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages (created_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_contact_requests_status_created_at ON contact_requests (status, created_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_invoices_rental ON invoices (rental_id, status)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_lease_reminders_rental ON lease_reminders (rental_id, status)")
+
+
+def _schema_v8(cur: sqlite3.Cursor) -> None:
+    """Prefix indexes for the user directory search (queries.search_users)"""
+    # Names match case-insensitively; emails are stored lower-cased, so the
+    # plain unique index on email already serves searches across all roles
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_name ON users (name COLLATE NOCASE)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_role_name ON users (role, name COLLATE NOCASE)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_role_email ON users (role, email)")
+
+
+def _schema_v9(cur: sqlite3.Cursor) -> None:
+    """Per-segment rent sketches read by backend.insights"""
+    create_rent_sketch(cur)
+
+
+def _schema_v10(cur: sqlite3.Cursor) -> None:
+    """MinHash/LSH index of listings read by backend.duplicates"""
+    create_listing_index(cur)
+
+
+def _schema_v11(cur: sqlite3.Cursor) -> None:
+    """Lease interval index and overlap guards read by backend.availability"""
+    create_booking_guards(cur)
+
+
+def _schema_v12(cur: sqlite3.Cursor) -> None:
+    """Sort indexes and full-text index behind the property list orders in backend.sorting"""
+    create_sort_indexes(cur)
+
+
+def _schema_v13(cur: sqlite3.Cursor) -> None:
+    """Lease date order guards beside the overlap triggers in backend.availability"""
+    create_date_order_guards(cur)
+
+
+# MIGRATIONS[n - 1] upgrades the schema from version n - 1 to n. The version
+# lives in the database's PRAGMA user_version, so checking it costs one read.
+MIGRATIONS = [
+    _schema_v1,
+    _schema_v2,
+    _schema_v3,
+    _schema_v4,
+    _schema_v5,
+    _schema_v6,
+    _schema_v7,
+    _schema_v8,
+    _schema_v9,
+    _schema_v10,
+    _schema_v11,
+    _schema_v12,
+    _schema_v13,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(db: sqlite3.Connection) -> int:
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db: sqlite3.Connection) -> int:
+    """Apply pending migrations and return the version the database started at."""
+    # WAL lets readers in other worker processes proceed while one writes;
+    # the setting is stored in the database file, so this only has to run once.
+    start = schema_version(db)
+    if start == 0:
+        # auto_vacuum can only change before the first table exists (or via
+        # a full VACUUM); INCREMENTAL lets maintenance reclaim space in steps.
+        db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    db.execute("PRAGMA journal_mode=WAL")
+    for version in range(start + 1, SCHEMA_VERSION + 1):
+        # IMMEDIATE takes the write lock first, so workers booting together
+        # cannot apply the same step twice.
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(db) >= version:
+                db.rollback()
+                continue
+            MIGRATIONS[version - 1](db.cursor())
+            db.execute(f"PRAGMA user_version = {version}")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return start
+
+
+def init_db() -> None:
+    migrate(get_db())
+
+
+def ensure_schema() -> None:
+    """Boot-time check: a single PRAGMA read when the schema is current.
+
+    Out-of-date databases are migrated in place unless ``AUTO_MIGRATE`` is
+    off, in which case ``python -m backend.manage migrate`` must run first.
+    """
+    db = get_db()
+    if schema_version(db) >= SCHEMA_VERSION:
+        return
+    if not current_app.config.get("AUTO_MIGRATE", True):
+        raise RuntimeError(
+            f"Database schema is at version {schema_version(db)}, expected {SCHEMA_VERSION}. "
+            "Run `python -m backend.manage migrate`."
+        )
+    init_db()
+    seed_admin_user()
+
+
+def seed_admin_user(db: sqlite3.Connection | None = None) -> None:
     """Create the default admin user if it doesn't exist"""
     from werkzeug.security import generate_password_hash
     
-    db = get_db()
+    db = db or get_db()
     cur = db.cursor()
     
     # Check if admin user already exists
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import Flask, current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    """Start method for worker process pools: a fork server where there is one, else spawn."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class HasherBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Password hashing queue is full.")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs Werkzeug's password hashing off the request thread.
+
+    Hashes are computed in a bounded process pool so a burst of logins can
+    use every core without starving the worker's other requests. At most
+    ``max_pending`` hashes may be queued or running at once; callers beyond
+    that get :class:`HasherBusy` instead of piling up behind the pool.
+    With ``workers=0`` hashing runs inline on the calling thread.
+    """
+
+    def __init__(self, method: str, salt_length: int = 16, workers: int = 0,
+                 max_pending: int = 0, wait_timeout: float = 0.5, retry_after: int = 1) -> None:
+        self.method = method
+        self.salt_length = salt_length
+        # Werkzeug fills in a method's default parameters ("scrypt" is written
+        # as "scrypt:32768:8:1"), so compare stored hashes with what it writes
+        self.hash_prefix = generate_password_hash("", method, salt_length).split("$", 1)[0]
+        self.workers = workers
+        self.max_pending = max_pending or max(workers, 1) * 4
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self.rejected = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Pools do not survive fork, so each worker process builds its own. Its
+        # processes come from a fork server rather than a fork of this one,
+        # which could copy locks held by the writer or request threads.
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != pid:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+                    self._pool_pid = pid
+        return self._pool
+
+    def _run(self, fn, *args):  # noqa: ANN001, ANN002, ANN202
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            self.rejected += 1
+            raise HasherBusy(self.retry_after)
+        try:
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when a stored hash was made with different parameters or salt length than the policy."""
+        method, _, rest = password_hash.partition("$")
+        return method != self.hash_prefix or len(rest.partition("$")[0]) != self.salt_length
+
+    def shutdown(self) -> None:
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    return current_app.extensions["password_hasher"]
+
+
+def hash_password(password: str) -> str:
+    return get_password_hasher().hash(password)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    return get_password_hasher().verify(password_hash, password)
+
+
+def init_password_hasher(app: Flask) -> PasswordHasher:
+    app.config.setdefault("PASSWORD_HASH_METHOD", os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1"))
+    app.config.setdefault("PASSWORD_SALT_LENGTH", int(os.getenv("PASSWORD_SALT_LENGTH", "16")))
+    app.config.setdefault("PASSWORD_HASH_WORKERS", int(os.getenv("PASSWORD_HASH_WORKERS", str(min(2, os.cpu_count() or 1)))))
+    app.config.setdefault("PASSWORD_HASH_QUEUE", int(os.getenv("PASSWORD_HASH_QUEUE", "0")))
+
+    hasher = PasswordHasher(
+        app.config["PASSWORD_HASH_METHOD"],
+        salt_length=app.config["PASSWORD_SALT_LENGTH"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        max_pending=app.config["PASSWORD_HASH_QUEUE"],
+    )
+    app.extensions["password_hasher"] = hasher
+
+    @app.errorhandler(HasherBusy)
+    def hasher_busy(error: HasherBusy):  # noqa: ANN202
+        return {"message": "Server is busy, please try again shortly."}, 503, {"Retry-After": str(error.retry_after)}
+
+    return hasher
@@ -0,0 +1,640 @@
+import sqlite3
+import typing as t
+from contextlib import contextmanager
+
+try:  # Support running as module or script
+    from .archive import archived_rows, attach_archive
+    from .availability import NOT_BOOKED_BETWEEN, date_range
+    from .duplicates import bounding_box, distance_metres
+    from .serialization import (
+        CONTACT_REQUEST_FIELDS, MESSAGE_FIELDS, PROPERTY_CONVERTERS, RENTAL_CONVERTERS, RENTAL_FIELDS,
+        RowMapper, tuple_cursor,
+    )
+    from .sorting import SORTS, keyset, nearby_args, parse_number, sort_mode, split_cursor, text_query
+except Exception:  # pragma: no cover
+    from archive import archived_rows, attach_archive  # type: ignore
+    from availability import NOT_BOOKED_BETWEEN, date_range  # type: ignore
+    from duplicates import bounding_box, distance_metres  # type: ignore
+    from serialization import (  # type: ignore
+        CONTACT_REQUEST_FIELDS, MESSAGE_FIELDS, PROPERTY_CONVERTERS, RENTAL_CONVERTERS, RENTAL_FIELDS,
+        RowMapper, tuple_cursor,
+    )
+    from sorting import SORTS, keyset, nearby_args, parse_number, sort_mode, split_cursor, text_query  # type: ignore
+
+# Read queries shared by the Flask views and the async read service (backend.asgi)
+
+_property_list_rows = RowMapper(converters=PROPERTY_CONVERTERS)
+_property_detail_rows = RowMapper(converters=PROPERTY_CONVERTERS)
+_property_image_rows = RowMapper()
+
+# Uploaded images (backend.images) are stored as "<MEDIA_URL>/<key>/full";
+# listings show the card-sized rendition and galleries the thumbnails.
+_UPLOADED_SIZE = "CASE WHEN image_key IS NULL THEN image_url ELSE substr(image_url, 1, length(image_url) - 4) || '{size}' END"
+PRIMARY_IMAGE = (
+    f"(SELECT {_UPLOADED_SIZE.format(size='card')} FROM property_images"
+    " WHERE property_id = p.id AND is_primary = 1 LIMIT 1) as primary_image"
+)
+
+
+def _sorted_listings(db: sqlite3.Connection, columns: str, joins: str, where: list[str], params: list,
+                     args: t.Mapping[str, str], rows: RowMapper, cursor: str | None = None,
+                     limit: int | None = None,
+                     batch_size: int | None = None) -> tuple[list[dict] | t.Iterator[list[dict]], str | None]:
+    """Properties matching ``where`` in the ``?sort=`` order of ``args`` (see backend.sorting).
+
+    ``q`` (or ``search``) narrows to a full-text match. With ``limit`` one
+    page is read from ``cursor`` on and the next page's cursor returned
+    (``None`` at the end); without it every match, as batches of
+    ``batch_size`` read off the cursor when that is given. Raises
+    ``ValueError`` for an unknown sort, a malformed cursor or a distance
+    sort without a point.
+    """
+    text = text_query(args.get("q") or args.get("search"))
+    sort = sort_mode(args.get("sort"), text)
+    source = "properties p"
+    where, params = list(where), list(params)
+    if sort == "relevance":
+        source = "properties_fts f JOIN properties p ON p.id = f.rowid"
+        where.append("properties_fts MATCH ?")
+        params.append(text)
+    elif text:
+        # Unary + keeps the match a filter, so the sort index still drives the scan
+        where.append("+p.id IN (SELECT rowid FROM properties_fts WHERE properties_fts MATCH ?)")
+        params.append(text)
+
+    if sort == "distance":
+        items, next_cursor = _nearby_listings(db, columns, joins, source, where, params, args, rows, cursor, limit)
+        return (iter([items]) if batch_size else items), next_cursor
+    if sort == "relevance":
+        key, order, page, page_params = "f.rank", "f.rank", "", []
+        if cursor:
+            after_id, after = split_cursor(cursor, float)
+            page, page_params = "(f.rank, f.rowid) > (?, ?)", [after, after_id]
+    else:
+        key = SORTS[sort][0]
+        order, page, page_params = keyset(sort, cursor)
+    if page:
+        where.append(page)
+        params += page_params
+
+    if limit is not None:
+        # The last row's key makes the next page's cursor
+        columns += f", {key} as sort_key"
+    query = f"""
+        SELECT {columns}
+        FROM {source}
+        {joins}
+        WHERE {" AND ".join(where)}
+        ORDER BY {order}
+    """
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit + 1)
+    cur = tuple_cursor(db)
+    cur.execute(query, params)
+    if limit is None:
+        return (rows.batches(cur, batch_size) if batch_size else rows.all(cur)), None
+    items = rows.all(cur)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = f"{items[-1]['id']}:{items[-1]['sort_key']}"
+    for item in items:
+        del item["sort_key"]
+    return items, next_cursor
+
+
+def _nearby_listings(db: sqlite3.Connection, columns: str, joins: str, source: str, where: list[str],
+                     params: list, args: t.Mapping[str, str], rows: RowMapper, cursor: str | None,
+                     limit: int | None) -> tuple[list[dict], str | None]:
+    """``_sorted_listings`` for sort=distance: nearest first, each with its ``distance_km``.
+
+    Only ids and coordinates are read for the listings in the bounding box;
+    full rows just for the ones returned.
+    """
+    lat, lng, radius = nearby_args(args)
+    where = [*where, "p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ?"]
+    params = [*params, *bounding_box(lat, lng, radius * 1000)]
+    nearby = []
+    for property_id, plat, plng in db.execute(
+        f"SELECT p.id, p.latitude, p.longitude FROM {source} WHERE {' AND '.join(where)}", params
+    ):
+        distance = round(distance_metres(lat, lng, plat, plng) / 1000, 3)
+        if distance <= radius:
+            nearby.append((distance, property_id))
+    nearby.sort()
+    if cursor:
+        after_id, after = split_cursor(cursor, float)
+        nearby = [entry for entry in nearby if entry > (after, after_id)]
+    next_cursor = None
+    if limit is not None and len(nearby) > limit:
+        nearby = nearby[:limit]
+        next_cursor = f"{nearby[-1][1]}:{nearby[-1][0]}"
+    if not nearby:
+        return [], None
+
+    distances = {property_id: distance for distance, property_id in nearby}
+    cur = tuple_cursor(db)
+    cur.execute(
+        f"""
+        SELECT {columns}
+        FROM properties p
+        {joins}
+        WHERE p.id IN ({', '.join('?' * len(distances))})
+        """,
+        list(distances),
+    )
+    items = rows.all(cur)
+    for item in items:
+        item["distance_km"] = distances[item["id"]]
+    items.sort(key=lambda item: (item["distance_km"], item["id"]))
+    return items, next_cursor
+
+
+def _search_filters(args: t.Mapping[str, str]) -> tuple[list[str], list]:
+    city = args.get("city", "")
+    min_price = args.get("min_price")
+    max_price = args.get("max_price")
+    property_type = args.get("property_type", "")
+    bedrooms = args.get("bedrooms")
+    bathrooms = args.get("bathrooms")
+    period = date_range(args.get("available_from"), args.get("available_to"))
+
+    where = ["p.status IN ('available', 'rented')" if period else "p.status = 'available'"]
+    params = []
+
+    if period:
+        where.append(f"""(p.available_date IS NULL OR p.available_date = '' OR p.available_date <= ?)
+        AND {NOT_BOOKED_BETWEEN}""")
+        params += [period[0], *period]
+
+    if city:
+        where.append("p.city LIKE ?")
+        params.append(f"%{city}%")
+
+    if min_price:
+        where.append("p.rent_amount >= ?")
+        params.append(parse_number(min_price, "min_price"))
+
+    if max_price:
+        where.append("p.rent_amount <= ?")
+        params.append(parse_number(max_price, "max_price"))
+
+    if property_type:
+        where.append("p.property_type = ?")
+        params.append(property_type)
+
+    if bedrooms:
+        where.append("p.bedrooms >= ?")
+        params.append(parse_number(bedrooms, "bedrooms", int))
+
+    if bathrooms:
+        where.append("p.bathrooms >= ?")
+        params.append(parse_number(bathrooms, "bathrooms", int))
+
+    return where, params
+
+
+_LISTING_COLUMNS = f"""p.*, u.name as owner_name, u.email as owner_email,
+               {PRIMARY_IMAGE},
+               COALESCE(s.views, 0) as views, COALESCE(s.favorite_count, 0) as favorite_count"""
+_LISTING_JOINS = """JOIN users u ON p.owner_id = u.id
+        LEFT JOIN property_stats s ON s.property_id = p.id"""
+
+
+def search_properties(db: sqlite3.Connection, args: t.Mapping[str, str]) -> list[dict]:
+    """Available properties matching the ``GET /properties`` query-string filters, in ``?sort=`` order.
+
+    ``available_from``/``available_to`` also return rented properties whose
+    leases leave that period free. Raises ``ValueError`` for non-numeric
+    price/room filters, malformed dates and bad sort arguments.
+    """
+    where, params = _search_filters(args)
+    return _sorted_listings(db, _LISTING_COLUMNS, _LISTING_JOINS, where, params, args, _property_list_rows)[0]
+
+
+def search_property_batches(db: sqlite3.Connection, args: t.Mapping[str, str],
+                            batch_size: int) -> t.Iterator[list[dict]]:
+    """``search_properties`` read off the cursor ``batch_size`` rows at a time, for streaming."""
+    where, params = _search_filters(args)
+    return _sorted_listings(
+        db, _LISTING_COLUMNS, _LISTING_JOINS, where, params, args, _property_list_rows, batch_size=batch_size
+    )[0]
+
+
+def search_properties_page(db: sqlite3.Connection, args: t.Mapping[str, str], cursor: str | None,
+                           limit: int) -> tuple[list[dict], str | None]:
+    """One page of ``search_properties`` and the cursor of the next (``None`` at the end)."""
+    where, params = _search_filters(args)
+    return _sorted_listings(
+        db, _LISTING_COLUMNS, _LISTING_JOINS, where, params, args, _property_list_rows, cursor, limit
+    )
+
+
+def get_property_detail(db: sqlite3.Connection, property_id: int) -> dict | None:
+    """A property with owner details and all of its images, or ``None``."""
+    cur = tuple_cursor(db)
+
+    # Get property details
+    cur.execute("""
+        SELECT p.*, u.name as owner_name, u.email as owner_email,
+               COALESCE(s.views, 0) as views, COALESCE(s.favorite_count, 0) as favorite_count
+        FROM properties p
+        JOIN users u ON p.owner_id = u.id
+        LEFT JOIN property_stats s ON s.property_id = p.id
+        WHERE p.id = ?
+    """, (property_id,))
+
+    property_dict = _property_detail_rows.one(cur)
+    if not property_dict:
+        return None
+
+    # Get property images
+    cur.execute(f"""
+        SELECT id, image_url, caption, is_primary, sort_order,
+               {_UPLOADED_SIZE.format(size='thumb')} as thumbnail_url,
+               {_UPLOADED_SIZE.format(size='card')} as card_url, status
+        FROM property_images
+        WHERE property_id = ?
+        ORDER BY is_primary DESC, sort_order ASC
+    """, (property_id,))
+
+    property_dict["images"] = _property_image_rows.all(cur)
+    return property_dict
+
+
+# Per-user reads behind the dashboard pages. Each is served both by its own
+# endpoint and by the composite /dashboard/<role> endpoints.
+
+_owner_property_rows = RowMapper(converters=PROPERTY_CONVERTERS)
+_favorite_rows = RowMapper(converters=PROPERTY_CONVERTERS)
+_batch_property_rows = RowMapper(converters=PROPERTY_CONVERTERS)
+_owner_rental_rows = RowMapper(RENTAL_FIELDS, RENTAL_CONVERTERS)
+_tenant_rental_rows = RowMapper(RENTAL_FIELDS, RENTAL_CONVERTERS)
+_message_rows = RowMapper(MESSAGE_FIELDS)
+_owner_contact_request_rows = RowMapper(CONTACT_REQUEST_FIELDS)
+_tenant_contact_request_rows = RowMapper(CONTACT_REQUEST_FIELDS)
+_contact_rows = RowMapper()
+_directory_rows = RowMapper(converters={"is_admin": bool})
+_flagged_rows = RowMapper(converters=PROPERTY_CONVERTERS)
+_duplicate_rows = RowMapper()
+
+BATCH_MAX_IDS = 100
+
+
+@contextmanager
+def read_snapshot(db: sqlite3.Connection) -> t.Iterator[sqlite3.Connection]:
+    """Run several reads against one consistent snapshot of the database (and its archive)."""
+    # The user lists read the archive too, and it cannot be attached once a transaction has begun
+    attach_archive(db)
+    db.execute("BEGIN")
+    try:
+        yield db
+    finally:
+        db.rollback()
+
+
+_OWNER_COLUMNS = f"""p.*,
+               {PRIMARY_IMAGE},
+               COALESCE(s.views, 0) as views, COALESCE(s.favorite_count, 0) as favorite_count"""
+_OWNER_JOINS = "LEFT JOIN property_stats s ON s.property_id = p.id"
+
+
+def owner_properties(db: sqlite3.Connection, owner_id: int, args: t.Mapping[str, str] | None = None) -> list[dict]:
+    """Every property of ``owner_id``, in the ``?sort=`` order of ``args`` (newest first by default)."""
+    return _sorted_listings(
+        db, _OWNER_COLUMNS, _OWNER_JOINS, ["p.owner_id = ?"], [owner_id], args or {}, _owner_property_rows
+    )[0]
+
+
+def owner_properties_page(db: sqlite3.Connection, owner_id: int, args: t.Mapping[str, str],
+                          cursor: str | None, limit: int) -> tuple[list[dict], str | None]:
+    """One page of ``owner_properties`` and the cursor of the next (``None`` at the end)."""
+    return _sorted_listings(
+        db, _OWNER_COLUMNS, _OWNER_JOINS, ["p.owner_id = ?"], [owner_id], args, _owner_property_rows, cursor, limit
+    )
+
+
+def tenant_favorites(db: sqlite3.Connection, tenant_id: int) -> list[dict]:
+    cur = tuple_cursor(db)
+    cur.execute(f"""
+        SELECT p.*, u.name as owner_name, u.email as owner_email,
+               {PRIMARY_IMAGE},
+               COALESCE(s.views, 0) as views, COALESCE(s.favorite_count, 0) as favorite_count
+        FROM properties p
+        JOIN users u ON p.owner_id = u.id
+        JOIN favorites f ON p.id = f.property_id
+        LEFT JOIN property_stats s ON s.property_id = p.id
+        WHERE f.tenant_id = ?
+        ORDER BY f.created_at DESC
+    """, (tenant_id,))
+    return _favorite_rows.all(cur)
+
+
+def properties_by_ids(db: sqlite3.Connection, ids: t.Sequence[int]) -> list[dict]:
+    """Listing rows for ``ids`` in the order given; unknown ids are left out."""
+    ids = list(dict.fromkeys(ids))[:BATCH_MAX_IDS]
+    if not ids:
+        return []
+    cur = tuple_cursor(db)
+    cur.execute(f"""
+        SELECT p.*, u.name as owner_name, u.email as owner_email,
+               {PRIMARY_IMAGE},
+               COALESCE(s.views, 0) as views, COALESCE(s.favorite_count, 0) as favorite_count
+        FROM properties p
+        JOIN users u ON p.owner_id = u.id
+        LEFT JOIN property_stats s ON s.property_id = p.id
+        WHERE p.id IN ({", ".join("?" * len(ids))})
+    """, ids)
+    by_id = {record["id"]: record for record in _batch_property_rows.all(cur)}
+    return [by_id[property_id] for property_id in ids if property_id in by_id]
+
+
+def flagged_duplicates(db: sqlite3.Connection) -> list[dict]:
+    """Listings held as pending_approval by duplicate detection, each with the listings it resembles."""
+    cur = tuple_cursor(db)
+    cur.execute(f"""
+        SELECT p.*, u.name as owner_name, u.email as owner_email, {PRIMARY_IMAGE}
+        FROM properties p
+        JOIN users u ON p.owner_id = u.id
+        WHERE p.status = 'pending_approval'
+          AND EXISTS (SELECT 1 FROM listing_duplicates d WHERE d.property_id = p.id)
+        ORDER BY p.id
+    """)
+    flagged = _flagged_rows.all(cur)
+    if not flagged:
+        return []
+    by_id = {record["id"]: record for record in flagged}
+    for record in flagged:
+        record["duplicates"] = []
+    cur.execute(f"""
+        SELECT d.property_id as flagged_id, o.id, o.title, o.address, o.status, o.owner_id, d.similarity
+        FROM listing_duplicates d
+        JOIN properties o ON o.id = d.duplicate_of
+        WHERE d.property_id IN ({", ".join("?" * len(by_id))})
+        ORDER BY d.property_id, d.similarity DESC
+    """, list(by_id))
+    for duplicate in _duplicate_rows.all(cur):
+        by_id[duplicate.pop("flagged_id")]["duplicates"].append(duplicate)
+    return flagged
+
+
+# Lists that continue into the archive (backend.archive). ``{source}`` is
+# the hot table or its archive copy; ``{page}`` is an extra condition: the
+# cursor of one page, or the hot-copy check of a whole list.
+_USER_LISTS = {
+    "owner_rentals": ("""
+        SELECT r.*, p.title as property_title, u.name as tenant_name, u.email as tenant_email
+        FROM {source} r
+        JOIN properties p ON r.property_id = p.id
+        JOIN users u ON r.tenant_id = u.id
+        WHERE r.owner_id = ?{page}
+    """, "rentals", "r", _owner_rental_rows),
+    "tenant_rentals": ("""
+        SELECT r.*, p.title as property_title, u.name as owner_name, u.email as owner_email
+        FROM {source} r
+        JOIN properties p ON r.property_id = p.id
+        JOIN users u ON r.owner_id = u.id
+        WHERE r.tenant_id = ?{page}
+    """, "rentals", "r", _tenant_rental_rows),
+    "messages": ("""
+        SELECT m.*,
+               u1.name as sender_name, u1.email as sender_email,
+               u2.name as recipient_name, u2.email as recipient_email,
+               p.title as property_title
+        FROM {source} m
+        LEFT JOIN users u1 ON m.sender_id = u1.id
+        LEFT JOIN users u2 ON m.recipient_id = u2.id
+        LEFT JOIN properties p ON m.property_id = p.id
+        WHERE (m.sender_id = ? OR m.recipient_id = ?){page}
+    """, "messages", "m", _message_rows),
+    "owner_contact_requests": ("""
+        SELECT cr.*, p.title as property_title, u.name as tenant_name
+        FROM {source} cr
+        LEFT JOIN properties p ON cr.property_id = p.id
+        LEFT JOIN users u ON cr.tenant_id = u.id
+        WHERE cr.owner_id = ?{page}
+    """, "contact_requests", "cr", _owner_contact_request_rows),
+    "tenant_contact_requests": ("""
+        SELECT cr.*, p.title as property_title, u.name as owner_name
+        FROM {source} cr
+        LEFT JOIN properties p ON cr.property_id = p.id
+        LEFT JOIN users u ON cr.owner_id = u.id
+        WHERE cr.tenant_id = ?{page}
+    """, "contact_requests", "cr", _tenant_contact_request_rows),
+}
+
+PAGE_MAX_LIMIT = 200
+
+
+def page_params(args: t.Mapping[str, str]) -> tuple[str | None, int] | None:
+    """``(cursor, limit)`` when a list is requested page by page (``?limit=``/``?cursor=``), else ``None``.
+
+    ``limit`` defaults to 50 and is capped at ``PAGE_MAX_LIMIT``. Raises
+    ``ValueError`` for a limit that is not a positive whole number.
+    """
+    if "limit" not in args and "cursor" not in args:
+        return None
+    limit = parse_number(args.get("limit", "50"), "limit", int)
+    if limit < 1:
+        raise ValueError("limit must be positive.")
+    return args.get("cursor") or None, min(limit, PAGE_MAX_LIMIT)
+
+
+def _user_rows(db: sqlite3.Connection, name: str, params: tuple) -> tuple[sqlite3.Cursor, RowMapper]:
+    sql, table, alias, rows = _USER_LISTS[name]
+    cur = tuple_cursor(db)
+    hot = sql.format(source=f"main.{table}", page="")
+    if not attach_archive(db):
+        cur.execute(hot + f" ORDER BY {alias}.created_at DESC", params)
+        return cur, rows
+    # Rows caught between the two steps of a move are in both files; the hot copy wins
+    cold = sql.format(
+        source=archived_rows(db, table),
+        page=f" AND NOT EXISTS (SELECT 1 FROM main.{table} hot WHERE hot.id = {alias}.id)",
+    )
+    cur.execute(f"{hot} UNION ALL {cold} ORDER BY created_at DESC", (*params, *params))
+    return cur, rows
+
+
+def _user_list(db: sqlite3.Connection, name: str, params: tuple) -> list[dict]:
+    cur, rows = _user_rows(db, name, params)
+    return rows.all(cur)
+
+
+def user_list_batches(db: sqlite3.Connection, name: str, params: tuple, batch_size: int) -> t.Iterator[list[dict]]:
+    """A whole ``_USER_LISTS`` list, archived rows included, newest first, read ``batch_size`` rows at a time."""
+    cur, rows = _user_rows(db, name, params)
+    return rows.batches(cur, batch_size)
+
+
+def user_list_page(db: sqlite3.Connection, name: str, params: tuple, cursor: str | None,
+                   limit: int) -> tuple[list[dict], str | None]:
+    """One page of a ``_USER_LISTS`` list, newest first: hot rows, then archived ones.
+
+    Cursors are opaque: ``h<id>`` continues in the hot table, ``a<id>`` in the
+    archive. The archive is only attached once a page runs past the hot rows.
+    Returns the rows and the next cursor (``None`` at the end). Raises
+    ``ValueError`` for a malformed cursor.
+    """
+    sql, table, alias, rows = _USER_LISTS[name]
+    phase, before = "h", None
+    if cursor:
+        phase, before = cursor[0], cursor[1:]
+        if phase not in ("h", "a") or not before.isdigit():
+            raise ValueError("Invalid cursor.")
+        before = int(before)
+    before = before if before is not None else 2 ** 63 - 1
+    cur = tuple_cursor(db)
+
+    items = []
+    if phase == "h":
+        cur.execute(
+            sql.format(source=table, page=f" AND {alias}.id < ?") + f" ORDER BY {alias}.id DESC LIMIT ?",
+            (*params, before, limit),
+        )
+        items = rows.all(cur)
+        if len(items) == limit:
+            return items, f"h{items[-1]['id']}"
+        before = 2 ** 63 - 1
+
+    if not attach_archive(db):
+        return items, None
+    # Rows caught between the two steps of a move are in both files; the hot copy wins
+    page = f" AND {alias}.id < ? AND NOT EXISTS (SELECT 1 FROM main.{table} hot WHERE hot.id = {alias}.id)"
+    remaining = limit - len(items)
+    cur.execute(
+        sql.format(source=f"archive.{table}", page=page) + f" ORDER BY {alias}.id DESC LIMIT ?",
+        (*params, before, remaining),
+    )
+    archived = rows.all(cur)
+    items += archived
+    return items, f"a{archived[-1]['id']}" if len(archived) == remaining else None
+
+
+def user_rentals(db: sqlite3.Connection, user_id: int, role: str) -> list[dict]:
+    """Rentals the user owns (owners) or rents (tenants), archived ones included."""
+    return _user_list(db, "owner_rentals" if role == "owner" else "tenant_rentals", (user_id,))
+
+
+def user_messages(db: sqlite3.Connection, user_id: int) -> list[dict]:
+    """Messages the user sent or received, archived ones included, newest first."""
+    return _user_list(db, "messages", (user_id, user_id))
+
+
+def user_contact_requests(db: sqlite3.Connection, user_id: int, role: str) -> list[dict]:
+    """Requests for an owner's properties, or the ones a tenant sent, archived ones included."""
+    return _user_list(db, "owner_contact_requests" if role == "owner" else "tenant_contact_requests", (user_id,))
+
+
+def user_contacts(db: sqlite3.Connection, user_id: int, role: str) -> list[dict]:
+    """People the user may message: everyone for admins, tenants for owners, owners for tenants."""
+    # users has no phone column; the key stays in the payload for the frontend
+    columns = "SELECT id, name, email, role, NULL as phone FROM users"
+    cur = tuple_cursor(db)
+    if role == "admin":
+        cur.execute(f"{columns} WHERE id != ? ORDER BY name", (user_id,))
+    elif role == "owner":
+        cur.execute(f"{columns} WHERE role = 'tenant' ORDER BY name")
+    elif role == "tenant":
+        cur.execute(f"{columns} WHERE role = 'owner' ORDER BY name")
+    else:
+        return []
+    return _contact_rows.all(cur)
+
+
+def all_user_batches(db: sqlite3.Connection, batch_size: int) -> t.Iterator[list[dict]]:
+    """Every user (no password hashes) by id, read ``batch_size`` rows at a time."""
+    cur = tuple_cursor(db)
+    cur.execute("SELECT id, name, email, role, is_admin FROM users ORDER BY id")
+    return _directory_rows.batches(cur, batch_size)
+
+
+USER_SEARCH_MAX_LIMIT = 50
+USER_SEARCH_COUNT_CAP = 1000
+_PREFIX_END = "\U0010ffff"  # sorts after any character that can follow a prefix
+
+
+def search_users(db: sqlite3.Connection, query: str, roles: t.Sequence[str] | None = None,
+                 exclude_id: int | None = None, cursor: str | None = None, limit: int = 10,
+                 count: bool = False) -> dict:
+    """Users whose name or email starts with ``query``, ignoring case.
+
+    Name matches come first, by name, then the users matched only by email,
+    by email; each part is a range scan of its own index, so a page
+    costs the same however many users there are. ``roles`` limits the roles
+    returned (``None`` means any) and ``next_cursor`` continues after the
+    last user returned. ``count`` adds the ``total`` number of matches,
+    counted up to ``USER_SEARCH_COUNT_CAP`` (``total_capped`` says whether
+    there are more). Raises ``ValueError`` for a malformed cursor.
+    """
+    where, params = [], []
+    if roles is not None:
+        where.append(f"role IN ({', '.join('?' * len(roles))})")
+        params += roles
+    if exclude_id is not None:
+        where.append("id != ?")
+        params.append(exclude_id)
+    name_match, email_match, match_params = "1 = 1", "0", []
+    if query:
+        # Emails are stored lower-cased, so only the name needs NOCASE
+        email = query.lower()
+        name_match = "name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE"
+        email_match = "email >= ? AND email < ?"
+        match_params = [query, query + _PREFIX_END, email, email + _PREFIX_END]
+    filters = " AND ".join(where) or "1 = 1"
+    name_params, email_params = match_params[:2], match_params[2:]
+
+    # "<id>:<name>" of the last name match returned, "@<email>" of the last
+    # email-only one
+    name_page, name_page_params = "", []
+    email_page, email_page_params = "", []
+    if cursor and cursor.startswith("@"):
+        name_page = " AND 0"
+        email_page, email_page_params = " AND email > ?", [cursor[1:]]
+    elif cursor:
+        after_id, sep, after_name = cursor.partition(":")
+        if not sep or not after_id.isdigit():
+            raise ValueError("Invalid cursor.")
+        name_page = " AND (name > ? COLLATE NOCASE OR (name = ? COLLATE NOCASE AND id > ?))"
+        name_page_params = [after_name, after_name, int(after_id)]
+
+    cur = tuple_cursor(db)
+    cur.execute(f"""
+        SELECT id, name, email, role, is_admin FROM users
+        WHERE {filters} AND {name_match}{name_page}
+        ORDER BY name COLLATE NOCASE, id
+        LIMIT ?
+    """, (*params, *name_params, *name_page_params, limit + 1))
+    users = _directory_rows.all(cur)
+    name_matches = len(users)
+    if query and name_matches <= limit:
+        cur.execute(f"""
+            SELECT id, name, email, role, is_admin FROM users
+            WHERE {filters} AND {email_match} AND NOT ({name_match}){email_page}
+            ORDER BY email
+            LIMIT ?
+        """, (*params, *email_params, *name_params, *email_page_params, limit + 1 - name_matches))
+        users += _directory_rows.all(cur)
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        last = users[-1]
+        next_cursor = f"{last['id']}:{last['name']}" if limit <= name_matches else f"@{last['email']}"
+    result = {"users": users, "next_cursor": next_cursor}
+    if count:
+        # Both arms are index range scans, and the cap bounds them as the
+        # admin types a short prefix
+        total = db.execute(f"""
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM users WHERE {filters} AND {name_match}
+                UNION ALL
+                SELECT 1 FROM users WHERE {filters} AND {email_match} AND NOT ({name_match})
+                LIMIT ?
+            )
+        """, (*params, *name_params, *params, *email_params, *name_params, USER_SEARCH_COUNT_CAP + 1)).fetchone()[0]
+        result["total"] = min(total, USER_SEARCH_COUNT_CAP)
+        result["total_capped"] = total > USER_SEARCH_COUNT_CAP
+    return result
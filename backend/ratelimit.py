@@ -0,0 +1,233 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import Flask, current_app, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+# Default budgets as "capacity/seconds": a bucket holds ``capacity`` tokens and
+# refills completely over ``seconds``. Override with RATE_LIMIT_<NAME>.
+#
+# ``<name>_<kind>`` budgets apply to one kind of key instead. Anyone can
+# spend an account's email bucket by posting its address, so those refill
+# faster than one IP's bucket allows requests: a single client cannot keep an
+# account locked out, while guesses spread over many IPs stay throttled.
+DEFAULT_RATE_LIMITS = {
+    "login": "10/60",
+    "login_email": "30/120",
+    "forgot_password": "5/300",
+    "forgot_password_email": "10/300",
+    "reset_password": "10/300",
+    "reset_password_email": "20/300",
+    "properties": "120/60",
+}
+
+
+def parse_limit(spec: str) -> tuple[float, float]:
+    """``"10/60"`` -> (capacity 10, refill 10/60 tokens per second)."""
+    capacity, _, seconds = spec.partition("/")
+    capacity = float(capacity)
+    return capacity, capacity / float(seconds or 1)
+
+
+class MemoryBucketStore:
+    """Token buckets kept in this process's memory."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets: list[tuple[str, float, float]], now: float) -> tuple[bool, list[float]]:
+        """Take a token from every ``(key, capacity, rate)`` bucket if each has one, else from none.
+
+        Returns whether they were taken and the tokens left in each bucket.
+        """
+        with self._lock:
+            levels = []
+            for key, capacity, rate in buckets:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                levels.append(min(capacity, tokens + (now - updated) * rate))
+            allowed = all(tokens >= 1 for tokens in levels)
+            if allowed:
+                levels = [tokens - 1 for tokens in levels]
+            for (key, capacity, rate), tokens in zip(buckets, levels):
+                if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                    self._evict_full(now, rate, capacity)
+                self._buckets[key] = (tokens, now)
+            return allowed, levels
+
+    def _evict_full(self, now: float, rate: float, capacity: float) -> None:
+        # Buckets that would have refilled by now carry no state worth keeping
+        for key, (tokens, updated) in list(self._buckets.items()):
+            if tokens + (now - updated) * rate >= capacity:
+                del self._buckets[key]
+
+
+class SQLiteBucketStore:
+    """Token buckets shared by every worker on the host through a local SQLite file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._pid = os.getpid()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # Forked worker: never reuse the parent's connections
+            self._local = threading.local()
+            self._pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def take(self, buckets: list[tuple[str, float, float]], now: float) -> tuple[bool, list[float]]:
+        """Same contract as :meth:`MemoryBucketStore.take`, in one transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            for key, capacity, rate in buckets:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                levels.append(min(capacity, tokens + max(now - updated, 0) * rate))
+            allowed = all(tokens >= 1 for tokens in levels)
+            if allowed:
+                levels = [tokens - 1 for tokens in levels]
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                [(key, tokens, now) for (key, _, _), tokens in zip(buckets, levels)],
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, levels
+
+
+class RateLimiter:
+    def __init__(self, store, limits: dict[str, str], enabled: bool = True) -> None:  # noqa: ANN001
+        self.store = store
+        self.limits = {name: parse_limit(spec) for name, spec in limits.items()}
+        self.enabled = enabled
+        self.rejected: Counter[str] = Counter()
+        self.allowed: Counter[str] = Counter()
+
+    def _limit(self, name: str, key: str) -> tuple[float, float]:
+        # "email:..." keys of "login" use the "login_email" budget when there is one
+        return self.limits.get(f"{name}_{key.partition(':')[0]}") or self.limits[name]
+
+    def check(self, name: str, keys: list[str]) -> tuple[bool, dict[str, str]]:
+        """Take one token from every bucket for ``keys`` if all have one left; a rejected request takes none."""
+        buckets = [(f"{name}:{key}", *self._limit(name, key)) for key in keys]
+        allowed, levels = self.store.take(buckets, time.time())
+        if allowed:
+            self.allowed[name] += 1
+        else:
+            self.rejected[name] += 1
+
+        # The headers describe the bucket closest to empty
+        capacity, rate = self.limits[name]
+        remaining = capacity
+        for (_, bucket_capacity, bucket_rate), tokens in zip(buckets, levels):
+            if tokens < remaining:
+                capacity, rate, remaining = bucket_capacity, bucket_rate, tokens
+        reset = math.ceil((capacity - remaining) / rate) if rate else 0
+        headers = {
+            "RateLimit-Limit": str(int(capacity)),
+            "RateLimit-Remaining": str(int(remaining)),
+            "RateLimit-Reset": str(reset),
+        }
+        if not allowed:
+            headers["Retry-After"] = str(math.ceil((1 - remaining) / rate) if rate else 1)
+        return allowed, headers
+
+    def stats(self) -> dict:
+        # Per-kind budgets ("login_email") are counted under the limit they belong to
+        return {
+            name: {"allowed": self.allowed[name], "rejected": self.rejected[name]}
+            for name in self.limits if not any(name.startswith(f"{other}_") for other in self.limits)
+        }
+
+
+def _client_keys(by: tuple[str, ...]) -> list[str]:
+    keys = []
+    for kind in by:
+        if kind == "ip":
+            keys.append(f"ip:{request.remote_addr}")
+        elif kind == "user":
+            # Signed-in callers get their own bucket; anonymous ones share the IP's
+            try:
+                verify_jwt_in_request(optional=True)
+                identity = get_jwt_identity()
+            except Exception:  # expired or malformed tokens are the view's problem
+                identity = None
+            keys.append(f"user:{identity}" if identity else f"ip:{request.remote_addr}")
+        elif kind == "email":
+            body = request.get_json(silent=True) or {}
+            email = (body.get("email") or "").strip().lower()
+            if email:
+                keys.append(f"email:{email}")
+    return keys
+
+
+def rate_limited(name: str, by: tuple[str, ...] = ("ip",)):  # noqa: ANN201
+    """Throttle a view with the ``name`` token bucket, keyed by client IP, user and/or email."""
+
+    def decorator(view):  # noqa: ANN001, ANN202
+        @wraps(view)
+        def wrapper(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+            limiter = current_app.extensions.get("rate_limiter")
+            if limiter is None or not limiter.enabled:
+                return view(*args, **kwargs)
+            allowed, headers = limiter.check(name, _client_keys(by))
+            if not allowed:
+                return {"message": "Too many requests. Please slow down."}, 429, headers
+            g.rate_limit_headers = headers
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def init_rate_limiter(app: Flask) -> RateLimiter:
+    app.config.setdefault("RATE_LIMIT_ENABLED", os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true")
+    # "memory" keeps buckets per process; a file path shares them between workers
+    app.config.setdefault("RATE_LIMIT_STORAGE", os.getenv("RATE_LIMIT_STORAGE", "memory"))
+    limits = {
+        name: app.config.get(f"RATE_LIMIT_{name.upper()}") or os.getenv(f"RATE_LIMIT_{name.upper()}", spec)
+        for name, spec in DEFAULT_RATE_LIMITS.items()
+    }
+
+    storage = app.config["RATE_LIMIT_STORAGE"]
+    store = MemoryBucketStore() if storage == "memory" else SQLiteBucketStore(storage)
+    limiter = RateLimiter(store, limits, enabled=app.config["RATE_LIMIT_ENABLED"])
+    app.extensions["rate_limiter"] = limiter
+
+    @app.after_request
+    def add_rate_limit_headers(response):  # noqa: ANN001, ANN202
+        headers = g.pop("rate_limit_headers", None)
+        if headers:
+            response.headers.extend(headers)
+        return response
+
+    return limiter
@@ -0,0 +1,298 @@
+import functools
+import sqlite3
+import typing as t
+
+try:  # Support running as module or script
+    from .serialization import CONTACT_REQUEST_FIELDS, MESSAGE_FIELDS, RowMapper
+except Exception:  # pragma: no cover
+    from serialization import CONTACT_REQUEST_FIELDS, MESSAGE_FIELDS, RowMapper  # type: ignore
+
+# Data access for the core entities. Every statement here is a constant
+# string, so sqlite3's per-connection statement cache compiles it once and
+# reuses it for as long as the (pooled) connection lives. Partial updates
+# name their columns in a fixed order, so every set of changed fields has
+# one spelling rather than one per request body's key order. Lookups that
+# only feed auth and ownership checks come back as small __slots__ records
+# instead of dicts or sqlite3.Row.
+#
+# Repositories wrap whichever connection they are given: the request's
+# read connection for reads, the write queue's connection inside write().
+# List and detail payloads shaped for the API stay in queries.py.
+
+
+class UserRecord:
+    __slots__ = ("id", "name", "email", "role", "is_admin")
+
+    def __init__(self, id: int, name: str, email: str, role: str, is_admin: t.Any) -> None:  # noqa: A002
+        self.id = id
+        self.name = name
+        self.email = email
+        self.role = role
+        self.is_admin = bool(is_admin)
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "email": self.email, "role": self.role, "is_admin": self.is_admin}
+
+
+class PropertyRecord:
+    __slots__ = ("id", "owner_id", "status")
+
+    def __init__(self, id: int, owner_id: int, status: str) -> None:  # noqa: A002
+        self.id = id
+        self.owner_id = owner_id
+        self.status = status
+
+
+class RentalRecord:
+    __slots__ = ("id", "property_id", "owner_id", "tenant_id", "status", "start_date", "end_date")
+
+    def __init__(self, id: int, property_id: int, owner_id: int, tenant_id: int, status: str,  # noqa: A002
+                 start_date: str, end_date: str) -> None:
+        self.id = id
+        self.property_id = property_id
+        self.owner_id = owner_id
+        self.tenant_id = tenant_id
+        self.status = status
+        self.start_date = start_date
+        self.end_date = end_date
+
+
+class ContactRequestRecord:
+    __slots__ = ("id", "owner_id", "tenant_id", "status")
+
+    def __init__(self, id: int, owner_id: int, tenant_id: int, status: str) -> None:  # noqa: A002
+        self.id = id
+        self.owner_id = owner_id
+        self.tenant_id = tenant_id
+        self.status = status
+
+
+def _records(record: type) -> t.Callable[[sqlite3.Cursor, tuple], t.Any]:
+    return lambda cursor, row: record(*row)
+
+
+@functools.lru_cache(maxsize=256)
+def _update_statement(table: str, columns: tuple[str, ...], touch: bool = False) -> str:
+    """The UPDATE for one set of ``columns``, always spelled the same way."""
+    assignments = [f"{col} = ?" for col in columns]
+    if touch:
+        assignments.append("updated_at = CURRENT_TIMESTAMP")
+    return f"UPDATE {table} SET {', '.join(assignments)} WHERE id = ?"
+
+
+def _update(db: sqlite3.Connection, table: str, allowed: t.Sequence[str], row_id: int,
+            changes: t.Mapping[str, t.Any], touch: bool = False) -> None:
+    # Columns in declaration order whatever order the request body used, so
+    # each set of changed fields maps to exactly one statement text
+    columns = tuple(col for col in allowed if col in changes)
+    db.execute(_update_statement(table, columns, touch), [*(changes[col] for col in columns), row_id])
+
+
+class Repository:
+    __slots__ = ("db",)
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+
+    def _one(self, sql: str, params: t.Sequence | t.Mapping, factory: t.Callable) -> t.Any:
+        cur = self.db.cursor()
+        cur.row_factory = factory
+        return cur.execute(sql, params).fetchone()
+
+    def _all(self, sql: str, params: t.Sequence | t.Mapping, factory: t.Callable) -> list:
+        cur = self.db.cursor()
+        cur.row_factory = factory
+        return cur.execute(sql, params).fetchall()
+
+
+class Users(Repository):
+    __slots__ = ()
+
+    COLUMNS = "id, name, email, role, is_admin"
+    GET = f"SELECT {COLUMNS} FROM users WHERE id = ?"
+    BY_EMAIL = f"SELECT {COLUMNS}, password_hash FROM users WHERE email = ?"
+    ALL = f"SELECT {COLUMNS} FROM users ORDER BY id"
+    PASSWORD_HASH = "SELECT password_hash FROM users WHERE id = ?"
+    INSERT = "INSERT INTO users (name, email, password_hash, role) VALUES (?, ?, ?, ?)"
+    SET_PASSWORD = "UPDATE users SET password_hash = ? WHERE id = ?"
+    SET_ROLE = "UPDATE users SET role = ? WHERE id = ?"
+    DELETE = "DELETE FROM users WHERE id = ?"
+
+    _record = staticmethod(_records(UserRecord))
+    _credentials = staticmethod(lambda cursor, row: (UserRecord(*row[:5]), row[5]))
+
+    def get(self, user_id: int | str) -> UserRecord | None:
+        """Every role and admin check reads through this one statement."""
+        return self._one(self.GET, (user_id,), self._record)
+
+    def credentials(self, email: str) -> tuple[UserRecord, str] | None:
+        """``(user, password_hash)`` for a sign-in address."""
+        return self._one(self.BY_EMAIL, (email,), self._credentials)
+
+    def email_taken(self, email: str) -> bool:
+        return self.credentials(email) is not None
+
+    def password_hash(self, user_id: int | str) -> str | None:
+        row = self.db.execute(self.PASSWORD_HASH, (user_id,)).fetchone()
+        return row[0] if row else None
+
+    def all(self) -> list[UserRecord]:
+        return self._all(self.ALL, (), self._record)
+
+    def insert(self, name: str, email: str, password_hash: str, role: str) -> int:
+        return self.db.execute(self.INSERT, (name, email, password_hash, role)).lastrowid
+
+    def set_password(self, user_id: int | str, password_hash: str) -> None:
+        self.db.execute(self.SET_PASSWORD, (password_hash, user_id))
+
+    def set_role(self, user_id: int | str, role: str) -> None:
+        self.db.execute(self.SET_ROLE, (role, user_id))
+
+    def delete(self, user_id: int | str) -> None:
+        self.db.execute(self.DELETE, (user_id,))
+
+
+class Properties(Repository):
+    __slots__ = ()
+
+    # Columns an owner may set, in INSERT order (status included)
+    COLUMNS = (
+        "title", "description", "property_type", "bedrooms", "bathrooms", "square_feet",
+        "rent_amount", "security_deposit", "lease_duration", "available_date", "address", "city",
+        "neighborhood", "latitude", "longitude", "furnished", "parking_available", "pet_policy",
+        "smoking_policy", "amenities", "contact_info", "status",
+    )
+    # Columns PUT /properties/<id> changes (amenities and contact_info are set on create only)
+    UPDATABLE = tuple(col for col in COLUMNS if col not in ("amenities", "contact_info"))
+
+    GET = "SELECT id, owner_id, status FROM properties WHERE id = ?"
+    INSERT = (
+        f"INSERT INTO properties (owner_id, {', '.join(COLUMNS)}) "
+        f"VALUES (:owner_id, {', '.join(':' + col for col in COLUMNS)})"
+    )
+    SET_STATUS = "UPDATE properties SET status = ? WHERE id = ?"
+    DELETE = "DELETE FROM properties WHERE id = ?"
+
+    _record = staticmethod(_records(PropertyRecord))
+
+    def get(self, property_id: int) -> PropertyRecord | None:
+        return self._one(self.GET, (property_id,), self._record)
+
+    def insert(self, owner_id: int | str, values: t.Mapping[str, t.Any]) -> int:
+        params = {col: values.get(col) for col in self.COLUMNS}
+        params["owner_id"] = owner_id
+        return self.db.execute(self.INSERT, params).lastrowid
+
+    def update(self, property_id: int, changes: t.Mapping[str, t.Any]) -> None:
+        _update(self.db, "properties", self.UPDATABLE, property_id, changes, touch=True)
+
+    def set_status(self, property_id: int, status: str) -> None:
+        self.db.execute(self.SET_STATUS, (status, property_id))
+
+    def delete(self, property_id: int) -> None:
+        self.db.execute(self.DELETE, (property_id,))
+
+
+class Rentals(Repository):
+    __slots__ = ()
+
+    UPDATABLE = ("start_date", "end_date", "rent_amount", "security_deposit", "status")
+
+    GET = "SELECT id, property_id, owner_id, tenant_id, status, start_date, end_date FROM rentals WHERE id = ?"
+    INSERT = """
+        INSERT INTO rentals (property_id, tenant_id, owner_id, start_date, end_date, rent_amount, security_deposit)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+    DELETE = "DELETE FROM rentals WHERE id = ?"
+
+    _record = staticmethod(_records(RentalRecord))
+
+    def get(self, rental_id: int) -> RentalRecord | None:
+        return self._one(self.GET, (rental_id,), self._record)
+
+    def insert(self, property_id: int, tenant_id: int, owner_id: int | str, start_date: str, end_date: str,
+               rent_amount: t.Any, security_deposit: t.Any = None) -> int:
+        return self.db.execute(
+            self.INSERT, (property_id, tenant_id, owner_id, start_date, end_date, rent_amount, security_deposit)
+        ).lastrowid
+
+    def update(self, rental_id: int, changes: t.Mapping[str, t.Any]) -> None:
+        _update(self.db, "rentals", self.UPDATABLE, rental_id, changes)
+
+    def delete(self, rental_id: int) -> None:
+        self.db.execute(self.DELETE, (rental_id,))
+
+
+class Messages(Repository):
+    __slots__ = ()
+
+    INSERT = """
+        INSERT INTO messages (sender_id, recipient_id, subject, message, property_id, inquiry_type, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
+    """
+    DETAIL = """
+        SELECT m.*,
+               u1.name as sender_name, u1.email as sender_email,
+               u2.name as recipient_name, u2.email as recipient_email,
+               p.title as property_title
+        FROM messages m
+        LEFT JOIN users u1 ON m.sender_id = u1.id
+        LEFT JOIN users u2 ON m.recipient_id = u2.id
+        LEFT JOIN properties p ON m.property_id = p.id
+        WHERE m.id = ?
+    """
+
+    _detail_rows = RowMapper(MESSAGE_FIELDS)
+
+    def insert(self, sender_id: int | str, recipient_id: t.Any, subject: t.Any, message: t.Any,
+               property_id: t.Any = None, inquiry_type: str = "general") -> int:
+        return self.db.execute(
+            self.INSERT, (sender_id, recipient_id, subject, message, property_id, inquiry_type)
+        ).lastrowid
+
+    def detail(self, message_id: int) -> dict | None:
+        cur = self.db.cursor()
+        cur.row_factory = None
+        return self._detail_rows.one(cur.execute(self.DETAIL, (message_id,)))
+
+
+class ContactRequests(Repository):
+    __slots__ = ()
+
+    GET = "SELECT id, owner_id, tenant_id, status FROM contact_requests WHERE id = ?"
+    INSERT = """
+        INSERT INTO contact_requests (
+            property_id, owner_id, tenant_id, tenant_name, tenant_email,
+            tenant_phone, message, preferred_date, inquiry_type, status, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', datetime('now'))
+    """
+    DETAIL = """
+        SELECT cr.*, p.title as property_title, u.name as owner_name
+        FROM contact_requests cr
+        LEFT JOIN properties p ON cr.property_id = p.id
+        LEFT JOIN users u ON cr.owner_id = u.id
+        WHERE cr.id = ?
+    """
+    SET_STATUS = "UPDATE contact_requests SET status = ? WHERE id = ?"
+
+    _record = staticmethod(_records(ContactRequestRecord))
+    _detail_rows = RowMapper(CONTACT_REQUEST_FIELDS)
+
+    def get(self, request_id: int) -> ContactRequestRecord | None:
+        return self._one(self.GET, (request_id,), self._record)
+
+    def insert(self, property_id: t.Any, owner_id: t.Any, tenant_id: int | str, tenant_name: t.Any,
+               tenant_email: t.Any, tenant_phone: t.Any, message: t.Any, preferred_date: t.Any,
+               inquiry_type: str = "general") -> int:
+        return self.db.execute(self.INSERT, (
+            property_id, owner_id, tenant_id, tenant_name, tenant_email,
+            tenant_phone, message, preferred_date, inquiry_type,
+        )).lastrowid
+
+    def detail(self, request_id: int) -> dict | None:
+        cur = self.db.cursor()
+        cur.row_factory = None
+        return self._detail_rows.one(cur.execute(self.DETAIL, (request_id,)))
+
+    def set_status(self, request_id: int, status: str) -> None:
+        self.db.execute(self.SET_STATUS, (status, request_id))
@@ -0,0 +1,223 @@
+import itertools
+import json
+import os
+import typing as t
+from operator import itemgetter
+
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:  # orjson is optional; the stdlib encoder is always available
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson when it is installed.
+
+    Falls back to Flask's stdlib provider when orjson is missing, when it is
+    disabled through ``JSON_PROVIDER=stdlib`` or when a payload contains
+    something orjson refuses (non-string keys, integers wider than 64 bits).
+    """
+
+    def __init__(self, app, backend: str | None = None) -> None:  # noqa: ANN001
+        super().__init__(app)
+        backend = (backend or os.getenv("JSON_PROVIDER", "auto")).lower()
+        self.use_orjson = orjson is not None and backend in ("auto", "orjson")
+
+    def dumps_bytes(self, obj: t.Any, indent: bool = False) -> bytes:
+        if self.use_orjson:
+            option = 0
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                pass
+        kwargs = {"indent": 2} if indent else {"separators": (",", ":")}
+        return self.dumps(obj, **kwargs).encode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: t.Any) -> t.Any:
+        if self.use_orjson and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: t.Any, **kwargs: t.Any):  # noqa: ANN201
+        """Serialize straight to bytes, skipping the intermediate ``str``."""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self.dumps_bytes(obj, indent=indent) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def encode_json(obj: t.Any) -> bytes:
+    """Compact, key-sorted JSON bytes for code running outside a Flask request."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _json_list(value):  # noqa: ANN001, ANN202
+    return _loads(value) if value else []
+
+
+def _json_object(value):  # noqa: ANN001, ANN202
+    return _loads(value) if value else {}
+
+
+def _float_or_none(value):  # noqa: ANN001, ANN202
+    return float(value) if value else None
+
+
+class RowMapper:
+    """Map plain sqlite3 tuples to dicts through a precomputed column map.
+
+    The column map is built once from ``cursor.description`` and reused for
+    every row and every later call with the same column layout, so mapping a
+    row is one ``itemgetter`` call plus a ``zip`` instead of building a
+    ``sqlite3.Row`` and copying it with ``dict(row)``.
+
+    ``fields`` fixes the output keys (missing columns become ``None``);
+    without it every selected column is emitted, the last duplicate name
+    winning. ``converters`` post-process individual keys.
+    """
+
+    __slots__ = ("fields", "converters", "_plan")
+
+    def __init__(self, fields: t.Sequence[str] | None = None,
+                 converters: dict[str, t.Callable[[t.Any], t.Any]] | None = None) -> None:
+        self.fields = tuple(fields) if fields else None
+        self.converters = tuple((converters or {}).items())
+        self._plan = ((), (), None, ())
+
+    def _bind(self, description) -> tuple:  # noqa: ANN001
+        columns = tuple(col[0] for col in description)
+        plan = self._plan
+        if columns == plan[0]:
+            return plan
+        positions = {name: idx for idx, name in enumerate(columns)}
+        keys = self.fields or tuple(positions)
+        # Rows are padded with one trailing None so missing fields share the getter.
+        missing = len(columns)
+        indexes = [positions.get(key, missing) for key in keys]
+        if len(indexes) == 1:
+            only = indexes[0]
+            getter = lambda row: (row[only],)  # noqa: E731
+        else:
+            getter = itemgetter(*indexes)
+        converters = tuple((key, fn) for key, fn in self.converters if key in keys)
+        # Swapped in as one tuple so concurrent requests never see a half-built plan.
+        self._plan = plan = (columns, keys, getter, converters)
+        return plan
+
+    def one(self, cursor) -> dict | None:  # noqa: ANN001
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        _, keys, getter, converters = self._bind(cursor.description)
+        record = dict(zip(keys, getter(tuple(row) + (None,))))
+        for key, convert in converters:
+            record[key] = convert(record[key])
+        return record
+
+    def all(self, cursor) -> list[dict]:  # noqa: ANN001
+        rows = cursor.fetchall()
+        if not rows:
+            return []
+        _, keys, getter, converters = self._bind(cursor.description)
+        pad = (None,)
+        records = [dict(zip(keys, getter(tuple(row) + pad))) for row in rows]
+        for key, convert in converters:
+            for record in records:
+                record[key] = convert(record[key])
+        return records
+
+    def batches(self, cursor, size: int) -> t.Iterator[list[dict]]:  # noqa: ANN001
+        """Map the cursor's rows ``size`` at a time, reading each batch with ``fetchmany``."""
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            _, keys, getter, converters = self._bind(cursor.description)
+            pad = (None,)
+            records = [dict(zip(keys, getter(tuple(row) + pad))) for row in rows]
+            for key, convert in converters:
+                for record in records:
+                    record[key] = convert(record[key])
+            yield records
+
+
+def json_list_response(key: str, batches: t.Iterable[list], **extra: t.Any):  # noqa: ANN201
+    """A ``{key: [...], **extra}`` JSON response written one batch of items at a time.
+
+    The first two batches are read before returning, so query errors still
+    surface in the view. A list that fits in one batch is sent as an
+    ordinary response; a longer one is streamed, each batch encoded and sent
+    as it is read, so memory stays at a couple of batches whatever the
+    list's length and the first rows go out before the last are read. An
+    error after that point can only cut the body short.
+    """
+    dumps = current_app.json.dumps_bytes
+    batches = iter(batches)
+    first = next(batches, [])
+    second = next(batches, None)
+    if second is None:
+        return current_app.json.response({key: first, **extra})
+
+    def generate() -> t.Iterator[bytes]:
+        yield b"{" + dumps(key) + b":[" + dumps(first)[1:-1]
+        separator = b"," if first else b""
+        for items in itertools.chain((second,), batches):
+            if items:
+                yield separator + dumps(items)[1:-1]
+                separator = b","
+        yield b"]" + (b"," + dumps(extra)[1:] if extra else b"}") + b"\n"
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=current_app.json.mimetype)
+
+
+def tuple_cursor(db):  # noqa: ANN001, ANN201
+    """Cursor that yields plain tuples instead of ``sqlite3.Row`` objects."""
+    cur = db.cursor()
+    cur.row_factory = None
+    return cur
+
+
+PROPERTY_CONVERTERS = {"amenities": _json_list, "contact_info": _json_object}
+
+RENTAL_FIELDS = (
+    "id", "property_id", "tenant_id", "owner_id", "start_date", "end_date",
+    "rent_amount", "security_deposit", "status", "created_at", "property_title",
+    "tenant_name", "tenant_email", "owner_name", "owner_email",
+)
+RENTAL_CONVERTERS = {"rent_amount": _float_or_none, "security_deposit": _float_or_none}
+
+MESSAGE_FIELDS = (
+    "id", "sender_id", "recipient_id", "subject", "message", "property_id",
+    "inquiry_type", "created_at", "sender_name", "sender_email",
+    "recipient_name", "recipient_email", "property_title",
+)
+
+CONTACT_REQUEST_FIELDS = (
+    "id", "property_id", "owner_id", "tenant_id", "tenant_name", "tenant_email",
+    "tenant_phone", "message", "preferred_date", "inquiry_type", "status",
+    "created_at", "property_title", "owner_name",
+)
+
+USER_FIELDS = ("id", "name", "email", "role", "is_admin")
+
+# Ledger amounts are NOT NULL, so a zero balance stays 0.0 rather than None
+INVOICE_CONVERTERS = {"amount_due": float, "amount_paid": float}
+PAYMENT_CONVERTERS = {"amount": float}
+REVENUE_CONVERTERS = {"invoiced": float, "collected": float}
@@ -0,0 +1,144 @@
+import re
+import sqlite3
+import typing as t
+
+# Orders for property lists: ``?sort=`` on GET /properties and
+# GET /my-properties.
+#
+# Each column order reads an index on its sort key (schema v12; the owner_id
+# ones serve an owner's own list). Ties are broken by id in the same
+# direction, which every index already holds as the rowid, so listings come
+# off the index in order with no sort step however many match, and a keyset
+# cursor ("<id>:<key>" of the last row) seeks to where the previous page
+# stopped instead of reading past it. Empty bedroom and size values sort as
+# -1 so the indexed expression never needs NULL handling in the comparison.
+#
+# relevance ranks a ``q`` text search by bm25 through the FTS5 index
+# properties_fts, which returns matches best first. distance has no stored
+# order to read: the (latitude, longitude) index finds the listings in a box
+# around ``lat``/``lng`` (``radius`` km across), and only those are sorted.
+
+SORTS = {
+    "newest": ("p.created_at", "DESC"),
+    "price_asc": ("p.rent_amount", "ASC"),
+    "price_desc": ("p.rent_amount", "DESC"),
+    "bedrooms": ("coalesce(p.bedrooms, -1)", "DESC"),
+    "size": ("coalesce(p.square_feet, -1)", "DESC"),
+}
+SORT_MODES = (*SORTS, "distance", "relevance")
+
+# Index name suffix -> the key it orders properties by, as spelled in SORTS
+SORT_INDEXES = {
+    "created": "created_at",
+    "rent": "rent_amount",
+    "bedrooms": "coalesce(bedrooms, -1)",
+    "size": "coalesce(square_feet, -1)",
+}
+
+TEXT_COLUMNS = ("title", "description", "address", "city", "neighborhood")
+
+DISTANCE_RADIUS_KM = 10
+DISTANCE_MAX_RADIUS_KM = 50
+
+_WORD = re.compile(r"\w+")
+
+
+def text_query(text: str | None) -> str | None:
+    """An FTS5 MATCH expression for free text: every word, each as a prefix; None without words."""
+    words = _WORD.findall((text or "").lower())[:10]
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+def sort_mode(sort: str | None, text: str | None) -> str:
+    """The sort to apply: ``sort`` if given, else relevance for a text search and newest otherwise.
+
+    relevance without search text falls back to newest. Raises
+    ``ValueError`` for an unknown mode.
+    """
+    if not sort:
+        return "relevance" if text else "newest"
+    if sort not in SORT_MODES:
+        raise ValueError(f"sort must be one of {', '.join(SORT_MODES)}.")
+    return "newest" if sort == "relevance" and not text else sort
+
+
+def parse_number(value: t.Any, name: str, convert: t.Callable = float) -> t.Any:
+    """``value`` passed through ``convert`` (float or int); ``ValueError`` naming ``name`` otherwise."""
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        kind = "a whole number" if convert is int else "a number"
+        raise ValueError(f"{name} must be {kind}.") from None
+
+
+def split_cursor(cursor: str, convert: t.Callable = str) -> tuple[int, t.Any]:
+    """The (id, sort key through ``convert``) of a ``<id>:<key>`` cursor; ``ValueError`` if malformed."""
+    after_id, sep, key = cursor.partition(":")
+    if not sep or not after_id.isdigit():
+        raise ValueError("Invalid cursor.")
+    try:
+        return int(after_id), convert(key)
+    except ValueError:
+        raise ValueError("Invalid cursor.") from None
+
+
+def keyset(sort: str, cursor: str | None) -> tuple[str, str, list]:
+    """(ORDER BY clause, page condition, its params) for a column sort from ``cursor`` on.
+
+    The page condition repeats the bound on the key alone so that the index
+    seek can use it; the row-value comparison then settles ties by id.
+    """
+    key, direction = SORTS[sort]
+    order = f"{key} {direction}, p.id {direction}"
+    if not cursor:
+        return order, "", []
+    after_id, value = split_cursor(cursor, str if sort == "newest" else float)
+    op = "<" if direction == "DESC" else ">"
+    return order, f"{key} {op}= ? AND ({key}, p.id) {op} (?, ?)", [value, value, after_id]
+
+
+def nearby_args(args: t.Mapping[str, str]) -> tuple[float, float, float]:
+    """(lat, lng, radius km) of a distance sort; ``ValueError`` without a valid point."""
+    if not args.get("lat") or not args.get("lng"):
+        raise ValueError("sort=distance needs lat and lng.")
+    lat, lng = parse_number(args["lat"], "lat"), parse_number(args["lng"], "lng")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("lat/lng out of range.")
+    radius = parse_number(args.get("radius") or DISTANCE_RADIUS_KM, "radius")
+    if radius <= 0:
+        raise ValueError("radius must be positive.")
+    return lat, lng, min(radius, DISTANCE_MAX_RADIUS_KM)
+
+
+def create_sort_indexes(cur: sqlite3.Cursor) -> None:
+    """Sort indexes and the full-text index over properties (schema v12)."""
+    for name, key in SORT_INDEXES.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_properties_{name} ON properties ({key})")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_properties_owner_{name} ON properties (owner_id, {key})")
+    columns = ", ".join(TEXT_COLUMNS)
+    cur.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS properties_fts USING fts5(
+            {columns}, content='properties', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    # An external-content index stores no text, so a removal must repeat the old values
+    new = ", ".join(f"NEW.{column}" for column in TEXT_COLUMNS)
+    old = ", ".join(f"OLD.{column}" for column in TEXT_COLUMNS)
+    add = f"INSERT INTO properties_fts (rowid, {columns}) VALUES (NEW.id, {new});"
+    remove = f"INSERT INTO properties_fts (properties_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old});"
+    for name, event, body in (
+        ("insert", "INSERT", add),
+        ("update", f"UPDATE OF {columns}", remove + add),
+        ("delete", "DELETE", remove),
+    ):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS properties_fts_{name} AFTER {event} ON properties
+            BEGIN
+                {body}
+            END
+            """
+        )
+    cur.execute("INSERT INTO properties_fts (properties_fts) VALUES ('rebuild')")
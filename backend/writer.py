@@ -0,0 +1,230 @@
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+from flask import Flask, current_app
+
+try:  # Support running as module or script
+    from .models import get_db
+except Exception:  # pragma: no cover
+    from models import get_db  # type: ignore
+
+
+class WriteQueue:
+    """Funnels every write in this process through one writer thread.
+
+    SQLite has a single write lock, so request threads that each commit on
+    their own connection only queue up on it (or fail with SQLITE_BUSY).
+    Here they hand a function to the writer thread instead; it runs
+    whatever has queued up inside one transaction, each operation under its
+    own savepoint so a failing one is rolled back alone, and commits the
+    batch at once: one WAL sync for many requests.
+
+    Operations receive the writer connection and must not commit. Ones
+    that manage their own transactions (the ledger and lease jobs) are
+    submitted with ``exclusive=True`` and run between batches.
+    """
+
+    def __init__(self, db_path: str, busy_timeout: float = 5.0, max_batch: int = 64) -> None:
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.max_batch = max_batch
+        self.batches = 0
+        self.operations = 0
+        self.largest_batch = 0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        # The writer thread does not survive fork, so each worker starts its own
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._queue = queue.SimpleQueue()
+            ready = threading.Event()
+            startup_errors = []
+            self._thread = threading.Thread(target=self._run, args=(self._queue, ready, startup_errors),
+                                            name="db-writer", daemon=True)
+            self._thread.start()
+            # The writer's connection keeps the WAL open, which read-only connections need
+            ready.wait()
+            if startup_errors:
+                # Left unstarted, so the next write tries to open the connection again
+                raise startup_errors[0]
+            self._pid = pid
+
+    def submit(self, fn, *args, exclusive: bool = False) -> Future:  # noqa: ANN001
+        """Queue ``fn(conn, *args)``; the future resolves once its batch is committed."""
+        self.ensure_started()
+        future = Future()
+        self._queue.put((fn, args, exclusive, future))
+        return future
+
+    def execute(self, fn, *args, exclusive: bool = False, timeout: float | None = None):  # noqa: ANN001, ANN201
+        """Blocking form of :meth:`submit`: returns ``fn``'s result or raises its exception."""
+        return self.submit(fn, *args, exclusive=exclusive).result(timeout)
+
+    async def execute_async(self, fn, *args, exclusive: bool = False):  # noqa: ANN001, ANN201
+        return await asyncio.wrap_future(self.submit(fn, *args, exclusive=exclusive))
+
+    def stop(self) -> None:
+        if self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join()
+            self._pid = None
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "operations": self.operations,
+            "largest_batch": self.largest_batch,
+            "operations_per_commit": round(self.operations / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def _run(self, jobs: queue.SimpleQueue, ready: threading.Event, startup_errors: list) -> None:
+        conn = None
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+        except Exception as e:  # noqa: BLE001 - raised to the caller waiting in ensure_started
+            startup_errors.append(e)
+        finally:
+            ready.set()
+        if conn is None:
+            return
+        try:
+            while True:
+                item = jobs.get()
+                if item is None:
+                    return
+                batch = [item]
+                # Whatever queued up while the last batch was committing joins this one
+                while len(batch) < self.max_batch:
+                    try:
+                        item = jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        jobs.put(None)
+                        break
+                    batch.append(item)
+
+                group = []
+                for item in batch:
+                    if item[2]:
+                        self._commit_group(conn, group)
+                        group = []
+                        self._run_exclusive(conn, item)
+                    else:
+                        group.append(item)
+                self._commit_group(conn, group)
+        finally:
+            conn.close()
+
+    def _commit_group(self, conn: sqlite3.Connection, group: list) -> None:
+        group = [item for item in group if item[3].set_running_or_notify_cancel()]
+        if not group:
+            return
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            for _, _, _, future in group:
+                future.set_exception(e)
+            return
+
+        done = []
+        for index, (fn, args, _, future) in enumerate(group):
+            conn.execute("SAVEPOINT op")
+            try:
+                result = fn(conn, *args)
+            except BaseException as e:  # noqa: BLE001 - handed to the caller
+                future.set_exception(e)
+                try:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                except sqlite3.Error as fatal:
+                    # The error already ended the transaction: the whole batch is lost
+                    self._fail(conn, [f for f, _ in done] + [item[3] for item in group[index + 1:]], fatal)
+                    return
+                continue
+            conn.execute("RELEASE op")
+            done.append((future, result))
+
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self._fail(conn, [future for future, _ in done], e)
+            return
+
+        self.batches += 1
+        self.operations += len(group)
+        self.largest_batch = max(self.largest_batch, len(group))
+        for future, result in done:
+            future.set_result(result)
+
+    def _fail(self, conn: sqlite3.Connection, futures: list[Future], error: Exception) -> None:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _run_exclusive(self, conn: sqlite3.Connection, item: tuple) -> None:
+        fn, args, _, future = item
+        if not future.set_running_or_notify_cancel():
+            return
+        # Back to the sqlite3 module's implicit transactions, which these callers expect
+        conn.isolation_level = ""
+        try:
+            result = fn(conn, *args)
+            conn.commit()
+        except BaseException as e:  # noqa: BLE001 - handed to the caller
+            conn.rollback()
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            conn.isolation_level = None
+
+
+def write(fn, *args, exclusive: bool = False):  # noqa: ANN001, ANN201
+    """Run ``fn(conn, *args)`` as a write and return its result.
+
+    Goes through the writer thread when the write queue is enabled;
+    otherwise runs on the request's connection and commits.
+    """
+    writer = current_app.extensions.get("write_queue")
+    if writer is not None:
+        return writer.execute(fn, *args, exclusive=exclusive)
+    db = get_db()
+    try:
+        result = fn(db, *args)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return result
+
+
+def init_write_queue(app: Flask) -> WriteQueue | None:
+    """Enable the writer thread; request connections then open read-only."""
+    app.config.setdefault("WRITE_QUEUE_ENABLED", os.getenv("WRITE_QUEUE_ENABLED", "true").lower() == "true")
+    app.config.setdefault("WRITE_QUEUE_MAX_BATCH", int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64")))
+    if not app.config["WRITE_QUEUE_ENABLED"]:
+        return None
+
+    writer = WriteQueue(
+        app.config["DATABASE_PATH"],
+        busy_timeout=app.config.get("DATABASE_BUSY_TIMEOUT", 5.0),
+        max_batch=app.config["WRITE_QUEUE_MAX_BATCH"],
+    )
+    app.extensions["write_queue"] = writer
+    return writer
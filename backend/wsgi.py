@@ -0,0 +1,23 @@
+"""
+Production WSGI entry point for Garissa House Rental Hub.
+Run from the project root:  gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+"""
+
+import os
+
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+try:  # Support running as module or script
+    from .app import create_app, load_env
+except Exception:  # pragma: no cover
+    from app import create_app, load_env  # type: ignore
+
+load_env()
+
+app = create_app()
+
+# Behind nginx/a load balancer, trust X-Forwarded-* from this many proxies so
+# request.remote_addr (used by rate limiting) is the real client address.
+trusted_proxies = int(os.getenv("TRUSTED_PROXIES", "0"))
+if trusted_proxies:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies, x_host=trusted_proxies)
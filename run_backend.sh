@@ -1,7 +1,8 @@
 #!/bin/bash
 
 # Script to run Flask backend
-# Usage: ./run_backend.sh
+# Usage: ./run_backend.sh               (development server)
+#        ./run_backend.sh --production  (gunicorn, multi-worker)
 
 echo "Starting Flask Backend..."
 
@@ -30,8 +31,16 @@ pip install -r backend/requirements.txt
 # Kill any existing Flask processes
 echo "Stopping any existing Flask processes..."
 pkill -f "python.*backend.app" || true
+pkill -f "gunicorn.*backend.wsgi" || true
 sleep 2
 
+if [ "$1" = "--production" ]; then
+    # Run under gunicorn (see backend/gunicorn.conf.py for tuning variables)
+    echo "Starting gunicorn on http://localhost:${PORT:-5000}"
+    echo "Press Ctrl+C to stop, or send HUP to the master process to reload workers"
+    exec gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+fi
+
 # Run Flask app
 echo "Starting Flask server on http://localhost:5000"
 echo "Press Ctrl+C to stop"
@@ -7,13 +7,13 @@ const AdminManageRentals = () => {
   const [rentals, setRentals] = useState([]);
   const [loading, setLoading] = useState(true);
   const [properties, setProperties] = useState([]);
-  const [tenants, setTenants] = useState([]);
-  const [owners, setOwners] = useState([]);
+  const [tenantCount, setTenantCount] = useState(0);
+  const [ownerCount, setOwnerCount] = useState(0);
 
   useEffect(() => {
     fetchAllRentals();
     fetchAllProperties();
-    fetchAllUsers();
+    fetchUserCounts();
   }, []);
 
   const fetchAllRentals = async () => {
@@ -41,12 +41,15 @@ const AdminManageRentals = () => {
     }
   };
 
-  const fetchAllUsers = async () => {
+  const fetchUserCounts = async () => {
     try {
-      const response = await api.get('/admin/users');
-      const users = response.data.users || [];
-      setTenants(users.filter(user => user.role === 'tenant'));
-      setOwners(users.filter(user => user.role === 'owner'));
+      // Only the totals are shown, so ask for counts rather than every user
+      const count = (role) => api.get('/users/search', { params: { role, limit: 1, count: true } });
+      const [tenantsResponse, ownersResponse] = await Promise.all([count('tenant'), count('owner')]);
+      // Counts stop at the server's cap, shown as e.g. "1000+"
+      const total = ({ data }) => `${data.total || 0}${data.total_capped ? '+' : ''}`;
+      setTenantCount(total(tenantsResponse));
+      setOwnerCount(total(ownersResponse));
     } catch (error) {
       console.error('Error fetching users:', error);
     }
@@ -84,8 +87,8 @@ const AdminManageRentals = () => {
         <h2 className="text-xl font-semibold">Admin Rental Management</h2>
         <div className="flex space-x-3">
           <div className="text-sm text-gray-600">
-            <span className="font-medium">{tenants.length}</span> Tenants • 
-            <span className="font-medium ml-1">{owners.length}</span> Owners • 
+            <span className="font-medium">{tenantCount}</span> Tenants • 
+            <span className="font-medium ml-1">{ownerCount}</span> Owners • 
             <span className="font-medium ml-1">{properties.length}</span> Properties
           </div>
         </div>
@@ -99,11 +102,11 @@ const AdminManageRentals = () => {
           
           <div className="grid grid-cols-1 md:grid-cols-3 gap-6 mt-8">
             <div className="bg-blue-50 p-6 rounded-lg">
-              <div className="text-2xl font-bold text-blue-600">{tenants.length}</div>
+              <div className="text-2xl font-bold text-blue-600">{tenantCount}</div>
               <div className="text-sm text-gray-600">Total Tenants</div>
             </div>
             <div className="bg-green-50 p-6 rounded-lg">
-              <div className="text-2xl font-bold text-green-600">{owners.length}</div>
+              <div className="text-2xl font-bold text-green-600">{ownerCount}</div>
               <div className="text-sm text-gray-600">Property Owners</div>
             </div>
             <div className="bg-purple-50 p-6 rounded-lg">
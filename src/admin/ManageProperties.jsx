@@ -1,229 +1,293 @@
-import { useState, useEffect } from 'react';
-import { FiPlus, FiEdit, FiTrash2, FiSettings, FiSearch, FiArrowDown, FiFilter } from 'react-icons/fi';
-import { api } from '../lib/api';
-import toast from 'react-hot-toast';
-
-const ManageProperties = () => {
-  const [properties, setProperties] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [showModal, setShowModal] = useState(false);
-  const [currentProperty, setCurrentProperty] = useState(null);
-  const [searchTerm, setSearchTerm] = useState('');
-
-  useEffect(() => {
-    fetchProperties();
-  }, []);
-
-  const fetchProperties = async () => {
-    try {
-      setLoading(true);
-      const response = await api.get('/properties');
-      setProperties(response.data.properties || []);
-    } catch (error) {
-      toast.error('Failed to fetch properties');
-      console.error('Error fetching properties:', error);
-    } finally {
-      setLoading(false);
-    }
-  };
-
-  const filteredProperties = properties.filter(property =>
-    property.title?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    property.address?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    property.city?.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
-  const handleEdit = (property) => {
-    setCurrentProperty(property);
-    setShowModal(true);
-  };
-
-  const handleDelete = async (id) => {
-    if (!window.confirm('Are you sure you want to delete this property? This action cannot be undone.')) {
-      return;
-    }
-
-    try {
-      await api.delete(`/properties/${id}`);
-      toast.success('Property deleted successfully');
-      fetchProperties(); // Refresh the list
-    } catch (error) {
-      toast.error('Failed to delete property');
-      console.error('Error deleting property:', error);
-    }
-  };
-
-  const formatCurrency = (amount) => {
-    return new Intl.NumberFormat('en-KE', {
-      style: 'currency',
-      currency: 'KES',
-      minimumFractionDigits: 0,
-      maximumFractionDigits: 0,
-    }).format(amount);
-  };
-
-  if (loading) {
-    return (
-      <div className="flex items-center justify-center h-64">
-        <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
-      </div>
-    );
-  }
-
-  return (
-    <div className="space-y-6">
-      <div className="flex flex-col md:flex-row justify-between items-start md:items-center space-y-4 md:space-y-0">
-        <h2 className="text-2xl font-bold text-gray-800">Property Management</h2>
-        <div className="flex space-x-3">
-          <button className="flex items-center px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors">
-            <FiPlus className="mr-2" />
-            Add Property
-          </button>
-          <button className="flex items-center px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors">
-            <FiFilter className="mr-2" />
-            Filters
-          </button>
-          <button className="flex items-center px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors">
-            <FiArrowDown className="mr-2" />
-            Export
-          </button>
-        </div>
-      </div>
-
-      <div className="bg-white rounded-xl shadow-sm border border-gray-200 overflow-hidden">
-        <div className="p-4 border-b border-gray-200">
-          <div className="relative max-w-md">
-            <div className="absolute inset-y-0 left-0 pl-3 flex items-center pointer-events-none">
-              <FiSearch className="text-gray-400" />
-            </div>
-            <input
-              type="text"
-              className="block w-full pl-10 pr-3 py-2 border border-gray-300 rounded-lg bg-gray-50 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent"
-              placeholder="Search properties..."
-              value={searchTerm}
-              onChange={(e) => setSearchTerm(e.target.value)}
-            />
-          </div>
-        </div>
-
-        <div className="overflow-x-auto">
-          <table className="min-w-full divide-y divide-gray-200">
-            <thead className="bg-gray-50">
-              <tr>
-                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Property</th>
-                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Location</th>
-                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Details</th>
-                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Rent</th>
-                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Status</th>
-                <th scope="col" className="px-6 py-3 text-right text-xs font-medium text-gray-500 uppercase tracking-wider">Actions</th>
-              </tr>
-            </thead>
-            <tbody className="bg-white divide-y divide-gray-200">
-              {filteredProperties.length === 0 ? (
-                <tr>
-                  <td colSpan="6" className="px-6 py-4 text-center text-gray-500">
-                    {searchTerm ? 'No properties found matching your search' : 'No properties available'}
-                  </td>
-                </tr>
-              ) : (
-                filteredProperties.map((property) => (
-                  <tr key={property.id} className="hover:bg-gray-50">
-                    <td className="px-6 py-4 whitespace-nowrap">
-                      <div>
-                        <div className="text-sm font-medium text-gray-900">{property.title}</div>
-                        <div className="text-sm text-gray-500">ID: {property.id}</div>
-                      </div>
-                    </td>
-                    <td className="px-6 py-4 whitespace-nowrap">
-                      <div className="text-sm text-gray-900">{property.address}</div>
-                      <div className="text-sm text-gray-500">{property.city}</div>
-                    </td>
-                    <td className="px-6 py-4 whitespace-nowrap">
-                      <div className="text-sm text-gray-900">{property.bedrooms} beds, {property.bathrooms} baths</div>
-                      <div className="text-sm text-gray-500">{property.property_type}</div>
-                    </td>
-                    <td className="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900">
-                      {formatCurrency(property.rent_amount)}
-                    </td>
-                    <td className="px-6 py-4 whitespace-nowrap">
-                      <span className={`px-2 inline-flex text-xs leading-5 font-semibold rounded-full ${property.status === 'available' ? 'bg-green-100 text-green-800' :
-                          property.status === 'rented' ? 'bg-blue-100 text-blue-800' :
-                            'bg-yellow-100 text-yellow-800'
-                        }`}>
-                        {property.status?.charAt(0).toUpperCase() + property.status?.slice(1)}
-                      </span>
-                    </td>
-                    <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
-                      <button onClick={() => handleEdit(property)} className="text-blue-600 hover:text-blue-900 mr-4">
-                        <FiEdit />
-                      </button>
-                      <button onClick={() => handleDelete(property.id)} className="text-red-600 hover:text-red-900">
-                        <FiTrash2 />
-                      </button>
-                    </td>
-                  </tr>
-                ))
-              )}
-            </tbody>
-          </table>
-        </div>
-      </div>
-
-      {/* Property Count Summary */}
-      <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
-        <div className="bg-white rounded-lg shadow-sm p-4 border border-gray-200">
-          <div className="flex items-center">
-            <div className="p-2 bg-blue-100 rounded-lg">
-              <FiSettings className="w-6 h-6 text-blue-600" />
-            </div>
-            <div className="ml-3">
-              <p className="text-sm font-medium text-gray-600">Total Properties</p>
-              <p className="text-2xl font-bold text-gray-900">{properties.length}</p>
-            </div>
-          </div>
-        </div>
-        <div className="bg-white rounded-lg shadow-sm p-4 border border-gray-200">
-          <div className="flex items-center">
-            <div className="p-2 bg-green-100 rounded-lg">
-              <FiSettings className="w-6 h-6 text-green-600" />
-            </div>
-            <div className="ml-3">
-              <p className="text-sm font-medium text-gray-600">Available</p>
-              <p className="text-2xl font-bold text-gray-900">
-                {properties.filter(p => p.status === 'available').length}
-              </p>
-            </div>
-          </div>
-        </div>
-        <div className="bg-white rounded-lg shadow-sm p-4 border border-gray-200">
-          <div className="flex items-center">
-            <div className="p-2 bg-blue-100 rounded-lg">
-              <FiSettings className="w-6 h-6 text-blue-600" />
-            </div>
-            <div className="ml-3">
-              <p className="text-sm font-medium text-gray-600">Rented</p>
-              <p className="text-2xl font-bold text-gray-900">
-                {properties.filter(p => p.status === 'rented').length}
-              </p>
-            </div>
-          </div>
-        </div>
-        <div className="bg-white rounded-lg shadow-sm p-4 border border-gray-200">
-          <div className="flex items-center">
-            <div className="p-2 bg-yellow-100 rounded-lg">
-              <FiSettings className="w-6 h-6 text-yellow-600" />
-            </div>
-            <div className="ml-3">
-              <p className="text-sm font-medium text-gray-600">Maintenance</p>
-              <p className="text-2xl font-bold text-gray-900">
-                {properties.filter(p => p.status === 'maintenance').length}
-              </p>
-            </div>
-          </div>
-        </div>
-      </div>
-    </div>
-  );
-};
-
+import { useState, useEffect } from 'react';
+import { FiPlus, FiEdit, FiTrash2, FiSettings, FiSearch, FiArrowDown, FiFilter } from 'react-icons/fi';
+import { api } from '../lib/api';
+import toast from 'react-hot-toast';
+
+const ManageProperties = () => {
+  const [properties, setProperties] = useState([]);
+  const [loading, setLoading] = useState(true);
+  const [showModal, setShowModal] = useState(false);
+  const [currentProperty, setCurrentProperty] = useState(null);
+  const [searchTerm, setSearchTerm] = useState('');
+  const [heldForReview, setHeldForReview] = useState([]);
+
+  useEffect(() => {
+    fetchProperties();
+    fetchHeldForReview();
+  }, []);
+
+  // Listings that duplicate detection held back as pending_approval
+  const fetchHeldForReview = async () => {
+    try {
+      const response = await api.get('/admin/duplicates');
+      setHeldForReview(response.data.properties || []);
+    } catch (error) {
+      console.error('Error fetching duplicate listings:', error);
+    }
+  };
+
+  const handleApprove = async (id) => {
+    try {
+      await api.patch(`/admin/properties/${id}/status`, { status: 'available' });
+      toast.success('Listing approved');
+      fetchHeldForReview();
+      fetchProperties();
+    } catch (error) {
+      toast.error('Failed to approve listing');
+      console.error('Error approving listing:', error);
+    }
+  };
+
+  const handleReject = async (id) => {
+    if (!window.confirm('Delete this duplicate listing? This action cannot be undone.')) {
+      return;
+    }
+
+    try {
+      await api.delete(`/properties/${id}`);
+      toast.success('Duplicate listing deleted');
+      fetchHeldForReview();
+    } catch (error) {
+      toast.error('Failed to delete listing');
+      console.error('Error deleting listing:', error);
+    }
+  };
+
+  const fetchProperties = async () => {
+    try {
+      setLoading(true);
+      const response = await api.get('/properties');
+      setProperties(response.data.properties || []);
+    } catch (error) {
+      toast.error('Failed to fetch properties');
+      console.error('Error fetching properties:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const filteredProperties = properties.filter(property =>
+    property.title?.toLowerCase().includes(searchTerm.toLowerCase()) ||
+    property.address?.toLowerCase().includes(searchTerm.toLowerCase()) ||
+    property.city?.toLowerCase().includes(searchTerm.toLowerCase())
+  );
+
+  const handleEdit = (property) => {
+    setCurrentProperty(property);
+    setShowModal(true);
+  };
+
+  const handleDelete = async (id) => {
+    if (!window.confirm('Are you sure you want to delete this property? This action cannot be undone.')) {
+      return;
+    }
+
+    try {
+      await api.delete(`/properties/${id}`);
+      toast.success('Property deleted successfully');
+      fetchProperties(); // Refresh the list
+    } catch (error) {
+      toast.error('Failed to delete property');
+      console.error('Error deleting property:', error);
+    }
+  };
+
+  const formatCurrency = (amount) => {
+    return new Intl.NumberFormat('en-KE', {
+      style: 'currency',
+      currency: 'KES',
+      minimumFractionDigits: 0,
+      maximumFractionDigits: 0,
+    }).format(amount);
+  };
+
+  if (loading) {
+    return (
+      <div className="flex items-center justify-center h-64">
+        <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
+      </div>
+    );
+  }
+
+  return (
+    <div className="space-y-6">
+      <div className="flex flex-col md:flex-row justify-between items-start md:items-center space-y-4 md:space-y-0">
+        <h2 className="text-2xl font-bold text-gray-800">Property Management</h2>
+        <div className="flex space-x-3">
+          <button className="flex items-center px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors">
+            <FiPlus className="mr-2" />
+            Add Property
+          </button>
+          <button className="flex items-center px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors">
+            <FiFilter className="mr-2" />
+            Filters
+          </button>
+          <button className="flex items-center px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors">
+            <FiArrowDown className="mr-2" />
+            Export
+          </button>
+        </div>
+      </div>
+
+      {heldForReview.length > 0 && (
+        <div className="bg-yellow-50 rounded-xl border border-yellow-200 p-4 space-y-3">
+          <h3 className="text-lg font-semibold text-gray-800">Held for review: possible duplicates ({heldForReview.length})</h3>
+          {heldForReview.map((property) => (
+            <div key={property.id} className="bg-white rounded-lg border border-gray-200 p-3 flex flex-col md:flex-row md:items-center justify-between gap-3">
+              <div>
+                <div className="text-sm font-medium text-gray-900">{property.title} <span className="text-gray-500">(ID: {property.id}, {property.owner_name})</span></div>
+                <div className="text-sm text-gray-500">{property.address}, {property.city}</div>
+                <div className="text-xs text-gray-500 mt-1">
+                  Resembles {property.duplicates.map((other) => `#${other.id} ${other.title} (${Math.round(other.similarity * 100)}%)`).join(', ')}
+                </div>
+              </div>
+              <div className="flex space-x-2">
+                <button onClick={() => handleApprove(property.id)} className="px-3 py-1 text-sm bg-green-600 text-white rounded-lg hover:bg-green-700">
+                  Approve
+                </button>
+                <button onClick={() => handleReject(property.id)} className="px-3 py-1 text-sm border border-red-300 text-red-600 rounded-lg hover:bg-red-50">
+                  Delete
+                </button>
+              </div>
+            </div>
+          ))}
+        </div>
+      )}
+
+      <div className="bg-white rounded-xl shadow-sm border border-gray-200 overflow-hidden">
+        <div className="p-4 border-b border-gray-200">
+          <div className="relative max-w-md">
+            <div className="absolute inset-y-0 left-0 pl-3 flex items-center pointer-events-none">
+              <FiSearch className="text-gray-400" />
+            </div>
+            <input
+              type="text"
+              className="block w-full pl-10 pr-3 py-2 border border-gray-300 rounded-lg bg-gray-50 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+              placeholder="Search properties..."
+              value={searchTerm}
+              onChange={(e) => setSearchTerm(e.target.value)}
+            />
+          </div>
+        </div>
+
+        <div className="overflow-x-auto">
+          <table className="min-w-full divide-y divide-gray-200">
+            <thead className="bg-gray-50">
+              <tr>
+                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Property</th>
+                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Location</th>
+                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Details</th>
+                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Rent</th>
+                <th scope="col" className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Status</th>
+                <th scope="col" className="px-6 py-3 text-right text-xs font-medium text-gray-500 uppercase tracking-wider">Actions</th>
+              </tr>
+            </thead>
+            <tbody className="bg-white divide-y divide-gray-200">
+              {filteredProperties.length === 0 ? (
+                <tr>
+                  <td colSpan="6" className="px-6 py-4 text-center text-gray-500">
+                    {searchTerm ? 'No properties found matching your search' : 'No properties available'}
+                  </td>
+                </tr>
+              ) : (
+                filteredProperties.map((property) => (
+                  <tr key={property.id} className="hover:bg-gray-50">
+                    <td className="px-6 py-4 whitespace-nowrap">
+                      <div>
+                        <div className="text-sm font-medium text-gray-900">{property.title}</div>
+                        <div className="text-sm text-gray-500">ID: {property.id}</div>
+                      </div>
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap">
+                      <div className="text-sm text-gray-900">{property.address}</div>
+                      <div className="text-sm text-gray-500">{property.city}</div>
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap">
+                      <div className="text-sm text-gray-900">{property.bedrooms} beds, {property.bathrooms} baths</div>
+                      <div className="text-sm text-gray-500">{property.property_type}</div>
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900">
+                      {formatCurrency(property.rent_amount)}
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap">
+                      <span className={`px-2 inline-flex text-xs leading-5 font-semibold rounded-full ${property.status === 'available' ? 'bg-green-100 text-green-800' :
+                          property.status === 'rented' ? 'bg-blue-100 text-blue-800' :
+                            'bg-yellow-100 text-yellow-800'
+                        }`}>
+                        {property.status?.charAt(0).toUpperCase() + property.status?.slice(1)}
+                      </span>
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
+                      <button onClick={() => handleEdit(property)} className="text-blue-600 hover:text-blue-900 mr-4">
+                        <FiEdit />
+                      </button>
+                      <button onClick={() => handleDelete(property.id)} className="text-red-600 hover:text-red-900">
+                        <FiTrash2 />
+                      </button>
+                    </td>
+                  </tr>
+                ))
+              )}
+            </tbody>
+          </table>
+        </div>
+      </div>
+
+      {/* Property Count Summary */}
+      <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
+        <div className="bg-white rounded-lg shadow-sm p-4 border border-gray-200">
+          <div className="flex items-center">
+            <div className="p-2 bg-blue-100 rounded-lg">
+              <FiSettings className="w-6 h-6 text-blue-600" />
+            </div>
+            <div className="ml-3">
+              <p className="text-sm font-medium text-gray-600">Total Properties</p>
+              <p className="text-2xl font-bold text-gray-900">{properties.length}</p>
+            </div>
+          </div>
+        </div>
+        <div className="bg-white rounded-lg shadow-sm p-4 border border-gray-200">
+          <div className="flex items-center">
+            <div className="p-2 bg-green-100 rounded-lg">
+              <FiSettings className="w-6 h-6 text-green-600" />
+            </div>
+            <div className="ml-3">
+              <p className="text-sm font-medium text-gray-600">Available</p>
+              <p className="text-2xl font-bold text-gray-900">
+                {properties.filter(p => p.status === 'available').length}
+              </p>
+            </div>
+          </div>
+        </div>
+        <div className="bg-white rounded-lg shadow-sm p-4 border border-gray-200">
+          <div className="flex items-center">
+            <div className="p-2 bg-blue-100 rounded-lg">
+              <FiSettings className="w-6 h-6 text-blue-600" />
+            </div>
+            <div className="ml-3">
+              <p className="text-sm font-medium text-gray-600">Rented</p>
+              <p className="text-2xl font-bold text-gray-900">
+                {properties.filter(p => p.status === 'rented').length}
+              </p>
+            </div>
+          </div>
+        </div>
+        <div className="bg-white rounded-lg shadow-sm p-4 border border-gray-200">
+          <div className="flex items-center">
+            <div className="p-2 bg-yellow-100 rounded-lg">
+              <FiSettings className="w-6 h-6 text-yellow-600" />
+            </div>
+            <div className="ml-3">
+              <p className="text-sm font-medium text-gray-600">Maintenance</p>
+              <p className="text-2xl font-bold text-gray-900">
+                {properties.filter(p => p.status === 'maintenance').length}
+              </p>
+            </div>
+          </div>
+        </div>
+      </div>
+    </div>
+  );
+};
+
 export default ManageProperties;
\ No newline at end of file
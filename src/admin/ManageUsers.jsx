@@ -3,20 +3,34 @@ import { FiTrash2, FiUser, FiMail, FiLock, FiAlertCircle, FiHome, FiSearch } fro
 import { api } from '../lib/api';
 import toast from 'react-hot-toast';
 
+const PAGE_SIZE = 50;
+
 const ManageUsers = () => {
   const [users, setUsers] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [totalCapped, setTotalCapped] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [search, setSearch] = useState('');
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [deleting, setDeleting] = useState(null);
 
   useEffect(() => {
-    fetchUsers();
-  }, []);
+    // Search as the admin types, after a short pause
+    const timer = setTimeout(() => fetchUsers(), 250);
+    return () => clearTimeout(timer);
+  }, [search]);
 
   const fetchUsers = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/admin/users');
+      const response = await api.get('/users/search', {
+        params: { q: search.trim(), limit: PAGE_SIZE, count: true }
+      });
       setUsers(response.data.users);
+      setTotal(response.data.total);
+      setTotalCapped(response.data.total_capped);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       toast.error('Failed to fetch users');
       console.error('Error fetching users:', error);
@@ -25,6 +39,22 @@ const ManageUsers = () => {
     }
   };
 
+  const loadMoreUsers = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await api.get('/users/search', {
+        params: { q: search.trim(), limit: PAGE_SIZE, cursor: nextCursor }
+      });
+      setUsers(prev => [...prev, ...response.data.users]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      toast.error('Failed to fetch users');
+      console.error('Error fetching users:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDeleteUser = async (userId, userName) => {
     if (!window.confirm(`Are you sure you want to delete user "${userName}"? This action cannot be undone.`)) {
       return;
@@ -79,14 +109,6 @@ const ManageUsers = () => {
     }
   };
 
-  if (loading) {
-    return (
-      <div className="flex items-center justify-center h-64">
-        <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
-      </div>
-    );
-  }
-
   return (
     <div className="space-y-6">
       {/* Header */}
@@ -97,10 +119,28 @@ const ManageUsers = () => {
         </div>
         <div className="flex items-center space-x-2 text-sm text-gray-500">
           <FiUser className="w-4 h-4" />
-          <span>{users.length} total users</span>
+          <span>{total}{totalCapped ? '+' : ''} {search.trim() ? 'matching' : 'other'} users</span>
         </div>
       </div>
 
+      {/* Search */}
+      <div className="relative max-w-md">
+        <FiSearch className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-400" />
+        <input
+          type="text"
+          value={search}
+          onChange={(e) => setSearch(e.target.value)}
+          placeholder="Search by name or email"
+          className="w-full pl-9 pr-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"
+        />
+      </div>
+
+      {loading && users.length === 0 && (
+        <div className="flex items-center justify-center h-64">
+          <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
+        </div>
+      )}
+
       {/* Users Table */}
       <div className="bg-white rounded-lg shadow overflow-hidden">
         <div className="overflow-x-auto">
@@ -187,14 +227,27 @@ const ManageUsers = () => {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+          <div className="px-6 py-4 border-t border-gray-200 text-center">
+            <button
+              onClick={loadMoreUsers}
+              disabled={loadingMore}
+              className="px-4 py-2 text-sm font-medium text-blue-700 bg-blue-50 rounded-md hover:bg-blue-100 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Empty State */}
-      {users.length === 0 && (
+      {!loading && users.length === 0 && (
         <div className="text-center py-12">
           <FiUser className="mx-auto h-12 w-12 text-gray-400" />
           <h3 className="mt-2 text-sm font-medium text-gray-900">No users found</h3>
-          <p className="mt-1 text-sm text-gray-500">No users have registered yet.</p>
+          <p className="mt-1 text-sm text-gray-500">
+            {search.trim() ? 'No user name or email starts with that.' : 'No users have registered yet.'}
+          </p>
         </div>
       )}
 
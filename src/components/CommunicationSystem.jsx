@@ -3,6 +3,7 @@ import { FiSend, FiMessageSquare, FiUser, FiMail, FiPhone, FiCalendar, FiHome }
 import { api } from '../lib/api';
 import toast from 'react-hot-toast';
 import { useAuth } from '../context/AuthContext';
+import UserSearchSelect from './UserSearchSelect';
 
 const CommunicationSystem = () => {
     const { user } = useAuth();
@@ -18,7 +19,7 @@ const CommunicationSystem = () => {
         inquiryType: 'general'
     });
     const [properties, setProperties] = useState([]);
-    const [users, setUsers] = useState([]);
+    const [recipient, setRecipient] = useState(null);
 
     const inquiryTypes = [
         'general',
@@ -36,17 +37,21 @@ const CommunicationSystem = () => {
     const fetchData = async () => {
         setLoading(true);
         try {
-            // Fetch user's properties (if owner) or all properties (if tenant)
-            const propertiesResponse = await api.get(user?.role === 'owner' ? '/my-properties' : '/properties');
-            setProperties(propertiesResponse.data.properties || []);
-
-            // Fetch users for recipient selection
-            const usersResponse = await api.get('/users');
-            setUsers(usersResponse.data.users || []);
+            if (user?.role === 'owner' || user?.role === 'tenant') {
+                // Properties and messages in a single request; recipients are searched as you type
+                const { data } = await api.get(`/dashboard/${user.role}`, {
+                    params: { include: 'properties,messages' }
+                });
+                setProperties(data.properties || []);
+                setMessages(data.messages || []);
+            } else {
+                const propertiesResponse = await api.get('/properties');
+                setProperties(propertiesResponse.data.properties || []);
 
-            // Fetch existing messages
-            const messagesResponse = await api.get('/messages');
-            setMessages(messagesResponse.data.messages || []);
+                // Fetch existing messages
+                const messagesResponse = await api.get('/messages');
+                setMessages(messagesResponse.data.messages || []);
+            }
 
         } catch (error) {
             console.error('Error fetching data:', error);
@@ -90,6 +95,7 @@ const CommunicationSystem = () => {
 
             if (response.data.message) {
                 setMessages(prev => [response.data.message, ...prev]);
+                setRecipient(null);
                 setFormData({
                     recipient: '',
                     subject: '',
@@ -108,15 +114,12 @@ const CommunicationSystem = () => {
         }
     };
 
-    const getRecipientOptions = () => {
-        if (user?.role === 'admin') {
-            return users.filter(u => u.id !== user.id);
-        } else if (user?.role === 'owner') {
-            return users.filter(u => u.role === 'tenant');
-        } else if (user?.role === 'tenant') {
-            return users.filter(u => u.role === 'owner');
-        }
-        return [];
+    const handleRecipientSelect = (selected) => {
+        setRecipient(selected);
+        setFormData(prev => ({
+            ...prev,
+            recipient: selected ? selected.id : ''
+        }));
     };
 
     const getPropertyOptions = () => {
@@ -204,20 +207,11 @@ const CommunicationSystem = () => {
                                         <FiUser className="inline mr-1" />
                                         Recipient *
                                     </label>
-                                    <select
-                                        name="recipient"
-                                        value={formData.recipient}
-                                        onChange={handleInputChange}
-                                        required
-                                        className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500"
-                                    >
-                                        <option value="">Select recipient</option>
-                                        {getRecipientOptions().map(user => (
-                                            <option key={user.id} value={user.id}>
-                                                {user.name} ({user.role})
-                                            </option>
-                                        ))}
-                                    </select>
+                                    <UserSearchSelect
+                                        selected={recipient}
+                                        onSelect={handleRecipientSelect}
+                                        placeholder="Search recipients by name or email"
+                                    />
                                 </div>
 
                                 {/* Subject */}
@@ -24,19 +24,17 @@ const OwnerReports = () => {
   const fetchData = async () => {
     setLoading(true);
     try {
-      // Fetch owner's properties
-      const propertiesResponse = await api.get('/my-properties');
-      const propertiesData = propertiesResponse.data.properties || [];
+      // Fetch owner's properties, rentals and contact requests in one request
+      const { data } = await api.get('/dashboard/owner', {
+        params: { include: 'properties,rentals,contact_requests' }
+      });
+      const propertiesData = data.properties || [];
       setProperties(propertiesData);
 
-      // Fetch owner's rentals
-      const rentalsResponse = await api.get('/rentals');
-      const rentalsData = rentalsResponse.data.rentals || [];
+      const rentalsData = data.rentals || [];
       setRentals(rentalsData);
 
-      // Fetch contact requests
-      const contactResponse = await api.get('/contact-requests');
-      const contactData = contactResponse.data.contact_requests || [];
+      const contactData = data.contact_requests || [];
       setContactRequests(contactData);
 
       // Calculate stats
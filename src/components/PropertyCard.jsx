@@ -4,7 +4,7 @@ import { api } from '../lib/api';
 import toast from 'react-hot-toast';
 
 const PropertyCard = ({ property, onFavoriteToggle, onViewDetails, onContactOwner, showFavoriteButton = true }) => {
-  const [isFavorite, setIsFavorite] = useState(false);
+  const [isFavorite, setIsFavorite] = useState(Boolean(property.is_favorited));
   const [loading, setLoading] = useState(false);
 
   const handleFavoriteToggle = async () => {
@@ -20,6 +20,7 @@ const PropertyDetail = ({ propertyId, onClose, onFavoriteToggle }) => {
     try {
       const response = await api.get(`/properties/${propertyId}`);
       setProperty(response.data);
+      setIsFavorite(Boolean(response.data.is_favorited));
     } catch (error) {
       toast.error('Failed to load property details');
       console.error('Error fetching property details:', error);
@@ -140,7 +141,7 @@ const PropertyDetail = ({ propertyId, onClose, onFavoriteToggle }) => {
                         }`}
                       >
                         <img
-                          src={image.image_url}
+                          src={image.thumbnail_url || image.image_url}
                           alt={`${property.title} ${index + 1}`}
                           className="w-full h-full object-cover"
                         />
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { FiHome, FiMapPin, FiDollarSign, FiUser, FiPhone, FiMail } from 'react-icons/fi';
 import { api } from '../lib/api';
 import toast from 'react-hot-toast';
@@ -34,6 +34,32 @@ const PropertyForm = ({ onSuccess, initialData = null }) => {
   });
 
   const [loading, setLoading] = useState(false);
+  const [market, setMarket] = useState(null);
+
+  // Rents of comparable listings, so the asking rent isn't set blind
+  useEffect(() => {
+    if (!form.city && !form.neighborhood) {
+      setMarket(null);
+      return undefined;
+    }
+    let stale = false;
+    const timer = setTimeout(async () => {
+      try {
+        const { data } = await api.get('/insights/rent', {
+          params: {
+            city: form.city || undefined,
+            neighborhood: form.neighborhood || undefined,
+            property_type: form.property_type || undefined,
+            bedrooms: form.bedrooms || undefined
+          }
+        });
+        if (!stale) setMarket(data.listings ? data : null);
+      } catch (error) {
+        if (!stale) setMarket(null);
+      }
+    }, 300);
+    return () => { stale = true; clearTimeout(timer); };
+  }, [form.city, form.neighborhood, form.property_type, form.bedrooms]);
 
   const propertyTypes = [
     'House', 'Apartment', 'Studio', 'Condo', 'Townhouse', 
@@ -108,7 +134,11 @@ const PropertyForm = ({ onSuccess, initialData = null }) => {
       const propertyResponse = await api.post('/properties', propertyData);
       const propertyId = propertyResponse.data.property_id;
 
-      toast.success('Property created successfully!');
+      if (propertyResponse.data.status === 'pending_approval') {
+        toast(propertyResponse.data.message, { icon: '⏳' });
+      } else {
+        toast.success('Property created successfully!');
+      }
       setForm({
         title: '', description: '', property_type: '', bedrooms: '', bathrooms: '',
         square_feet: '', rent_amount: '', security_deposit: '', lease_duration: '',
@@ -274,6 +304,12 @@ const PropertyForm = ({ onSuccess, initialData = null }) => {
                 className="w-full px-4 py-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-green-500 focus:border-transparent"
                 placeholder="25000"
               />
+              {market && (
+                <p className="mt-2 text-xs text-gray-500">
+                  {market.listings} similar listing{market.listings === 1 ? '' : 's'}: median KSh {Math.round(market.median).toLocaleString()}
+                  {market.listings > 3 && <> (middle half KSh {Math.round(market.p25).toLocaleString()}–{Math.round(market.p75).toLocaleString()})</>}
+                </p>
+              )}
             </div>
 
             <div>
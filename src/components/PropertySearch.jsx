@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { FiSearch, FiSettings, FiMapPin, FiDollarSign, FiHome, FiX } from 'react-icons/fi';
+import { FiSearch, FiSettings, FiMapPin, FiDollarSign, FiHome, FiX, FiCalendar, FiList } from 'react-icons/fi';
 
 const PropertySearch = ({ onSearch, onFiltersChange, filters = {} }) => {
   const [searchTerm, setSearchTerm] = useState(filters.search || '');
@@ -14,6 +14,9 @@ const PropertySearch = ({ onSearch, onFiltersChange, filters = {} }) => {
     furnished: filters.furnished || false,
     parking_available: filters.parking_available || false,
     pet_policy: filters.pet_policy || '',
+    available_from: filters.available_from || '',
+    available_to: filters.available_to || '',
+    sort: filters.sort || '',
     ...filters
   });
 
@@ -22,6 +25,16 @@ const PropertySearch = ({ onSearch, onFiltersChange, filters = {} }) => {
     'Villa', 'Bungalow', 'Penthouse', 'Duplex', 'Other'
   ];
 
+  // Orders GET /properties can page through without sorting (see backend/sorting.py)
+  const sortOptions = [
+    { value: '', label: 'Best match / newest' },
+    { value: 'newest', label: 'Newest first' },
+    { value: 'price_asc', label: 'Price: low to high' },
+    { value: 'price_desc', label: 'Price: high to low' },
+    { value: 'bedrooms', label: 'Most bedrooms' },
+    { value: 'size', label: 'Largest' }
+  ];
+
   const petPolicies = [
     'Allowed', 'Not Allowed', 'Case by Case', 'Dogs Only', 'Cats Only'
   ];
@@ -52,7 +65,10 @@ const PropertySearch = ({ onSearch, onFiltersChange, filters = {} }) => {
       bathrooms: '',
       furnished: false,
       parking_available: false,
-      pet_policy: ''
+      pet_policy: '',
+      available_from: '',
+      available_to: '',
+      sort: ''
     };
     setSearchTerm('');
     setLocalFilters(clearedFilters);
@@ -216,6 +232,51 @@ const PropertySearch = ({ onSearch, onFiltersChange, filters = {} }) => {
               </select>
             </div>
 
+            {/* Availability */}
+            <div>
+              <label className="block text-sm font-medium text-gray-700 mb-2">
+                <FiCalendar className="inline w-4 h-4 mr-1" />
+                Available From
+              </label>
+              <input
+                type="date"
+                value={localFilters.available_from}
+                onChange={(e) => handleFilterChange('available_from', e.target.value)}
+                className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+              />
+            </div>
+
+            <div>
+              <label className="block text-sm font-medium text-gray-700 mb-2">
+                <FiCalendar className="inline w-4 h-4 mr-1" />
+                Available Until
+              </label>
+              <input
+                type="date"
+                value={localFilters.available_to}
+                min={localFilters.available_from || undefined}
+                onChange={(e) => handleFilterChange('available_to', e.target.value)}
+                className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+              />
+            </div>
+
+            {/* Sort Order */}
+            <div>
+              <label className="block text-sm font-medium text-gray-700 mb-2">
+                <FiList className="inline w-4 h-4 mr-1" />
+                Sort By
+              </label>
+              <select
+                value={localFilters.sort}
+                onChange={(e) => handleFilterChange('sort', e.target.value)}
+                className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+              >
+                {sortOptions.map(option => (
+                  <option key={option.value} value={option.value}>{option.label}</option>
+                ))}
+              </select>
+            </div>
+
             {/* Checkboxes */}
             <div className="space-y-3">
               <div className="flex items-center">
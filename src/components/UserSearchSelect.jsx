@@ -0,0 +1,89 @@
+import { useState, useEffect, useRef } from 'react';
+import { FiSearch, FiX } from 'react-icons/fi';
+import { api } from '../lib/api';
+
+// Typeahead over /users/search: matches the start of a name or email and
+// only ever loads a handful of people, however many are registered.
+const UserSearchSelect = ({ role, selected, onSelect, placeholder = 'Search by name or email', limit = 8 }) => {
+    const [query, setQuery] = useState('');
+    const [results, setResults] = useState([]);
+    const [open, setOpen] = useState(false);
+    const [searching, setSearching] = useState(false);
+    const latest = useRef(0);
+
+    useEffect(() => {
+        if (!open) return undefined;
+        // Wait for a pause in typing, and ignore answers to superseded queries
+        const request = ++latest.current;
+        const timer = setTimeout(async () => {
+            setSearching(true);
+            try {
+                const { data } = await api.get('/users/search', {
+                    params: { q: query.trim(), role: role || undefined, limit }
+                });
+                if (request === latest.current) setResults(data.users || []);
+            } catch (error) {
+                console.error('Error searching users:', error);
+                if (request === latest.current) setResults([]);
+            } finally {
+                if (request === latest.current) setSearching(false);
+            }
+        }, 200);
+        return () => clearTimeout(timer);
+    }, [query, role, limit, open]);
+
+    if (selected) {
+        return (
+            <div className="flex items-center justify-between w-full px-3 py-2 border border-gray-300 rounded-md bg-gray-50">
+                <span className="text-sm text-gray-900">
+                    {selected.name} <span className="text-gray-500">({selected.email})</span>
+                </span>
+                <button
+                    type="button"
+                    onClick={() => { onSelect(null); setQuery(''); }}
+                    className="text-gray-400 hover:text-gray-600"
+                    aria-label="Clear selection"
+                >
+                    <FiX />
+                </button>
+            </div>
+        );
+    }
+
+    return (
+        <div className="relative">
+            <FiSearch className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-400" />
+            <input
+                type="text"
+                value={query}
+                onChange={(e) => setQuery(e.target.value)}
+                onFocus={() => setOpen(true)}
+                onBlur={() => setTimeout(() => setOpen(false), 150)}
+                placeholder={placeholder}
+                className="w-full pl-9 pr-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"
+            />
+            {open && (
+                <ul className="absolute z-10 mt-1 w-full bg-white border border-gray-200 rounded-md shadow-lg max-h-64 overflow-y-auto">
+                    {results.map(user => (
+                        <li key={user.id}>
+                            <button
+                                type="button"
+                                onMouseDown={(e) => e.preventDefault()}
+                                onClick={() => { onSelect(user); setOpen(false); }}
+                                className="w-full text-left px-3 py-2 hover:bg-blue-50"
+                            >
+                                <div className="text-sm font-medium text-gray-900">{user.name}</div>
+                                <div className="text-xs text-gray-500">{user.email} • {user.role}</div>
+                            </button>
+                        </li>
+                    ))}
+                    {!searching && results.length === 0 && (
+                        <li className="px-3 py-2 text-sm text-gray-500">No matching users</li>
+                    )}
+                </ul>
+            )}
+        </div>
+    );
+};
+
+export default UserSearchSelect;
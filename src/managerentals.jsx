@@ -3,13 +3,14 @@ import { FiHome, FiCalendar, FiDollarSign, FiEdit, FiTrash2, FiPlus, FiUser, FiP
 import { api } from './lib/api';
 import toast from 'react-hot-toast';
 import { useAuth } from './context/AuthContext';
+import UserSearchSelect from './components/UserSearchSelect';
 
 const ManageRentals = () => {
   const { user } = useAuth();
   const [rentals, setRentals] = useState([]);
   const [loading, setLoading] = useState(true);
   const [properties, setProperties] = useState([]);
-  const [tenants, setTenants] = useState([]);
+  const [selectedTenant, setSelectedTenant] = useState(null);
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [creating, setCreating] = useState(false);
   const [newRental, setNewRental] = useState({
@@ -28,7 +29,6 @@ const ManageRentals = () => {
   useEffect(() => {
     fetchRentals();
     fetchProperties();
-    fetchTenants();
   }, []);
 
   const fetchRentals = async () => {
@@ -60,16 +60,6 @@ const ManageRentals = () => {
     }
   };
 
-  const fetchTenants = async () => {
-    try {
-      const response = await api.get('/users');
-      const tenantUsers = response.data.users.filter(user => user.role === 'tenant');
-      setTenants(tenantUsers);
-    } catch (error) {
-      console.error('Error fetching tenants:', error);
-    }
-  };
-
   const validateRentalForm = () => {
     if (!newRental.property_id) {
       toast.error('Please select a property');
@@ -136,6 +126,7 @@ const ManageRentals = () => {
   };
 
   const resetForm = () => {
+    setSelectedTenant(null);
     setNewRental({
       property_id: '',
       tenant_id: '',
@@ -182,8 +173,11 @@ const ManageRentals = () => {
     return properties.find(p => p.id == newRental.property_id);
   };
 
-  const getSelectedTenant = () => {
-    return tenants.find(t => t.id == newRental.tenant_id);
+  const getSelectedTenant = () => selectedTenant;
+
+  const handleTenantSelect = (tenant) => {
+    setSelectedTenant(tenant);
+    setNewRental({ ...newRental, tenant_id: tenant ? tenant.id : '' });
   };
 
   if (loading) {
@@ -338,19 +332,12 @@ const ManageRentals = () => {
                     <FiUser className="inline mr-1" />
                     Tenant *
                   </label>
-                  <select
-                    value={newRental.tenant_id}
-                    onChange={(e) => setNewRental({ ...newRental, tenant_id: e.target.value })}
-                    required
-                    className="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"
-                  >
-                    <option value="">Select Tenant</option>
-                    {tenants.map(tenant => (
-                      <option key={tenant.id} value={tenant.id}>
-                        {tenant.name} ({tenant.email})
-                      </option>
-                    ))}
-                  </select>
+                  <UserSearchSelect
+                    role="tenant"
+                    selected={selectedTenant}
+                    onSelect={handleTenantSelect}
+                    placeholder="Search tenants by name or email"
+                  />
                   {getSelectedTenant() && (
                     <div className="mt-2 p-2 bg-green-50 rounded text-sm text-green-700">
                       <strong>Tenant:</strong> {getSelectedTenant().name} • {getSelectedTenant().email}
@@ -25,13 +25,12 @@ const TenantDashboardOverview = () => {
     const fetchTenantData = async () => {
         setLoading(true);
         try {
-            // Fetch available properties
-            const propertiesResponse = await api.get('/properties');
-            const availableProperties = propertiesResponse.data.properties?.filter(p => p.status === 'available') || [];
-
-            // Fetch user's favorites
-            const favoritesResponse = await api.get('/favorites');
-            const userFavorites = favoritesResponse.data.properties || [];
+            // Fetch available properties and the user's favorites in one request
+            const { data } = await api.get('/dashboard/tenant', {
+                params: { include: 'properties,favorites' }
+            });
+            const availableProperties = data.properties?.filter(p => p.status === 'available') || [];
+            const userFavorites = data.favorites || [];
 
             setProperties(availableProperties);
             setFavorites(userFavorites);